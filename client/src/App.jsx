@@ -162,14 +162,17 @@ const renderTheory = () => {
 
 2. Asignaciones:
  ASSIGN valor_temp None variable
- Ejemplo: ASSIGN t1 None x
+ Ejemplo: ASSIGN $t1 None x
 
 3. Operaciones:
  op arg1 arg2 resultado
- Ejemplo: PLUS t1 t2 t3
+ Ejemplo: PLUS $t1 $t2 $t3
+ NEG/BOOL arg1 None resultado (-x y bool(x))
+ Ejemplo: BOOL a None $t4
 
 4. Control de Flujo:
  IF_FALSE condición None etiqueta
+ IF_FALSE_LT a b etiqueta (salta si no a < b; también GT, EQ, NE, LE, GE)
  GOTO None None etiqueta
  LABEL None None etiqueta
 
@@ -1,98 +1,59 @@
-import re
+import mmap
+import os
+import sys
 
-# Definir los patrones para los diferentes tipos de tokens
-token_specification = [
-    ('MAIN',        r'main'),                 # main
-    ('INT',         r'nombre'),               # int (nombre en francés)
-    ('FLOAT',       r'crêpe'),                # float (crêpe en francés)
-    ('IF',          r'macaron'),              # if (macaron en francés)
-    ('ELSE',        r'autre'),                # else (autre en francés)
-    ('WHILE',       r'tour_eiffel'),          # while (tour_eiffel en francés)
-    ('READ',        r'lire'),                 # read (lire en francés)
-    ('PRINT',       r'afficher'),             # print (afficher en francés)
-    ('LBRACKET',    r'\('),                   # (
-    ('RBRACKET',    r'\)'),                   # )
-    ('LBRACE',      r'\{'),                   # {
-    ('RBRACE',      r'\}'),                   # }
-    ('COMMA',       r','),                    # ,
-    ('PCOMMA',      r';'),                    # ;
-    ('EQ',          r'=='),                   # ==
-    ('NE',          r'!='),                   # !=
-    ('LE',          r'<='),                   # <=
-    ('GE',          r'>='),                   # >=
-    ('OR',          r'\|\|'),                 # ||
-    ('AND',         r'&&'),                   # &&
-    ('ATTR',        r'\='),                   # =
-    ('LT',          r'<'),                    # <
-    ('GT',          r'>'),                    # >
-    ('PLUS',        r'\+'),                   # +
-    ('MINUS',       r'-'),                    # -
-    ('MULT',        r'\*'),                   # *
-    ('DIV',         r'\/'),                   # /
-    ('ID',          r'[a-zA-Z_]\w*'),         # Identificadores
-    ('FLOAT_CONST', r'\d+\.\d+'),             # Constantes de punto flotante
-    ('INTEGER_CONST', r'\d+'),                # Constantes enteras
-    ('STRING',      r'"[^"\n]*"'),            # Cadenas de texto
-    ('NEWLINE',     r'\n'),                   # Fin de línea
-    ('SKIP',        r'[ \t]+'),               # Espacios y tabulaciones
-    ('COMMENT',     r'#.*'),                  # Comentarios
-    ('MISMATCH',    r'.'),                    # Cualquier otro carácter
-]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server'))
 
-# Compilar las expresiones regulares
-tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in token_specification)
-get_token = re.compile(tok_regex).match
+from compiler.lexer import lex_bytes, lex_iter
+from compiler.tokens import MISMATCH
 
-# Palabras clave del lenguaje
+# Palabras clave del lenguaje. Las que no tienen regla propia en el lexer
+# llegan como ID y se muestran con su nombre en mayúsculas como tipo
 keywords = {
     'main', 'nombre', 'crêpe', 'macaron', 'autre', 'tour_eiffel', 'lire', 'afficher',
-    'début', 'fin', 'baguette', 'croissant', 'arc_de_triomphe', 'notre_dame', 
-    'champs_elysees', 'louvre', 'versailles', 'tarte_tatin', 'mont_saint_michel', 
+    'début', 'fin', 'baguette', 'croissant', 'arc_de_triomphe', 'notre_dame',
+    'champs_elysees', 'louvre', 'versailles', 'tarte_tatin', 'mont_saint_michel',
     'carcassonne', 'lyon', 'marseille', 'strasbourg', 'bordeaux', 'nantes'
 }
 
-# Función para el análisis léxico
-def lex(characters):
-    line_num = 1
-    line_start = 0
-    pos = 0
-    tokens = []
-    mo = get_token(characters)
-    while mo is not None:
-        kind = mo.lastgroup
-        value = mo.group(kind)
-        if kind == 'NEWLINE':
-            line_num += 1
-            line_start = pos
-        elif kind == 'SKIP' or kind == 'COMMENT':
-            pass
-        elif kind == 'ID' and value in keywords:
+# Leer el código línea por línea hasta encontrar una línea vacía
+def leer_entrada():
+    while True:
+        linea = input()
+        if linea == "":
+            break
+        yield linea + "\n"
+
+def imprimir_tokens(tokens):
+    # Los tokens llegan con recover=True. Se imprimen hasta el primer carácter
+    # que ninguna regla acepta, que se devuelve (None si no hay ninguno)
+    for token in tokens:
+        kind, value = token['type'], token['value']
+        if kind == MISMATCH:
+            return token
+        if kind == 'ID' and value in keywords:
             kind = value.upper()
-            column = mo.start() - line_start
-            tokens.append((kind, value, line_num, column))
-        elif kind != 'MISMATCH':
-            column = mo.start() - line_start
-            tokens.append((kind, value, line_num, column))
-        else:
-            raise RuntimeError('Unexpected character %r on line %d' % (value, line_num))
-        pos = mo.end()
-        mo = get_token(characters, pos)
-    if pos != len(characters):
-        raise RuntimeError('Unexpected character %r on line %d' % (characters[pos], line_num))
-    return tokens
+        print((kind, value, token['line'], token['column']))
+    return None
 
-# Solicitar al usuario que ingrese el código a analizar
-print("Por favor, ingrese el código a analizar. Termine la entrada con una línea vacía:")
-codigo_entrada = []
-while True:
-    linea = input()
-    if linea == "":
-        break
-    codigo_entrada.append(linea)
+def verificar(token):
+    if token is not None:
+        raise RuntimeError('Unexpected character %r on line %d' % (token['value'], token['line']))
 
-codigo_entrada = "\n".join(codigo_entrada)
+def analizar_archivo(ruta):
+    # Mapear el archivo en memoria y analizar sus bytes UTF-8 sin copiarlos
+    with open(ruta, 'rb') as archivo:
+        if os.fstat(archivo.fileno()).st_size == 0:
+            return
+        # La vista se libera aunque imprimir falle (BrokenPipeError): si no,
+        # cerrar el mmap falla con BufferError
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos, memoryview(datos) as vista:
+            inesperado = imprimir_tokens(lex_bytes(vista, recover=True))
+    # Después de liberar el mmap
+    verificar(inesperado)
 
-# Analizar el código de entrada
-tokens = lex(codigo_entrada)
-for token in tokens:
-    print(token)
+if len(sys.argv) > 1:
+    analizar_archivo(sys.argv[1])
+else:
+    print("Por favor, ingrese el código a analizar. Termine la entrada con una línea vacía:")
+    verificar(imprimir_tokens(lex_iter(leer_entrada(), recover=True)))
@@ -1,21 +1,103 @@
+import json
+import os
+
 from flask import Flask, request, jsonify
+from flask.helpers import get_debug_flag
 from flask_cors import CORS
-from compiler.lexer import lex
+from itsdangerous import BadSignature, URLSafeSerializer
+from compiler.lexer import lex_iter, lex_stream
 from compiler.parser import Parser
-from compiler.interpreter import Interpreter
+from compiler.lalr import LALRParser
+from compiler.interpreter import ClosureInterpreter, Interpreter
+from compiler.bytecode import BytecodeVM
+from compiler.ir_executor import IRExecutor
 from compiler.automata import AutomataVisualizer
 from compiler.semantic_translator import SemanticTranslator
 from compiler.code_generator import CodeGenerator
+from compiler.budget import Budget, BudgetExceeded
+from compiler.inputs import InputQueue, InputRequired
+from compiler.optimizer import optimize
+from compiler.regalloc import allocate_registers, temp_count
+from compiler.output import OutputBuffer, ResumedOutput, StreamOutput
+from compiler.resolver import resolve
+from compiler.ssa import SSAExecutor, instruction_count, optimize_ir
+from compiler import compact
 
 app = Flask(__name__)
 CORS(app)
 
+# Clave con la que se firman los tokens de continuación de /api/run. Tiene
+# que venir de SECRET_KEY y ser la misma en todos los procesos: con una clave
+# generada al arrancar, un token no vale en otro worker ni después de
+# reiniciar ("Invalid continuation token"). Solo al depurar (python app.py o
+# FLASK_DEBUG) se genera una si falta.
+def secret_key():
+    key = os.environ.get('SECRET_KEY')
+    if key:
+        return key
+    if __name__ == '__main__' or get_debug_flag():
+        return os.urandom(32).hex()
+    raise RuntimeError("SECRET_KEY must be set: it signs the continuation tokens of /api/run")
+
+
+app.config['SECRET_KEY'] = secret_key()
+continuations = URLSafeSerializer(app.config['SECRET_KEY'], salt='continuation')
+
+# Motores de ejecución de /api/run, elegidos con 'engine'. Todos producen la
+# misma salida y los mismos errores, salvo 'ir' (ejecuta los cuádruplos de
+# SemanticTranslator; ver las diferencias en compiler.ir_executor) y 'ssa'
+# (los mismos cuádruplos optimizados con compiler.ssa, igual que 'ir')
+ENGINES = {
+    'tree': Interpreter,
+    'closures': ClosureInterpreter,
+    'bytecode': BytecodeVM,
+    'ir': IRExecutor,
+    'ssa': SSAExecutor,
+}
+
+# Máximo de caracteres de salida de /api/run
+OUTPUT_LIMIT = 16 * 1024 * 1024
+
+# Presupuesto de cada ejecución de /api/run (compiler.budget). El cliente
+# puede pedir límites menores con 'budget', pero no mayores.
+RUN_BUDGET = {
+    'max_iterations': 10_000_000,
+    'max_seconds': 5.0,
+    'max_output': OUTPUT_LIMIT,
+    'max_variables': 10_000,
+    'max_strings': 4 * OUTPUT_LIMIT,
+}
+
+# Máximo de valores de `lire` de una ejecución, contando los que ya trae su
+# token: cada continuación vuelve a ejecutar el programa con todos, así que
+# sin límite el trabajo total crecería con el cuadrado de los valores
+MAX_RUN_INPUTS = 1_000
+
+# Tipo MIME con el que el cliente puede pedir el AST compacto en Accept
+COMPACT_AST_MIMETYPE = 'application/vnd.ast.compact+json'
+
+def optimized(ast):
+    # Con 'optimize' el AST pasa por compiler.optimizer; devuelve el árbol y
+    # los campos que se agregan a la respuesta con los cambios hechos
+    if not request.json.get('optimize'):
+        return ast, {}
+    ast, changes = optimize(ast)
+    return ast, {'optimizations': changes}
+
+def ast_response(ast, **fields):
+    # Con ?format=compact (o Accept: COMPACT_AST_MIMETYPE) el AST va en el
+    # formato compacto de compiler.compact en lugar de objetos anidados
+    if request.args.get('format') == 'compact' or COMPACT_AST_MIMETYPE in request.headers.get('Accept', ''):
+        body = json.dumps({'ast': compact.encode(ast), **fields}, ensure_ascii=False, separators=(',', ':'))
+        return app.response_class(body, mimetype='application/json')
+    return jsonify({'ast': ast.to_dict(), **fields})
+
 @app.route('/api/analyze/lexer', methods=['POST'])
 def analyze_lexer():
     try:
         code = request.json.get('code', '')
-        tokens = lex(code)
-        return jsonify({'tokens': tokens})
+        tokens = lex_stream(code, recover=bool(request.json.get('recover')))
+        return app.response_class('{"tokens":' + tokens.to_json() + '}', mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -23,10 +105,19 @@ def analyze_lexer():
 def analyze_parser():
     try:
         code = request.json.get('code', '')
-        tokens = lex(code)
-        parser = Parser(tokens)
-        ast = parser.parse()
-        return jsonify({'ast': ast.to_dict()})
+        # Con 'recover' se devuelven todos los errores de una vez junto con
+        # el AST parcial, en lugar de detenerse en el primero
+        if request.json.get('recover'):
+            parser = Parser(lex_iter(code, recover=True), recover=True)
+            ast = parser.parse()
+            return ast_response(ast, diagnostics=parser.diagnostics)
+        # 'parser': 'lalr' usa el analizador ascendente generado de la gramática
+        if request.json.get('parser') == 'lalr':
+            parser = LALRParser(lex_iter(code))
+        else:
+            parser = Parser(lex_iter(code))
+        ast, fields = optimized(parser.parse())
+        return ast_response(ast, **fields)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -34,36 +125,142 @@ def analyze_parser():
 def analyze_semantic():
     try:
         code = request.json.get('code', '')
-        tokens = lex(code)
-        parser = Parser(tokens)
-        ast = parser.parse()
+        parser = Parser(lex_iter(code))
+        ast, fields = optimized(parser.parse())
         
         translator = SemanticTranslator()
-        ir_code = translator.translate(ast.to_dict())
+        ir_code = translator.translate(ast)
+        # Con 'optimize_ir' los cuádruplos pasan por compiler.ssa; la
+        # respuesta trae cuántos había antes y cuántos quedan
+        if request.json.get('optimize_ir'):
+            optimized_ir = optimize_ir(ir_code)
+            fields['ir_instructions'] = {
+                'before': instruction_count(ir_code),
+                'after': instruction_count(optimized_ir),
+            }
+            ir_code = optimized_ir
+        # Con 'allocate_registers' la respuesta trae además los cuádruplos
+        # con los temporales en registros (compiler.regalloc) y cuántos
+        # registros usan
+        if request.json.get('allocate_registers'):
+            allocated_ir, registers = allocate_registers(ir_code)
+            fields['register_allocation'] = {
+                'intermediate_code': allocated_ir,
+                'temps': temp_count(ir_code),
+                'registers': registers,
+            }
         
         code_generator = CodeGenerator()
         target_code = code_generator.generate_code(ir_code)
         
         return jsonify({
             'intermediate_code': ir_code,
-            'target_code': target_code
+            'target_code': target_code,
+            **fields
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/run', methods=['POST'])
 def run_program():
+    # `lire` toma sus valores de 'inputs'. Si se acaban, la ejecución se
+    # detiene y la respuesta trae la salida hasta ese punto, la variable que
+    # falta ('input_required') y un token ('continuation'); otra llamada con
+    # el token y más 'inputs' sigue desde ahí (ver compiler.inputs) y su
+    # 'output' son solo las líneas nuevas.
+    #
+    # El token no guarda el estado de la ejecución sino el código y los
+    # valores leídos: seguir vuelve a ejecutar el programa desde el principio
+    # con todos los 'inputs' y solo omite las líneas que ya se enviaron. Cada
+    # llamada gasta su presupuesto completo, también en las vueltas que se
+    # repiten, así que un programa que pide valores muy adentro de un ciclo
+    # largo puede agotarlo al seguir aunque la primera llamada no lo hiciera.
+    # Un token lleva a lo sumo MAX_RUN_INPUTS valores: una ejecución que pide
+    # más se rechaza en vez de repetir cada vez más lecturas.
     try:
-        code = request.json.get('code', '')
-        tokens = lex(code)
-        parser = Parser(tokens)
+        inputs = request.json.get('inputs') or []
+        if not isinstance(inputs, list) or not all(
+                isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in inputs):
+            raise ValueError("Inputs must be a list of strings or numbers")
+        state = {
+            'code': request.json.get('code', ''),
+            'engine': request.json.get('engine', 'tree'),
+            'inputs': [],
+            'lines': 0,
+        }
+        if request.json.get('continuation'):
+            try:
+                state = continuations.loads(request.json['continuation'])
+            except BadSignature:
+                raise ValueError("Invalid continuation token") from None
+        state['inputs'] = state['inputs'] + inputs
+        if len(state['inputs']) > MAX_RUN_INPUTS:
+            raise ValueError(f"Too many inputs: a run reads at most {MAX_RUN_INPUTS} values, "
+                             "counting those of its continuation token")
+        parser = Parser(lex_iter(state['code']))
         ast = parser.parse()
-        interpreter = Interpreter()
-        output = interpreter.evaluate(ast.to_dict())
-        return jsonify({'output': output})
+        if request.json.get('optimize'):
+            # Los nombres se comprueban antes de optimizar, como al ejecutar
+            # el programa original: el optimizador puede quitar una rama que
+            # usa un nombre no declarado
+            resolve(ast)
+        ast, fields = optimized(ast)
+        if state['engine'] not in ENGINES:
+            raise ValueError(f"Unknown engine: {state['engine']}")
+        budget = run_budget(request.json.get('budget') or {})
+        if request.json.get('stream'):
+            # Los errores de nombres se reportan antes de empezar a enviar
+            resolve(ast)
+            return stream_run(state, ast, budget, fields)
+        output = ResumedOutput(OutputBuffer(budget.max_output), state['lines'])
+        interpreter = ENGINES[state['engine']](output, budget, InputQueue(state['inputs']))
+        try:
+            return jsonify({'output': interpreter.evaluate(ast), **fields})
+        except InputRequired as pause:
+            return jsonify({'output': output.getvalue(), **suspend(state, output, pause), **fields})
+    except BudgetExceeded as e:
+        return jsonify(e.to_dict()), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def suspend(state, output, pause):
+    # Campos de la respuesta de un programa detenido en `lire`
+    token = continuations.dumps({**state, 'lines': output.lines})
+    return {'input_required': pause.name, 'continuation': token}
+
+def run_budget(requested):
+    limits = dict(RUN_BUDGET)
+    for name, value in requested.items():
+        if name not in limits:
+            raise ValueError(f"Unknown budget: {name}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Invalid budget {name}: {value!r}")
+        limits[name] = min(value, limits[name])
+    return Budget(**limits)
+
+def stream_run(state, ast, budget, fields):
+    # Respuesta por partes (NDJSON): un {"output": trozo} por cada trozo de
+    # salida y, si la ejecución falla o se detiene en `lire`, un objeto final
+    # con 'error' o con 'input_required' y 'continuation'. Los trozos
+    # concatenados son la misma salida que sin 'stream'. Con 'optimize', la
+    # primera línea es {"optimizations": [...]}.
+    stream = StreamOutput(budget.max_output)
+    output = ResumedOutput(stream, state['lines'])
+    interpreter = ENGINES[state['engine']](output, budget, InputQueue(state['inputs']))
+    def lines():
+        if fields:
+            yield json.dumps(fields, ensure_ascii=False) + '\n'
+        for chunk in stream.run(interpreter.evaluate, ast):
+            if isinstance(chunk, InputRequired):
+                yield json.dumps(suspend(state, output, chunk)) + '\n'
+            elif isinstance(chunk, BudgetExceeded):
+                yield json.dumps(chunk.to_dict()) + '\n'
+            elif isinstance(chunk, Exception):
+                yield json.dumps({'error': str(chunk)}) + '\n'
+            else:
+                yield json.dumps({'output': chunk}, ensure_ascii=False) + '\n'
+    return app.response_class(lines(), mimetype='application/x-ndjson')
+
 @app.route('/api/language/theory', methods=['GET'])
 def get_language_theory():
     try:
@@ -71,11 +268,13 @@ def get_language_theory():
         automaton = visualizer.create_lexer_automaton()
         grammar = visualizer.get_grammar()
         token_types = visualizer.get_token_types()
+        parse_tables = visualizer.get_parse_tables()
         
         return jsonify({
             'automaton': automaton.source,
             'grammar': grammar,
-            'token_types': token_types
+            'token_types': token_types,
+            'parse_tables': parse_tables
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
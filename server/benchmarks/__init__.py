@@ -0,0 +1,5 @@
+import os
+
+# Los benchmarks usan app.py en un solo proceso (app.test_client()): los
+# tokens de continuación no salen de él y cualquier clave sirve
+os.environ.setdefault('SECRET_KEY', 'benchmarks')
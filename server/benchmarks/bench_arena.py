@@ -0,0 +1,90 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from compiler.arena import ASTArena
+from compiler.interpreter import ArenaInterpreter, Interpreter
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from compiler.semantic_translator import ArenaTranslator, SemanticTranslator
+from .common import format_size
+
+DEFAULT_NODES = [100000, 1000000]
+
+# Programa generado: una declaración y luego sentencias de 12 nodos cada una
+STATEMENT = '    macaron (x < {n}) {{ x = x + {n} * 2 - y; }} autre {{ afficher(x); }}\n'
+NODES_PER_STATEMENT = 12
+
+def make_program(nodes):
+    count = max(1, nodes // NODES_PER_STATEMENT)
+    body = ''.join(STATEMENT.format(n=n % 1000) for n in range(count))
+    return 'main {\n    nombre x = 0;\n    crêpe y = 0.5;\n' + body + '}\n'
+
+def measure(func, *args):
+    # tracemalloc hace mucho más lento el análisis: se mide el tiempo en una
+    # pasada sin él y la memoria en otra
+    gc.collect()
+    _, elapsed = timed(func, *args)
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def parse_objects(stream):
+    return Parser(stream).parse()
+
+def parse_dicts(stream):
+    return Parser(stream).parse().to_dict()
+
+def parse_arena(stream):
+    arena = ASTArena()
+    Parser(stream, build=arena).parse()
+    return arena
+
+def main():
+    parser = argparse.ArgumentParser(description='AST de objetos y dicts frente al AST plano (arena)')
+    parser.add_argument('--nodes', nargs='+', type=int, default=DEFAULT_NODES)
+    args = parser.parse_args()
+
+    for nodes in args.nodes:
+        stream = lex_stream(make_program(nodes))
+        print(f'~{nodes} nodes')
+        print(f"  {'format':>8} {'build (s)':>10} {'retained':>10} {'peak':>10} {'B/node':>8}")
+        retained = {}
+        for name, func in (('dicts', parse_dicts), ('objects', parse_objects), ('arena', parse_arena)):
+            tree, elapsed, current, peak = measure(func, stream)
+            retained[name] = current
+            if name == 'arena':
+                nodes = len(tree)
+            print(f'  {name:>8} {elapsed:>10.3f} {format_size(current):>10} {format_size(peak):>10} '
+                  f'{current / nodes:>8.1f}')
+            del tree
+        print(f"  {'':>8} dicts/arena {retained['dicts'] / retained['arena']:.1f}x, "
+              f"objects/arena {retained['objects'] / retained['arena']:.1f}x")
+
+        program = parse_objects(stream)
+        arena = parse_arena(stream)
+        print(f"  {'walker':>12} {'objects (s)':>11} {'arena (s)':>10} {'speedup':>8}")
+        rows = (
+            ('interpreter', lambda: Interpreter().evaluate(program), lambda: ArenaInterpreter().evaluate(arena)),
+            ('translator', lambda: SemanticTranslator().translate(program), lambda: ArenaTranslator().translate(arena)),
+            ('serializer', program.to_dict, arena.to_dict),
+        )
+        for name, on_objects, on_arena in rows:
+            expected, object_time = timed(on_objects)
+            result, arena_time = timed(on_arena)
+            if result != expected:
+                raise SystemExit(f'{name}: arena result differs')
+            print(f'  {name:>12} {object_time:>11.3f} {arena_time:>10.3f} {object_time / arena_time:>7.2f}x')
+        del program, arena
+
+if __name__ == '__main__':
+    main()
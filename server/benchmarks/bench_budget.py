@@ -0,0 +1,104 @@
+import argparse
+import statistics
+import time
+
+from compiler.budget import Budget, BudgetExceeded
+from compiler.bytecode import BytecodeVM
+from compiler.interpreter import ClosureInterpreter, Interpreter
+from compiler.ir_executor import IRExecutor
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from .bench_engines import PROGRAMS
+
+DEFAULT_ITERATIONS = [100000]
+
+# Cada vuelta duplica la cadena: sin cargar las cadenas al presupuesto, el
+# reloj se mira recién al salir del ciclo, con la cadena ya de 1 GB
+STRINGS = '''main {
+    crêpe s = "xxxxxxxx";
+    nombre i = 0;
+    tour_eiffel (i < 27) {
+        s = s + s;
+        i = i + 1;
+    }
+    afficher(i);
+}
+'''
+
+ENGINES = {
+    'tree': Interpreter,
+    'closures': ClosureInterpreter,
+    'bytecode': BytecodeVM,
+    'ir': IRExecutor,
+}
+
+def run(engine, program, budget):
+    return engine(None, budget).evaluate(program)
+
+def cpu_time(engine, program, budget):
+    start = time.process_time()
+    output = run(engine, program, budget)
+    return time.process_time() - start, output
+
+def compare(engine, program, repeat):
+    # La diferencia buscada es menor que el ruido de la máquina: se mide
+    # tiempo de CPU, las dos variantes se corren una tras otra y el costo es
+    # la mediana de la razón de cada par (más estable que comparar mínimos)
+    free = checked = float('inf')
+    ratios = []
+    for index in range(repeat):
+        budget = Budget(max_iterations=10 ** 12, max_seconds=3600)
+        # El orden se alterna para no favorecer a ninguna
+        if index % 2:
+            with_budget, output = cpu_time(engine, program, budget)
+            without, expected = cpu_time(engine, program, None)
+        else:
+            without, expected = cpu_time(engine, program, None)
+            with_budget, output = cpu_time(engine, program, budget)
+        if output != expected:
+            raise SystemExit(f'{engine.__name__}: output differs')
+        free = min(free, without)
+        checked = min(checked, with_budget)
+        ratios.append(with_budget / without)
+    return free, checked, statistics.median(ratios) - 1
+
+def stop_time(engine, program, limits):
+    # (segundos hasta que el presupuesto detiene el programa, mensaje)
+    start = time.perf_counter()
+    try:
+        run(engine, program, Budget(**limits))
+    except BudgetExceeded as e:
+        return time.perf_counter() - start, str(e)
+    raise SystemExit(f'{engine.__name__}: budget did not stop the program')
+
+# Costo de contar las vueltas: el mismo programa sin presupuesto y con uno
+# que se comprueba (límites de vueltas y de tiempo que no se alcanzan). Luego,
+# cuánto tarda cada límite en detener STRINGS
+def main():
+    parser = argparse.ArgumentParser(description='Costo de los presupuestos de ejecución')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(PROGRAMS), default=list(PROGRAMS))
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=21)
+    args = parser.parse_args()
+
+    print(f"{'program':>11} {'iterations':>10} {'engine':>9} {'free (ms)':>10} {'budget (ms)':>12} {'overhead':>9}")
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = PROGRAMS[name].replace('{n}', str(iterations))
+            program = Parser(lex_stream(code)).parse()
+            for engine in args.engines:
+                free, checked, overhead = compare(ENGINES[engine], program, args.repeat)
+                print(f'{name:>11} {iterations:>10} {engine:>9} {free * 1000:>10.1f} {checked * 1000:>12.1f} '
+                      f'{overhead * 100:>8.1f}%')
+
+    program = Parser(lex_stream(STRINGS)).parse()
+    print(f"\n{'limit':>22} {'engine':>9} {'stop (ms)':>10}  error")
+    for limits in ({'max_seconds': 0.01}, {'max_strings': 16 * 1024 * 1024}):
+        label = ', '.join(f'{name}={value}' for name, value in limits.items())
+        for engine in args.engines:
+            elapsed, error = stop_time(ENGINES[engine], program, limits)
+            print(f'{label:>22} {engine:>9} {elapsed * 1000:>10.1f}  {error}')
+
+if __name__ == '__main__':
+    main()
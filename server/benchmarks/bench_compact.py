@@ -0,0 +1,57 @@
+import argparse
+import json
+
+from app import app
+from compiler import compact
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from .bench_arena import make_program
+from .common import best_of, format_size
+
+DEFAULT_NODES = [10000, 100000, 500000]
+
+def nested_json(program):
+    return app.json.dumps({'ast': program.to_dict()})
+
+def compact_json(program):
+    return json.dumps({'ast': compact.encode(program)}, ensure_ascii=False, separators=(',', ':'))
+
+def post(client, url, code):
+    response = client.post(url, json={'code': code})
+    if response.status_code != 200:
+        raise SystemExit(f'{url}: {response.get_json()["error"]}')
+    return response.data
+
+def main():
+    parser = argparse.ArgumentParser(description='AST en JSON anidado frente al formato compacto')
+    parser.add_argument('--nodes', nargs='+', type=int, default=DEFAULT_NODES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    print(f"{'nodes':>8} {'nested':>10} {'compact':>10} {'ratio':>7} "
+          f"{'serialize (ms)':>20} {'speedup':>8} {'request (ms)':>20} {'speedup':>8}")
+    for nodes in args.nodes:
+        code = make_program(nodes)
+        program = Parser(lex_stream(code)).parse()
+
+        nested_time, nested = best_of(nested_json, program, repeat=args.repeat)
+        compact_time, encoded = best_of(compact_json, program, repeat=args.repeat)
+        if compact.decode(json.loads(encoded)['ast']).to_dict() != json.loads(nested)['ast']:
+            raise SystemExit(f'{nodes} nodes: decoded AST differs')
+        nested_size = len(nested.encode('utf-8'))
+        compact_size = len(encoded.encode('utf-8'))
+
+        # Petición completa: análisis léxico, sintáctico y respuesta
+        nested_request, _ = best_of(post, client, '/api/analyze/parser', code, repeat=args.repeat)
+        compact_request, _ = best_of(post, client, '/api/analyze/parser?format=compact', code,
+                                     repeat=args.repeat)
+
+        print(f'{nodes:>8} {format_size(nested_size):>10} {format_size(compact_size):>10} '
+              f'{nested_size / compact_size:>6.1f}x '
+              f'{nested_time * 1000:>9.1f} /{compact_time * 1000:>9.1f} {nested_time / compact_time:>7.2f}x '
+              f'{nested_request * 1000:>9.1f} /{compact_request * 1000:>9.1f} '
+              f'{nested_request / compact_request:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import inspect
+import sys
+
+from compiler.ir_executor import IRExecutor, load
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from compiler.semantic_translator import SemanticTranslator
+from compiler.ssa import instruction_count
+from .bench_engines import PROGRAMS as ENGINE_PROGRAMS
+from .common import best_of
+
+DEFAULT_ITERATIONS = [10000]
+
+# Programas con condiciones compuestas; {n} es el número de vueltas
+PROGRAMS = {
+    'guards': '''main {
+    nombre i = 0;
+    nombre hits = 0;
+    tour_eiffel (i < {n} && hits >= 0) {
+        macaron (i > 10 && i < 20 || i == 500) {
+            hits = hits + 1;
+        }
+        macaron (hits > 5 || i < 3 && hits == 0) {
+            hits = hits + 0;
+        } autre {
+            afficher(i);
+        }
+        i = i + 1;
+    }
+    afficher(hits);
+}
+''',
+    'flags': '''main {
+    nombre i = 0;
+    nombre a = 0;
+    tour_eiffel (i < {n}) {
+        nombre even = i - (i / 2) * 2 < 1;
+        macaron (even && a < 100 || 0) {
+            a = a + 1;
+        } autre {
+            a = a - 1;
+        }
+        i = i + 1;
+    }
+    afficher(a);
+}
+''',
+    'branching': ENGINE_PROGRAMS['branching'],
+    'nested': ENGINE_PROGRAMS['nested'],
+}
+
+
+class ValueTranslator(SemanticTranslator):
+    # La traducción anterior: la condición se calcula en un temporal antes
+    # del IF_FALSE, y && y || evalúan siempre ambos lados
+    def translate_condition(self, node, false_label):
+        self.emit('IF_FALSE', self.translate_expression(node), None, false_label)
+
+    def translate_logical(self, operator, left, right):
+        left_temp = self.translate_expression(left)
+        right_temp = self.translate_expression(right)
+        result = self.new_temp()
+        self.emit(operator, left_temp, right_temp, result)
+        return result
+
+
+def fetch_line():
+    # Línea de IRExecutor.run que lee la instrucción siguiente
+    lines, first = inspect.getsourcelines(IRExecutor.run)
+    for offset, line in enumerate(lines):
+        if 'instructions[pc]' in line:
+            return first + offset
+    raise SystemExit('IRExecutor.run changed: no instruction fetch found')
+
+
+def count_steps(loaded):
+    # Instrucciones que ejecuta IRExecutor (ya decodificadas: una comparación
+    # con su IF_FALSE cuenta una vez)
+    code = IRExecutor.run.__code__
+    line = fetch_line()
+    steps = 0
+
+    def trace(frame, event, arg):
+        nonlocal steps
+        if frame.f_code is not code:
+            return None
+        if event == 'line' and frame.f_lineno == line:
+            steps += 1
+        return trace
+
+    sys.settrace(trace)
+    try:
+        IRExecutor().run(loaded)
+    finally:
+        sys.settrace(None)
+    return steps
+
+
+def run(loaded):
+    return IRExecutor().run(loaded)
+
+# Tamaño del IR, instrucciones ejecutadas y tiempo en IRExecutor con las
+# condiciones como valores (ValueTranslator) y como saltos. La salida de los
+# dos tiene que ser la misma: si no, el benchmark se detiene
+def main():
+    parser = argparse.ArgumentParser(description='Condiciones como valores y como saltos en el IR')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(PROGRAMS), default=list(PROGRAMS))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'program':>10} {'iterations':>10} {'size':>9} {'steps':>17} {'values (ms)':>12} "
+          f"{'jumps (ms)':>11} {'speedup':>8}")
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = PROGRAMS[name].replace('{n}', str(iterations))
+            program = Parser(lex_stream(code)).parse()
+            values = ValueTranslator().translate(program)
+            jumps = SemanticTranslator().translate(program)
+            size = f'{instruction_count(values)}->{instruction_count(jumps)}'
+            steps = f'{count_steps(load(values))}->{count_steps(load(jumps))}'
+            values_time, expected = best_of(run, load(values), repeat=args.repeat)
+            jumps_time, output = best_of(run, load(jumps), repeat=args.repeat)
+            if output != expected:
+                raise SystemExit(f'{name}: output differs with jumping code')
+            print(f'{name:>10} {iterations:>10} {size:>9} {steps:>17} {values_time * 1000:>12.1f} '
+                  f'{jumps_time * 1000:>11.1f} {values_time / jumps_time:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
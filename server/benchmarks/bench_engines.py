@@ -0,0 +1,124 @@
+import argparse
+
+from compiler.bytecode import BytecodeVM
+from compiler.interpreter import ClosureInterpreter, Interpreter
+from compiler.ir_executor import IRExecutor
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from .bench_pipeline import DictInterpreter
+from .common import best_of
+
+DEFAULT_ITERATIONS = [10000, 100000]
+
+# Programas de prueba; {n} es el número de vueltas del ciclo principal
+PROGRAMS = {
+    'loop': '''main {
+    nombre i = 0;
+    crêpe s = 0.0;
+    tour_eiffel (i < {n}) {
+        s = s + i;
+        i = i + 1;
+    }
+    afficher(s);
+}
+''',
+    'arithmetic': '''main {
+    nombre i = 0;
+    crêpe x = 1.5;
+    crêpe y = 0.0;
+    tour_eiffel (i < {n}) {
+        y = (x * i + 3) / (i + 1) - x * x + -i / 7 + (y - 1) * 0.5;
+        i = i + 1;
+    }
+    afficher(y);
+}
+''',
+    'branching': '''main {
+    nombre i = 0;
+    nombre a = 0;
+    nombre b = 0;
+    tour_eiffel (i < {n}) {
+        macaron (i - (i / 3) * 3 < 1 && a <= b || i == 0) {
+            a = a + 1;
+        } autre {
+            macaron (b > 100) {
+                b = b - 100;
+            } autre {
+                b = b + 2;
+            }
+        }
+        i = i + 1;
+    }
+    afficher(a);
+    afficher(b);
+}
+''',
+    'nested': '''main {
+    nombre i = 0;
+    nombre total = 0;
+    tour_eiffel (i < {n} / 100) {
+        nombre j = 0;
+        tour_eiffel (j < 100) {
+            total = total + i * j;
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    afficher(total);
+}
+''',
+}
+
+def run_dicts(program):
+    # Camino anterior de /api/run: to_dict() y recorrido del AST en dicts
+    return DictInterpreter().evaluate(program.to_dict())
+
+def run_tree(program):
+    return Interpreter().evaluate(program)
+
+def run_closures(program):
+    return ClosureInterpreter().evaluate(program)
+
+def run_bytecode(program):
+    return BytecodeVM().evaluate(program)
+
+def run_ir(program):
+    return IRExecutor().evaluate(program)
+
+# Motores a comparar con el intérprete que recorre el árbol
+ENGINES = {
+    'closures': run_closures,
+    'bytecode': run_bytecode,
+    'ir': run_ir,
+}
+
+# La aceleración se reporta frente al intérprete de objetos y, entre
+# paréntesis, frente al recorrido anterior sobre dicts
+def main():
+    parser = argparse.ArgumentParser(description='Motores de ejecución frente al intérprete que recorre el AST')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(PROGRAMS), default=list(PROGRAMS))
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'program':>11} {'iterations':>10} {'dicts (ms)':>10} {'tree (ms)':>10}"
+          + ''.join(f" {engine + ' (ms)':>15} {'speedup':>8}" for engine in args.engines))
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = PROGRAMS[name].replace('{n}', str(iterations))
+            program = Parser(lex_stream(code)).parse()
+            dicts, expected = best_of(run_dicts, program, repeat=args.repeat)
+            tree, output = best_of(run_tree, program, repeat=args.repeat)
+            if output != expected:
+                raise SystemExit(f'tree: output differs on {name}')
+            row = f'{name:>11} {iterations:>10} {dicts * 1000:>10.1f} {tree * 1000:>10.1f}'
+            for engine in args.engines:
+                elapsed, output = best_of(ENGINES[engine], program, repeat=args.repeat)
+                if output != expected:
+                    raise SystemExit(f'{engine}: output differs on {name}')
+                row += f' {elapsed * 1000:>15.1f} {tree / elapsed:>7.2f}x ({dicts / elapsed:.1f}x)'
+            print(row)
+
+if __name__ == '__main__':
+    main()
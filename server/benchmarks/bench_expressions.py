@@ -0,0 +1,92 @@
+import argparse
+import random
+
+from compiler.ast_nodes import BinaryOperation
+from compiler.lexer import lex
+from compiler.parser import Parser
+from .common import best_of
+
+DEFAULT_TERMS = [1000, 10000, 50000]
+
+class LevelParser(Parser):
+    # Análisis de expresiones anterior: una función por nivel de precedencia
+    # (comparación, suma, producto, primario), como referencia.
+    def parse_expression(self, min_precedence=1):
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_additive()
+        while self.peek() and self.peek()['type'] in ['GT', 'LT', 'EQ', 'NE', 'LE', 'GE']:
+            operator = self.consume()['type']
+            right = self.parse_additive()
+            left = BinaryOperation(operator, left, right)
+        return left
+
+    def parse_additive(self):
+        left = self.parse_multiplicative()
+        while self.peek() and self.peek()['type'] in ['PLUS', 'MINUS']:
+            operator = self.consume()['type']
+            right = self.parse_multiplicative()
+            left = BinaryOperation(operator, left, right)
+        return left
+
+    def parse_multiplicative(self):
+        left = self.parse_primary()
+        while self.peek() and self.peek()['type'] in ['MULT', 'DIV']:
+            operator = self.consume()['type']
+            right = self.parse_primary()
+            left = BinaryOperation(operator, left, right)
+        return left
+
+def chain(terms, operators):
+    operands = ['x', 'y', '1', '2.5']
+    parts = [random.choice(operands)]
+    for _ in range(terms - 1):
+        parts.append(random.choice(operators))
+        parts.append(random.choice(operands))
+    return ' '.join(parts)
+
+def nested(terms):
+    # Grupos de 10 términos entre paréntesis: (x + 1 * y ...) * (...)
+    groups = ['(' + chain(10, ['+', '-', '*', '/']) + ')' for _ in range(max(1, terms // 10))]
+    return ' * '.join(groups)
+
+def program(expression):
+    return 'main {\n    nombre x = 1;\n    crêpe y = 2.5;\n    afficher(' + expression + ');\n}\n'
+
+SHAPES = {
+    'sum': lambda terms: chain(terms, ['+', '-']),
+    'mixed': lambda terms: chain(terms, ['+', '-', '*', '/']),
+    'compare': lambda terms: chain(terms, ['+', '*', '<', '==']),
+    'nested': nested,
+    'logical': lambda terms: chain(terms, ['+', '*', '<', '&&', '||']),
+}
+
+# Formas que el parser anterior también acepta (sin &&, || ni '-' unario)
+LEVEL_SHAPES = {'sum', 'mixed', 'compare', 'nested'}
+
+def parse_with(parser_class, tokens):
+    return parser_class(tokens).parse()
+
+def main():
+    parser = argparse.ArgumentParser(description='Parser de expresiones: precedencia ascendente vs. un nivel por función')
+    parser.add_argument('--terms', nargs='+', type=int, default=DEFAULT_TERMS)
+    parser.add_argument('--shapes', nargs='+', choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'shape':>8} {'terms':>7} {'tokens':>8} {'levels (ms)':>12} {'climbing (ms)':>14} {'speedup':>8}")
+    for shape in args.shapes:
+        for terms in args.terms:
+            tokens = lex(program(SHAPES[shape](terms)))
+            climbing, _ = best_of(parse_with, Parser, tokens, repeat=args.repeat)
+            if shape in LEVEL_SHAPES:
+                levels, _ = best_of(parse_with, LevelParser, tokens, repeat=args.repeat)
+                print(f'{shape:>8} {terms:>7} {len(tokens):>8} {levels * 1000:>12.2f} '
+                      f'{climbing * 1000:>14.2f} {levels / climbing:>7.2f}x')
+            else:
+                print(f'{shape:>8} {terms:>7} {len(tokens):>8} {"-":>12} {climbing * 1000:>14.2f} {"-":>8}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import argparse
+
+from compiler.lexer import lex, lex_dfa
+from .common import best_of, format_size, make_source, parse_size
+
+DEFAULT_SIZES = ['1KB', '64KB', '1MB', '8MB', '50MB']
+
+ENGINES = {
+    'regex': lex,
+    'dfa': lex_dfa,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara los motores del analizador léxico')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'engine':>8} {'tokens':>10} {'seconds':>10} {'MB/s':>8}")
+    for size_text in args.sizes:
+        source = make_source(parse_size(size_text))
+        size = len(source.encode('utf-8'))
+        # Por encima de este tamaño solo se comparan los conteos para no
+        # mantener dos listas de tokens en memoria a la vez
+        compare = size < 8 * 1024 * 1024
+        expected = None
+        for name, func in ENGINES.items():
+            repeat = args.repeat if compare else 1
+            elapsed, tokens = best_of(func, source, repeat=repeat)
+            check = tokens if compare else len(tokens)
+            if expected is None:
+                expected = check
+            elif check != expected:
+                raise SystemExit(f'{name} produced different tokens for {format_size(size)}')
+            print(f'{format_size(size):>8} {name:>8} {len(tokens):>10} {elapsed:>10.4f} '
+                  f'{size / elapsed / (1024 * 1024):>8.2f}')
+            del tokens
+
+if __name__ == '__main__':
+    main()
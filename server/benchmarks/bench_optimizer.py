@@ -0,0 +1,98 @@
+import argparse
+
+from compiler.bytecode import BytecodeVM
+from compiler.interpreter import ClosureInterpreter, Interpreter
+from compiler.ir_executor import IRExecutor
+from compiler.lexer import lex_stream
+from compiler.optimizer import optimize
+from compiler.parser import Parser
+from compiler.resolver import resolve
+from .bench_engines import PROGRAMS as ENGINE_PROGRAMS
+from .common import best_of
+
+DEFAULT_ITERATIONS = [10000, 100000]
+
+ENGINES = {
+    'tree': Interpreter,
+    'closures': ClosureInterpreter,
+    'bytecode': BytecodeVM,
+    'ir': IRExecutor,
+}
+
+# Programas con expresiones constantes dentro del ciclo, identidades y ramas
+# muertas; {n} es el número de vueltas. Los de bench_engines casi no tienen
+# nada que optimizar y sirven para ver que no cambia la salida.
+PROGRAMS = {
+    'constants': '''main {
+    nombre i = 0;
+    crêpe s = 0.0;
+    tour_eiffel (i < {n}) {
+        s = s + (2 * 3 + 4) / (1 + 1) - 60 * 60 / 3600;
+        i = i + 1;
+    }
+    afficher(s);
+}
+''',
+    'identities': '''main {
+    nombre i = 0;
+    crêpe x = 1.5;
+    crêpe y = 0.0;
+    tour_eiffel (i < {n}) {
+        y = (y * 1 + x / 1 - 0) * 0.5 - 0;
+        i = i + 1;
+    }
+    afficher(y);
+}
+''',
+    'dead_code': '''main {
+    nombre i = 0;
+    nombre a = 0;
+    tour_eiffel (i < {n}) {
+        macaron (1 > 2 || 0) {
+            afficher("nunca");
+        } autre {
+            a = a + 1;
+        }
+        tour_eiffel (0 && i) {
+            a = a - 1;
+        }
+        i = i + 1;
+    }
+    afficher(a);
+}
+''',
+    **ENGINE_PROGRAMS,
+}
+
+def run(engine, program):
+    return engine().evaluate(program)
+
+# Tiempo de cada motor con el AST original y con el optimizado. La salida de
+# los dos tiene que ser la misma: si no, el benchmark se detiene
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de ejecución con y sin compiler.optimizer')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(PROGRAMS), default=list(PROGRAMS))
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'program':>11} {'iterations':>10} {'changes':>8} {'engine':>9} {'original (ms)':>14} "
+          f"{'optimized (ms)':>15} {'speedup':>8}")
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = PROGRAMS[name].replace('{n}', str(iterations))
+            program = Parser(lex_stream(code)).parse()
+            # Como en /api/run, los nombres se comprueban sobre el original
+            resolve(program)
+            optimized, changes = optimize(program)
+            for engine in args.engines:
+                original_time, expected = best_of(run, ENGINES[engine], program, repeat=args.repeat)
+                optimized_time, output = best_of(run, ENGINES[engine], optimized, repeat=args.repeat)
+                if output != expected:
+                    raise SystemExit(f'{name} ({engine}): output differs after optimizing')
+                print(f'{name:>11} {iterations:>10} {len(changes):>8} {engine:>9} {original_time * 1000:>14.1f} '
+                      f'{optimized_time * 1000:>15.1f} {original_time / optimized_time:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
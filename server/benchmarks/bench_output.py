@@ -0,0 +1,103 @@
+import argparse
+import os
+
+from compiler.interpreter import Interpreter
+from compiler.lexer import lex_stream
+from compiler.output import FileOutput, StreamOutput
+from compiler.parser import Parser
+from compiler.resolver import resolve
+from .bench_arena import measure
+from .common import format_size
+
+DEFAULT_LINES = [100000, 1000000]
+
+# Ciclos anidados que imprimen `lines` líneas en total (depth niveles)
+def make_program(lines, depth=3):
+    side = max(1, round(lines ** (1 / depth)))
+    names = [f'i{level}' for level in range(depth)]
+    code = 'main {\n' + ''.join(f'    nombre {name} = 0;\n' for name in names)
+    body = '        afficher(i0 * 1000 + i1);\n'
+    for name in reversed(names):
+        body = (f'        {name} = 0;\n        tour_eiffel ({name} < {side}) {{\n'
+                + body + f'        {name} = {name} + 1;\n        }}\n')
+    return code + body + '}\n', side ** depth
+
+class JoinInterpreter(Interpreter):
+    # Interpreter anterior: cada bloque junta en una cadena lo que imprimen
+    # sus sentencias y el bloque que lo contiene la vuelve a juntar
+    def evaluate_program(self, node):
+        self.frame = resolve(node).frame()
+        return self.join(node.body) or ''
+
+    def join(self, statements):
+        results = []
+        for statement in statements:
+            result = self.evaluate(statement)
+            if result is not None:
+                results.append(str(result))
+        return '\n'.join(results) if results else None
+
+    def evaluate_print(self, node):
+        return str(self.evaluate(node.expression))
+
+    def evaluate_if_statement(self, node):
+        if self.evaluate(node.condition):
+            return self.join(node.consequent)
+        if node.alternate:
+            return self.join(node.alternate)
+        return None
+
+    def evaluate_while_loop(self, node):
+        results = []
+        while self.evaluate(node.condition):
+            result = self.join(node.body)
+            if result is not None:
+                results.append(result)
+        return '\n'.join(results) if results else None
+
+def run_join(program):
+    return len(JoinInterpreter().evaluate(program))
+
+def run_buffer(program):
+    return len(Interpreter().evaluate(program))
+
+def run_file(program):
+    with open(os.devnull, 'w') as file:
+        Interpreter(FileOutput(file)).evaluate(program)
+
+def run_stream(program):
+    output = StreamOutput()
+    size = 0
+    for chunk in output.run(Interpreter(output).evaluate, program):
+        size += len(chunk)
+    return size
+
+RUNNERS = {
+    'join': run_join,
+    'buffer': run_buffer,
+    'file': run_file,
+    'stream': run_stream,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Salida juntada por bloques frente a los destinos de compiler.output')
+    parser.add_argument('--lines', nargs='+', type=int, default=DEFAULT_LINES)
+    parser.add_argument('--depth', type=int, default=3)
+    args = parser.parse_args()
+
+    for lines in args.lines:
+        code, total = make_program(lines, args.depth)
+        program = Parser(lex_stream(code)).parse()
+        print(f'{total} lines, {args.depth} nested loops')
+        print(f"  {'sink':>8} {'time (s)':>10} {'peak':>10}")
+        sizes = set()
+        for name, runner in RUNNERS.items():
+            size, elapsed, _, peak = measure(runner, program)
+            if size is not None:
+                sizes.add(size)
+            print(f'  {name:>8} {elapsed:>10.2f} {format_size(peak):>10}')
+        if len(sizes) != 1:
+            raise SystemExit(f'{lines} lines: output sizes differ: {sizes}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import os
+import time
+
+from compiler.lexer import lex_parallel, lex_stream
+from .common import format_size, make_source, parse_size
+
+DEFAULT_SIZES = ['16MB', '128MB']
+
+def same_tokens(left, right):
+    return (left.kinds == right.kinds and left.starts.values == right.starts.values
+            and left.ends.values == right.ends.values)
+
+def main():
+    parser = argparse.ArgumentParser(description='Aceleración de lex_parallel() según el número de núcleos')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--workers', nargs='+', type=int,
+                        default=sorted({1, 2, 4, 8, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for size_text in args.sizes:
+        source = make_source(parse_size(size_text))
+        size = len(source.encode('utf-8'))
+        start = time.perf_counter()
+        expected = lex_stream(source)
+        serial = time.perf_counter() - start
+        print(f"{format_size(size):>8} {'serial':>8} {serial:>9.3f} {1:>7.2f}x")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            stream = lex_parallel(source, workers=workers)
+            elapsed = time.perf_counter() - start
+            if not same_tokens(stream, expected):
+                raise SystemExit(f'lex_parallel with {workers} workers differs from lex_stream')
+            print(f'{format_size(size):>8} {workers:>8} {elapsed:>9.3f} {serial / elapsed:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+import argparse
+
+from flask import jsonify, request
+
+from app import app
+from compiler.code_generator import CodeGenerator
+from compiler.interpreter import BINARY_OPERATORS
+from compiler.lexer import lex_iter
+from compiler.parser import Parser
+from compiler.semantic_translator import SemanticTranslator
+from .common import best_of
+
+DEFAULT_ITERATIONS = [1000, 10000, 50000]
+DEFAULT_LOOPS = [10, 100, 1000]
+
+# Programa con `loops` ciclos seguidos de `iterations` vueltas cada uno
+LOOP = '''    i = 0;
+    tour_eiffel (i < {iterations}) {{
+        macaron (i / 2 > 3 && total < 1000000) {{
+            total = total + i * 2 - 1;
+        }} autre {{
+            total = total - 1;
+        }}
+        i = i + 1;
+    }}
+'''
+
+def make_program(loops, iterations):
+    body = ''.join(LOOP.format(iterations=iterations) for _ in range(loops))
+    return 'main {\n    nombre i = 0;\n    crêpe total = 0.0;\n' + body + '    afficher(total);\n}\n'
+
+class DictInterpreter:
+    # Intérprete anterior, sobre el AST convertido con to_dict(), como
+    # referencia: cada acceso a un campo es una búsqueda por cadena
+    def __init__(self):
+        self.variables = {}
+
+    def evaluate(self, node):
+        method = getattr(self, f'evaluate_{node["type"]}', None)
+        if method is None:
+            raise RuntimeError(f"Unknown node type: {node['type']}")
+        return method(node)
+
+    def evaluate_program(self, node):
+        results = []
+        for statement in node['body']:
+            result = self.evaluate(statement)
+            if result is not None:
+                results.append(str(result))
+        return '\n'.join(results)
+
+    def evaluate_variable_declaration(self, node):
+        if node.get('value'):
+            self.variables[node['name']] = self.evaluate(node['value'])
+        else:
+            self.variables[node['name']] = 0 if node['var_type'] == 'INT' else 0.0
+
+    def evaluate_assignment(self, node):
+        if node['name'] not in self.variables:
+            raise RuntimeError(f"Cannot assign to undefined variable: {node['name']}")
+        self.variables[node['name']] = self.evaluate(node['value'])
+
+    def evaluate_binary_operation(self, node):
+        left = self.evaluate(node['left'])
+        if node['operator'] == 'AND':
+            return bool(left) and bool(self.evaluate(node['right']))
+        if node['operator'] == 'OR':
+            return bool(left) or bool(self.evaluate(node['right']))
+        right = self.evaluate(node['right'])
+        if node['operator'] not in BINARY_OPERATORS:
+            raise RuntimeError(f"Unknown operator: {node['operator']}")
+        return BINARY_OPERATORS[node['operator']](left, right)
+
+    def evaluate_unary_operation(self, node):
+        return -self.evaluate(node['operand'])
+
+    def evaluate_number(self, node):
+        return node['value']
+
+    def evaluate_string(self, node):
+        return node['value']
+
+    def evaluate_identifier(self, node):
+        if node['name'] not in self.variables:
+            raise RuntimeError(f"Undefined variable: {node['name']}")
+        return self.variables[node['name']]
+
+    def evaluate_print(self, node):
+        return str(self.evaluate(node['expression']))
+
+    def evaluate_block(self, statements):
+        results = []
+        for statement in statements:
+            result = self.evaluate(statement)
+            if result is not None:
+                results.append(str(result))
+        return '\n'.join(results) if results else None
+
+    def evaluate_if_statement(self, node):
+        if self.evaluate(node['condition']):
+            return self.evaluate_block(node['consequent'])
+        elif node['alternate']:
+            return self.evaluate_block(node['alternate'])
+        return None
+
+    def evaluate_while_loop(self, node):
+        results = []
+        while self.evaluate(node['condition']):
+            result = self.evaluate_block(node['body'])
+            if result is not None:
+                results.append(result)
+        return '\n'.join(results) if results else None
+
+class DictTranslator(SemanticTranslator):
+    # Traductor anterior, sobre el AST convertido con to_dict()
+    def translate_expression(self, node):
+        if node['type'] == 'binary_operation':
+            left_temp = self.translate_expression(node['left'])
+            right_temp = self.translate_expression(node['right'])
+            result = self.new_temp()
+            self.emit(node['operator'], left_temp, right_temp, result)
+            return result
+        elif node['type'] == 'unary_operation':
+            operand_temp = self.translate_expression(node['operand'])
+            result = self.new_temp()
+            self.emit('NEG', operand_temp, None, result)
+            return result
+        elif node['type'] == 'number':
+            temp = self.new_temp()
+            self.emit('ASSIGN', str(node['value']), None, temp)
+            return temp
+        elif node['type'] == 'identifier':
+            return node['name']
+        return None
+
+    def translate_block(self, statements):
+        for stmt in statements:
+            self.translate_statement(stmt)
+
+    def translate_statement(self, node):
+        if node['type'] == 'variable_declaration':
+            if node.get('value'):
+                value_temp = self.translate_expression(node['value'])
+                self.emit('DECLARE', node['var_type'], value_temp, node['name'])
+            else:
+                self.emit('DECLARE', node['var_type'], '0', node['name'])
+        elif node['type'] == 'assignment':
+            value_temp = self.translate_expression(node['value'])
+            self.emit('ASSIGN', value_temp, None, node['name'])
+        elif node['type'] == 'if_statement':
+            condition_temp = self.translate_expression(node['condition'])
+            else_label = self.new_label()
+            end_label = self.new_label()
+            self.emit('IF_FALSE', condition_temp, None, else_label)
+            self.translate_block(node['consequent'])
+            self.emit('GOTO', None, None, end_label)
+            self.emit('LABEL', None, None, else_label)
+            if node['alternate']:
+                self.translate_block(node['alternate'])
+            self.emit('LABEL', None, None, end_label)
+        elif node['type'] == 'while_loop':
+            start_label = self.new_label()
+            end_label = self.new_label()
+            self.emit('LABEL', None, None, start_label)
+            condition_temp = self.translate_expression(node['condition'])
+            self.emit('IF_FALSE', condition_temp, None, end_label)
+            self.translate_block(node['body'])
+            self.emit('GOTO', None, None, start_label)
+            self.emit('LABEL', None, None, end_label)
+        elif node['type'] == 'print':
+            value_temp = self.translate_expression(node['expression'])
+            self.emit('PRINT', value_temp)
+
+    def translate(self, ast):
+        if ast['type'] == 'program':
+            self.translate_block(ast['body'])
+        return self.code
+
+# Versiones anteriores de los endpoints (AST -> to_dict() -> recorrido), con
+# el mismo manejo de la petición que app.py para comparar de punta a punta
+
+def run_program_dicts():
+    try:
+        ast = Parser(lex_iter(request.json.get('code', ''))).parse()
+        return jsonify({'output': DictInterpreter().evaluate(ast.to_dict())})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+def analyze_semantic_dicts():
+    try:
+        ast = Parser(lex_iter(request.json.get('code', ''))).parse()
+        ir_code = DictTranslator().translate(ast.to_dict())
+        target_code = CodeGenerator().generate_code(ir_code)
+        return jsonify({'intermediate_code': ir_code, 'target_code': target_code})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+app.add_url_rule('/bench/run-dicts', view_func=run_program_dicts, methods=['POST'])
+app.add_url_rule('/bench/semantic-dicts', view_func=analyze_semantic_dicts, methods=['POST'])
+
+def post(client, url, code):
+    response = client.post(url, json={'code': code})
+    if response.status_code != 200:
+        raise SystemExit(f'{url}: {response.get_json()["error"]}')
+    return response.get_json()
+
+def compare(client, label, before_url, after_url, code, repeat):
+    before, expected = best_of(post, client, before_url, code, repeat=repeat)
+    after, result = best_of(post, client, after_url, code, repeat=repeat)
+    if result != expected:
+        raise SystemExit(f'{after_url}: response differs for {label}')
+    print(f'  {label:>18} {before * 1000:>12.1f} {after * 1000:>12.1f} {before / after:>7.2f}x')
+
+def main():
+    parser = argparse.ArgumentParser(description='Endpoints /api/run y /api/analyze/semantic con y sin to_dict()')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--loops', nargs='+', type=int, default=DEFAULT_LOOPS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    header = f"  {'program':>18} {'dicts (ms)':>12} {'objects (ms)':>12} {'speedup':>8}"
+
+    print('/api/run (1 loop, N iterations)')
+    print(header)
+    for iterations in args.iterations:
+        compare(client, f'{iterations} iter', '/bench/run-dicts', '/api/run',
+                make_program(1, iterations), args.repeat)
+
+    print('/api/analyze/semantic (N loops)')
+    print(header)
+    for loops in args.loops:
+        compare(client, f'{loops} loops', '/bench/semantic-dicts', '/api/analyze/semantic',
+                make_program(loops, 10), args.repeat)
+
+if __name__ == '__main__':
+    main()
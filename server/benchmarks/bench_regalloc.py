@@ -0,0 +1,54 @@
+import argparse
+
+from compiler.ir_executor import IRExecutor, load
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from compiler.regalloc import allocate_registers, temp_count
+from compiler.semantic_translator import SemanticTranslator
+from compiler.ssa import optimize_ir
+from .bench_ssa import CORPUS
+from .common import best_of
+
+DEFAULT_ITERATIONS = [10000]
+
+def run(loaded):
+    return IRExecutor().run(loaded)
+
+# Temporales antes de compiler.regalloc y registros después, ranuras que
+# reserva load() y tiempo de ejecutar los cuádruplos en IRExecutor (ya
+# cargados). Con --ssa se parte de la salida de compiler.ssa. La salida de
+# los dos tiene que ser la misma: si no, el benchmark se detiene
+def main():
+    parser = argparse.ArgumentParser(description='Registros y tiempo del IR con y sin compiler.regalloc')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(CORPUS), default=list(CORPUS))
+    parser.add_argument('--ssa', action='store_true', help='optimizar con compiler.ssa antes de asignar')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'program':>11} {'iterations':>10} {'temps':>6} {'registers':>10} {'slots':>9} {'allocate (ms)':>14} "
+          f"{'original (ms)':>14} {'allocated (ms)':>15} {'speedup':>8}")
+    total_temps = total_registers = 0
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = CORPUS[name].replace('{n}', str(iterations))
+            ir_code = SemanticTranslator().translate(Parser(lex_stream(code)).parse())
+            if args.ssa:
+                ir_code = optimize_ir(ir_code)
+            allocate_time, (allocated, registers) = best_of(allocate_registers, ir_code, repeat=args.repeat)
+            temps = temp_count(ir_code)
+            total_temps += temps
+            total_registers += registers
+            original, loaded = load(ir_code), load(allocated)
+            slots = f'{len(original.registers)}->{len(loaded.registers)}'
+            original_time, expected = best_of(run, original, repeat=args.repeat)
+            allocated_time, output = best_of(run, loaded, repeat=args.repeat)
+            if output != expected:
+                raise SystemExit(f'{name}: output differs after allocating registers')
+            print(f'{name:>11} {iterations:>10} {temps:>6} {registers:>10} {slots:>9} {allocate_time * 1000:>14.2f} '
+                  f'{original_time * 1000:>14.1f} {allocated_time * 1000:>15.1f} '
+                  f'{original_time / allocated_time:>7.2f}x')
+    print(f'total: {total_temps} temps -> {total_registers} registers')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import random
+import time
+
+from compiler.lexer import lex_stream, relex
+from .common import SAMPLE_PROGRAM, format_size, make_source, parse_size
+
+DEFAULT_SIZES = ['64KB', '1MB', '8MB']
+DEFAULT_EDITS = [1, 100, 10000]
+
+def main():
+    parser = argparse.ArgumentParser(description='Costo de relex() según el tamaño de la edición')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--edits', nargs='+', type=int, default=DEFAULT_EDITS)
+    parser.add_argument('--count', type=int, default=50)
+    parser.add_argument('--check', action='store_true', help='compara con un análisis completo')
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'size':>8} {'edit':>7} {'full lex (s)':>13} {'relex (ms)':>11} {'speedup':>9}")
+    for size_text in args.sizes:
+        source = make_source(parse_size(size_text))
+        size = len(source.encode('utf-8'))
+        start = time.perf_counter()
+        stream = lex_stream(source)
+        full = time.perf_counter() - start
+
+        for edit_size in args.edits:
+            inserted = make_source(edit_size, SAMPLE_PROGRAM)[:edit_size]
+            # Ediciones cercanas entre sí, como al escribir en el editor
+            cursor = len(stream.source) // 2
+            elapsed = 0.0
+            for _ in range(args.count):
+                cursor = min(max(0, cursor + random.randint(-200, 200)), len(stream.source))
+                deleted = min(edit_size, len(stream.source) - cursor)
+                start = time.perf_counter()
+                relex(stream, cursor, deleted, inserted)
+                elapsed += time.perf_counter() - start
+            average = elapsed / args.count
+            if args.check and stream.to_list() != lex_stream(stream.source).to_list():
+                raise SystemExit('relex diverged from a full re-lex')
+            print(f'{format_size(size):>8} {edit_size:>7} {full:>13.3f} {average * 1000:>11.3f} '
+                  f'{full / average:>8.0f}x')
+
+if __name__ == '__main__':
+    main()
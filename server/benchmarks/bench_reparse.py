@@ -0,0 +1,84 @@
+import argparse
+import itertools
+import random
+import time
+
+from compiler.incremental import reparse
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+
+BODY_UNIT = '''    nombre x{n} = {n};
+    crêpe y{n} = x{n} * 2.5 + 1;
+    macaron (x{n} > 10 && y{n} < 100) {{
+        afficher(x{n} - 1);
+        tour_eiffel (x{n} > 0) {{
+            x{n} = x{n} - 1;
+        }}
+    }} autre {{
+        afficher("petit");
+    }}
+'''
+
+def make_program(lines):
+    unit_lines = BODY_UNIT.count('\n')
+    body = ''.join(BODY_UNIT.format(n=n) for n in range(max(1, lines // unit_lines)))
+    return 'main {\n' + body + '}\n'
+
+def one_char_edit(source, near=None, spread=200):
+    # Cambia un dígito, agrega una letra a un identificador o inserta un
+    # espacio: ediciones de un carácter que dejan el programa válido. Con
+    # `near`, la edición cae a menos de `spread` caracteres de esa posición,
+    # como al escribir en el editor.
+    while True:
+        if near is None:
+            offset = random.randrange(len(source))
+        else:
+            offset = min(max(0, near + random.randint(-spread, spread)), len(source) - 1)
+        character = source[offset]
+        kind = random.random()
+        if character.isdigit() and kind < 0.4:
+            return offset, 1, str((int(character) + 1) % 10)
+        if character == 'x' and kind < 0.7:
+            return offset + 1, 0, 'z'
+        if character == ' ':
+            return offset, 0, ' '
+
+def main():
+    parser = argparse.ArgumentParser(description='Reanálisis incremental vs. análisis completo')
+    parser.add_argument('--lines', nargs='+', type=int, default=[2000, 20000])
+    parser.add_argument('--edits', type=int, default=500)
+    parser.add_argument('--check', action='store_true', help='compara cada resultado con un análisis completo')
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'lines':>7} {'edits':>7} {'full (ms)':>10} {'mean (ms)':>10} {'p50 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'max (ms)':>9}")
+    for lines, placement in itertools.product(args.lines, ['local', 'random']):
+        source = make_program(lines)
+        start = time.perf_counter()
+        stream = lex_stream(source)
+        program = Parser(stream).parse()
+        full = time.perf_counter() - start
+
+        # 'local': ediciones cercanas entre sí (escribir en un lugar del
+        # código); 'random': cada edición en cualquier parte del programa
+        cursor = len(source) // 2
+        times = []
+        for _ in range(args.edits):
+            near = cursor if placement == 'local' else None
+            offset, deleted, inserted = one_char_edit(stream.source, near)
+            cursor = offset
+            start = time.perf_counter()
+            program = reparse(program, stream, offset, deleted, inserted)
+            times.append(time.perf_counter() - start)
+            if args.check and program.to_dict() != Parser(lex_stream(stream.source)).parse().to_dict():
+                raise SystemExit('reparse diverged from a full parse')
+
+        times.sort()
+        mean = sum(times) / len(times)
+        print(f'{len(stream.line_index):>7} {placement:>7} {full * 1000:>10.1f} {mean * 1000:>10.3f} '
+              f'{times[len(times) // 2] * 1000:>9.3f} {times[len(times) * 99 // 100] * 1000:>9.3f} '
+              f'{times[-1] * 1000:>9.3f}')
+
+if __name__ == '__main__':
+    main()
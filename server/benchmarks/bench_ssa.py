@@ -0,0 +1,49 @@
+import argparse
+
+from compiler.ir_executor import IRExecutor, load
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from compiler.semantic_translator import SemanticTranslator
+from compiler.ssa import instruction_count, optimize_ir
+from .bench_optimizer import PROGRAMS
+from .common import SAMPLE_PROGRAM, best_of
+
+DEFAULT_ITERATIONS = [10000]
+
+CORPUS = {**PROGRAMS, 'sample': SAMPLE_PROGRAM}
+
+def run(loaded):
+    return IRExecutor().run(loaded)
+
+# Cuádruplos de SemanticTranslator antes y después de compiler.ssa, y tiempo
+# de ejecutarlos en IRExecutor (ya cargados). La salida de los dos tiene que
+# ser la misma: si no, el benchmark se detiene
+def main():
+    parser = argparse.ArgumentParser(description='Tamaño y tiempo del IR con y sin compiler.ssa')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(CORPUS), default=list(CORPUS))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'program':>11} {'iterations':>10} {'before':>7} {'after':>6} {'removed':>8} {'optimize (ms)':>14} "
+          f"{'original (ms)':>14} {'optimized (ms)':>15} {'speedup':>8}")
+    total_before = total_after = 0
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = CORPUS[name].replace('{n}', str(iterations))
+            ir_code = SemanticTranslator().translate(Parser(lex_stream(code)).parse())
+            optimize_time, optimized = best_of(optimize_ir, ir_code, repeat=args.repeat)
+            before, after = instruction_count(ir_code), instruction_count(optimized)
+            total_before += before
+            total_after += after
+            original_time, expected = best_of(run, load(ir_code), repeat=args.repeat)
+            optimized_time, output = best_of(run, load(optimized), repeat=args.repeat)
+            if output != expected:
+                raise SystemExit(f'{name}: output differs after optimizing')
+            print(f'{name:>11} {iterations:>10} {before:>7} {after:>6} {1 - after / before:>8.0%} '
+                  f'{optimize_time * 1000:>14.1f} {original_time * 1000:>14.1f} {optimized_time * 1000:>15.1f} '
+                  f'{original_time / optimized_time:>7.2f}x')
+    print(f'total: {total_before} -> {total_after} instructions ({1 - total_after / total_before:.0%} fewer)')
+
+if __name__ == '__main__':
+    main()
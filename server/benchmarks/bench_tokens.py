@@ -0,0 +1,55 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from compiler.lexer import lex, lex_bytes, lex_stream
+from .common import format_size, make_source, parse_size
+
+DEFAULT_SIZES = ['64KB', '1MB', '8MB']
+
+def measure(func, source):
+    gc.collect()
+    collections = sum(stat['collections'] for stat in gc.get_stats())
+    tracemalloc.start()
+    start = time.perf_counter()
+    tokens = func(source)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections
+    return tokens, elapsed, current, peak, collections
+
+def main():
+    parser = argparse.ArgumentParser(description='Memoria de la lista de dicts frente a TokenStream')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'format':>12} {'tokens':>9} {'retained':>10} {'peak':>10} "
+          f"{'B/token':>8} {'gc runs':>8} {'seconds':>8}")
+    for size_text in args.sizes:
+        source = make_source(parse_size(size_text))
+        size = len(source.encode('utf-8'))
+        retained = {}
+        for name, func in (('dict list', lex), ('TokenStream', lex_stream)):
+            tokens, elapsed, current, peak, collections = measure(func, source)
+            retained[name] = current
+            print(f'{format_size(size):>8} {name:>12} {len(tokens):>9} {format_size(current):>10} '
+                  f'{format_size(peak):>10} {current / len(tokens):>8.1f} {collections:>8} '
+                  f'{elapsed:>8.3f}')
+            del tokens
+        print(f"{'':>8} {'reduction':>12} {retained['dict list'] / retained['TokenStream']:>9.1f}x")
+
+        # Entrada como bytes UTF-8: decodificar a str antes de analizar
+        # frente a analizar los bytes directamente con lex_bytes()
+        data = source.encode('utf-8')
+        for name, func in (('decode+lex', lambda raw: lex_stream(raw.decode('utf-8'))),
+                           ('lex_bytes', lex_bytes)):
+            tokens, elapsed, current, peak, collections = measure(func, data)
+            print(f'{format_size(size):>8} {name:>12} {len(tokens):>9} {format_size(current):>10} '
+                  f'{format_size(peak):>10} {current / len(tokens):>8.1f} {collections:>8} '
+                  f'{elapsed:>8.3f}')
+            del tokens
+
+if __name__ == '__main__':
+    main()
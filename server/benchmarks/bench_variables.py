@@ -0,0 +1,122 @@
+import argparse
+
+from compiler.interpreter import ClosureInterpreter, Interpreter
+from compiler.lexer import lex_stream
+from compiler.parser import Parser
+from compiler.resolver import resolve
+from .common import best_of
+
+DEFAULT_ITERATIONS = [10000, 100000]
+
+# Ciclos cuyo cuerpo casi solo lee y escribe variables; {n} es el número de
+# vueltas
+PROGRAMS = {
+    'counters': '''main {
+    nombre i = 0;
+    nombre a = 0;
+    nombre b = 0;
+    nombre c = 0;
+    nombre d = 0;
+    tour_eiffel (i < {n}) {
+        a = b;
+        b = c;
+        c = d;
+        d = a;
+        i = i + 1;
+    }
+    afficher(a);
+}
+''',
+    'sums': '''main {
+    nombre i = 0;
+    crêpe x = 1;
+    crêpe y = 2;
+    crêpe z = 3;
+    crêpe w = 0;
+    tour_eiffel (i < {n}) {
+        w = x + y + z + w - x - y - z + i;
+        x = y;
+        y = z;
+        z = x;
+        i = i + 1;
+    }
+    afficher(w);
+}
+''',
+    'fibonacci': '''main {
+    nombre i = 0;
+    crêpe a = 0;
+    crêpe b = 1;
+    crêpe t = 0;
+    tour_eiffel (i < {n}) {
+        t = a + b;
+        a = b;
+        b = t - a * 0.5;
+        i = i + 1;
+    }
+    afficher(b);
+}
+''',
+}
+
+class NameInterpreter(Interpreter):
+    # Interpreter con las variables en un dict por nombre, como antes del
+    # paso de resolución, para comparar
+    def evaluate_program(self, node):
+        self.variables = {}
+        results = []
+        for statement in node.body:
+            result = self.evaluate(statement)
+            if result is not None:
+                results.append(str(result))
+        return '\n'.join(results)
+
+    def evaluate_variable_declaration(self, node):
+        if node.value is not None:
+            self.variables[node.name] = self.evaluate(node.value)
+        else:
+            self.variables[node.name] = 0 if node.var_type == 'INT' else 0.0
+
+    def evaluate_assignment(self, node):
+        if node.name not in self.variables:
+            raise RuntimeError(f"Cannot assign to undefined variable: {node.name}")
+        self.variables[node.name] = self.evaluate(node.value)
+
+    def evaluate_identifier(self, node):
+        if node.name not in self.variables:
+            raise RuntimeError(f"Undefined variable: {node.name}")
+        return self.variables[node.name]
+
+def run_names(program):
+    return NameInterpreter().evaluate(program)
+
+def run_slots(program):
+    return Interpreter().evaluate(program)
+
+def run_closures(program):
+    return ClosureInterpreter().evaluate(program)
+
+def main():
+    parser = argparse.ArgumentParser(description='Variables por nombre (dict) frente a ranuras resueltas')
+    parser.add_argument('--iterations', nargs='+', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--programs', nargs='+', choices=list(PROGRAMS), default=list(PROGRAMS))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'program':>10} {'iterations':>10} {'resolve (ms)':>12} {'names (ms)':>10} "
+          f"{'slots (ms)':>10} {'speedup':>8} {'closures (ms)':>13}")
+    for name in args.programs:
+        for iterations in args.iterations:
+            code = PROGRAMS[name].replace('{n}', str(iterations))
+            program = Parser(lex_stream(code)).parse()
+            resolving, _ = best_of(resolve, program, repeat=args.repeat)
+            names, expected = best_of(run_names, program, repeat=args.repeat)
+            slots, output = best_of(run_slots, program, repeat=args.repeat)
+            closures, closures_output = best_of(run_closures, program, repeat=args.repeat)
+            if output != expected or closures_output != expected:
+                raise SystemExit(f'{name}: output differs')
+            print(f'{name:>10} {iterations:>10} {resolving * 1000:>12.3f} {names * 1000:>10.1f} '
+                  f'{slots * 1000:>10.1f} {names / slots:>7.2f}x {closures * 1000:>13.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import time
+
+SAMPLE_PROGRAM = '''main {
+    nombre x = 10;
+    crêpe y = 2.5;  # comentario
+    tour_eiffel (x > 0) {
+        macaron (x == 5) {
+            afficher("cinq");
+        } autre {
+            afficher(x * y + 1);
+        }
+        x = x - 1;
+    }
+}
+'''
+
+def parse_size(text):
+    units = {'KB': 1024, 'MB': 1024 * 1024}
+    text = text.upper()
+    for suffix, factor in units.items():
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+def format_size(size):
+    if size >= 1024 * 1024:
+        return f'{size / (1024 * 1024):.1f}MB'
+    if size >= 1024:
+        return f'{size / 1024:.1f}KB'
+    return f'{size}B'
+
+def make_source(size, unit=SAMPLE_PROGRAM):
+    copies = max(1, size // len(unit))
+    return unit * copies
+
+def best_of(func, *args, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
@@ -0,0 +1,304 @@
+from array import array
+
+from . import ast_nodes
+
+# AST plano ("arena"): los nodos viven en arreglos paralelos y cada nodo es un
+# entero. Para cada nodo se guarda su tipo, un operador y hasta tres campos
+# enteros cuyo significado depende del tipo (hijos, constantes o listas):
+#
+#   program               first = lista del cuerpo
+#   variable_declaration  operator = INT/FLOAT, first = nombre, second = valor o -1
+#   assignment            first = nombre, second = valor
+#   binary_operation      operator, first = izquierdo, second = derecho
+#   unary_operation       operator, first = operando
+#   number / string       first = constante
+#   identifier            first = nombre
+#   print                 first = expresión
+#   if_statement          first = condición, second = lista consecuente,
+#                         third = lista alternativa o -1
+#   while_loop            first = condición, second = lista del cuerpo
+#   read                  first = nombre
+#
+# Nombres, números y cadenas van a `constants` (sin repetidos). Las listas de
+# sentencias son rangos de `links`. Los hijos siempre se crean antes que el
+# padre, así que un nodo tiene un ID mayor que todos sus descendientes.
+
+NODE_TYPES = [
+    'program', 'variable_declaration', 'assignment', 'binary_operation',
+    'unary_operation', 'number', 'string', 'identifier', 'print',
+    'if_statement', 'while_loop', 'read',
+]
+(PROGRAM, VARIABLE_DECLARATION, ASSIGNMENT, BINARY_OPERATION, UNARY_OPERATION,
+ NUMBER, STRING, IDENTIFIER, PRINT, IF_STATEMENT, WHILE_LOOP, READ) = range(len(NODE_TYPES))
+
+OPERATORS = [
+    None, 'PLUS', 'MINUS', 'MULT', 'DIV', 'GT', 'LT', 'EQ', 'NE', 'LE', 'GE',
+    'AND', 'OR', 'INT', 'FLOAT',
+]
+OPERATOR_CODES = {name: code for code, name in enumerate(OPERATORS)}
+
+
+class ASTArena:
+    def __init__(self):
+        self.kinds = array('B')
+        self.operators = array('B')
+        self.first = array('i')
+        self.second = array('i')
+        self.third = array('i')
+        self.constants = []
+        self._constant_ids = {}
+        self.list_starts = array('i')
+        self.list_sizes = array('i')
+        self.links = array('i')
+        self.root = -1
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def nbytes(self):
+        # Memoria de los arreglos (sin contar las constantes)
+        arrays = (self.kinds, self.operators, self.first, self.second, self.third,
+                  self.list_starts, self.list_sizes, self.links)
+        return sum(len(values) * values.itemsize for values in arrays)
+
+    def add(self, kind, operator=None, first=-1, second=-1, third=-1):
+        self.kinds.append(kind)
+        self.operators.append(OPERATOR_CODES[operator])
+        self.first.append(first)
+        self.second.append(second)
+        self.third.append(third)
+        return len(self.kinds) - 1
+
+    def constant(self, value):
+        # repr distingue 1 de 1.0 y 0.0 de -0.0
+        key = (type(value), repr(value))
+        index = self._constant_ids.get(key)
+        if index is None:
+            index = self._constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def statement_list(self, statements):
+        self.list_starts.append(len(self.links))
+        self.list_sizes.append(len(statements))
+        self.links.extend(statements)
+        return len(self.list_starts) - 1
+
+    def statements(self, list_id):
+        start = self.list_starts[list_id]
+        return self.links[start:start + self.list_sizes[list_id]]
+
+    # Constructores con los mismos nombres y argumentos que las clases de
+    # ast_nodes, para usar el arena como `build` de Parser y LALRParser
+
+    def Program(self, body):
+        self.root = self.add(PROGRAM, None, self.statement_list(body))
+        return self.root
+
+    def VariableDeclaration(self, var_type, name, value=None):
+        return self.add(VARIABLE_DECLARATION, var_type, self.constant(name),
+                        -1 if value is None else value)
+
+    def Assignment(self, name, value):
+        return self.add(ASSIGNMENT, None, self.constant(name), value)
+
+    def BinaryOperation(self, operator, left, right):
+        return self.add(BINARY_OPERATION, operator, left, right)
+
+    def UnaryOperation(self, operator, operand):
+        return self.add(UNARY_OPERATION, operator, operand)
+
+    def Number(self, value):
+        return self.add(NUMBER, None, self.constant(value))
+
+    def String(self, value):
+        return self.add(STRING, None, self.constant(value))
+
+    def Identifier(self, name):
+        return self.add(IDENTIFIER, None, self.constant(name))
+
+    def Print(self, expression):
+        return self.add(PRINT, None, expression)
+
+    def IfStatement(self, condition, consequent, alternate=None):
+        return self.add(IF_STATEMENT, None, condition, self.statement_list(consequent),
+                        -1 if alternate is None else self.statement_list(alternate))
+
+    def WhileLoop(self, condition, body):
+        return self.add(WHILE_LOOP, None, condition, self.statement_list(body))
+
+    def Read(self, variable):
+        return self.add(READ, None, self.constant(variable))
+
+    @classmethod
+    def from_ast(cls, program):
+        # Copia un AST de objetos (ast_nodes) al arena, en postorden y sin
+        # recursión
+        arena = cls()
+        results = []
+        stack = [(program, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(_children(node)))
+                continue
+            count = len(_children(node))
+            children = results[len(results) - count:]
+            del results[len(results) - count:]
+            results.append(_rebuild(arena, node, iter(children)))
+        return arena
+
+    def to_dict(self, node=None):
+        # Mismo resultado que ast_nodes.*.to_dict(), sin recursión: como los
+        # hijos tienen IDs menores, basta recorrer los nodos en orden
+        node = self.root if node is None else node
+        kinds, operators = self.kinds, self.operators
+        first, second, third = self.first, self.second, self.third
+        constants = self.constants
+        list_starts, list_sizes, links = self.list_starts, self.list_sizes, self.links
+        built = {}
+
+        def statements(list_id):
+            start = list_starts[list_id]
+            return [built.pop(child) for child in links[start:start + list_sizes[list_id]]]
+
+        # La raíz contiene a todos los nodos: no hace falta buscar su inicio
+        lowest = 0 if node == self.root else _first_descendant(self, node)
+        for index in range(lowest, node + 1):
+            kind = kinds[index]
+            if kind == BINARY_OPERATION:
+                right = built.pop(second[index])
+                value = {
+                    'type': 'binary_operation',
+                    'operator': OPERATORS[operators[index]],
+                    'left': built.pop(first[index]),
+                    'right': right
+                }
+            elif kind == NUMBER or kind == STRING:
+                value = {'type': NODE_TYPES[kind], 'value': constants[first[index]]}
+            elif kind == IDENTIFIER:
+                value = {'type': 'identifier', 'name': constants[first[index]]}
+            elif kind == UNARY_OPERATION:
+                value = {
+                    'type': 'unary_operation',
+                    'operator': OPERATORS[operators[index]],
+                    'operand': built.pop(first[index])
+                }
+            elif kind == ASSIGNMENT:
+                value = {
+                    'type': 'assignment',
+                    'name': constants[first[index]],
+                    'value': built.pop(second[index])
+                }
+            elif kind == VARIABLE_DECLARATION:
+                value = {
+                    'type': 'variable_declaration',
+                    'var_type': OPERATORS[operators[index]],
+                    'name': constants[first[index]],
+                    'value': built.pop(second[index]) if second[index] >= 0 else None
+                }
+            elif kind == PRINT:
+                value = {'type': 'print', 'expression': built.pop(first[index])}
+            elif kind == READ:
+                value = {'type': 'read', 'variable': constants[first[index]]}
+            elif kind == IF_STATEMENT:
+                alternate = statements(third[index]) if third[index] >= 0 else None
+                value = {
+                    'type': 'if_statement',
+                    'condition': built.pop(first[index]),
+                    'consequent': statements(second[index]),
+                    'alternate': alternate or None
+                }
+            elif kind == WHILE_LOOP:
+                body = statements(second[index])
+                value = {
+                    'type': 'while_loop',
+                    'condition': built.pop(first[index]),
+                    'body': body
+                }
+            else:
+                value = {'type': 'program', 'body': statements(first[index])}
+            built[index] = value
+        return built[node]
+
+
+def _first_descendant(arena, node):
+    # Menor ID del subárbol de `node` (los descendientes son contiguos y
+    # anteriores a él, salvo huecos de nodos descartados: basta el mínimo)
+    lowest = node
+    stack = [node]
+    first, second, third, kinds = arena.first, arena.second, arena.third, arena.kinds
+    while stack:
+        index = stack.pop()
+        lowest = min(lowest, index)
+        kind = kinds[index]
+        if kind in (BINARY_OPERATION, ASSIGNMENT, VARIABLE_DECLARATION):
+            children = [first[index], second[index]] if kind == BINARY_OPERATION else [second[index]]
+        elif kind in (UNARY_OPERATION, PRINT):
+            children = [first[index]]
+        elif kind == IF_STATEMENT:
+            children = [first[index]] + list(arena.statements(second[index]))
+            if third[index] >= 0:
+                children += arena.statements(third[index])
+        elif kind == WHILE_LOOP:
+            children = [first[index]] + list(arena.statements(second[index]))
+        elif kind == PROGRAM:
+            children = list(arena.statements(first[index]))
+        else:
+            children = []
+        stack.extend(child for child in children if child >= 0)
+    return lowest
+
+
+def _children(node):
+    # Hijos de un nodo de ast_nodes en el orden en que Parser los crea
+    if isinstance(node, ast_nodes.Program):
+        return list(node.body)
+    if isinstance(node, ast_nodes.VariableDeclaration):
+        return [node.value] if node.value is not None else []
+    if isinstance(node, ast_nodes.Assignment):
+        return [node.value]
+    if isinstance(node, ast_nodes.BinaryOperation):
+        return [node.left, node.right]
+    if isinstance(node, ast_nodes.UnaryOperation):
+        return [node.operand]
+    if isinstance(node, ast_nodes.Print):
+        return [node.expression]
+    if isinstance(node, ast_nodes.IfStatement):
+        return [node.condition] + list(node.consequent) + list(node.alternate or [])
+    if isinstance(node, ast_nodes.WhileLoop):
+        return [node.condition] + list(node.body)
+    return []
+
+
+def _rebuild(arena, node, children):
+    if isinstance(node, ast_nodes.Program):
+        return arena.Program(list(children))
+    if isinstance(node, ast_nodes.VariableDeclaration):
+        return arena.VariableDeclaration(node.var_type, node.name, next(children, None))
+    if isinstance(node, ast_nodes.Assignment):
+        return arena.Assignment(node.name, next(children))
+    if isinstance(node, ast_nodes.BinaryOperation):
+        return arena.BinaryOperation(node.operator, next(children), next(children))
+    if isinstance(node, ast_nodes.UnaryOperation):
+        return arena.UnaryOperation(node.operator, next(children))
+    if isinstance(node, ast_nodes.Number):
+        return arena.Number(node.value)
+    if isinstance(node, ast_nodes.String):
+        return arena.String(node.value)
+    if isinstance(node, ast_nodes.Identifier):
+        return arena.Identifier(node.name)
+    if isinstance(node, ast_nodes.Print):
+        return arena.Print(next(children))
+    if isinstance(node, ast_nodes.IfStatement):
+        condition = next(children)
+        consequent = [next(children) for _ in node.consequent]
+        alternate = [next(children) for _ in node.alternate] if node.alternate is not None else None
+        return arena.IfStatement(condition, consequent, alternate)
+    if isinstance(node, ast_nodes.WhileLoop):
+        condition = next(children)
+        return arena.WhileLoop(condition, list(children))
+    if isinstance(node, ast_nodes.Read):
+        return arena.Read(node.variable)
+    raise TypeError(f"Unknown node: {type(node).__name__}")
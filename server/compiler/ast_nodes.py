@@ -1,8 +1,32 @@
+from .tokens import OffsetArray
+
 class ASTNode:
+    # `slot` (en los nodos que nombran una variable) y `concat` (en
+    # BinaryOperation) los llena compiler.resolver y no forman parte de
+    # to_dict()
+    __slots__ = ()
+
     def to_dict(self):
         raise NotImplementedError
 
+class Block(list):
+    # Sentencias de un bloque '{ ... }'. Guarda además los rangos de tokens
+    # que ocupa cada sentencia, para el análisis incremental: `open` es el
+    # índice de la '{' relativo al inicio de la sentencia dueña del bloque
+    # (o del programa), y `starts`, `ends` y `close` (la '}') son relativos
+    # a la '{'. Así una edición solo desplaza los rangos de su propio bloque.
+    __slots__ = ('open', 'close', 'starts', 'ends')
+
+    def __init__(self, statements=(), open=0):
+        super().__init__(statements)
+        self.open = open
+        self.close = 0
+        self.starts = OffsetArray()
+        self.ends = OffsetArray()
+
 class Program(ASTNode):
+    __slots__ = ('body',)
+
     def __init__(self, body):
         self.body = body
     
@@ -13,10 +37,13 @@ class Program(ASTNode):
         }
 
 class VariableDeclaration(ASTNode):
+    __slots__ = ('var_type', 'name', 'value', 'slot')
+
     def __init__(self, var_type, name, value=None):
         self.var_type = var_type
         self.name = name
         self.value = value
+        self.slot = None
     
     def to_dict(self):
         return {
@@ -27,9 +54,12 @@ class VariableDeclaration(ASTNode):
         }
 
 class Assignment(ASTNode):
+    __slots__ = ('name', 'value', 'slot')
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.slot = None
     
     def to_dict(self):
         return {
@@ -39,10 +69,13 @@ class Assignment(ASTNode):
         }
 
 class BinaryOperation(ASTNode):
+    __slots__ = ('operator', 'left', 'right', 'concat')
+
     def __init__(self, operator, left, right):
         self.operator = operator
         self.left = left
         self.right = right
+        self.concat = False
     
     def to_dict(self):
         return {
@@ -52,7 +85,23 @@ class BinaryOperation(ASTNode):
             'right': self.right.to_dict()
         }
 
+class UnaryOperation(ASTNode):
+    __slots__ = ('operator', 'operand')
+
+    def __init__(self, operator, operand):
+        self.operator = operator
+        self.operand = operand
+    
+    def to_dict(self):
+        return {
+            'type': 'unary_operation',
+            'operator': self.operator,
+            'operand': self.operand.to_dict()
+        }
+
 class Number(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
     
@@ -63,6 +112,8 @@ class Number(ASTNode):
         }
 
 class String(ASTNode):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
     
@@ -73,8 +124,11 @@ class String(ASTNode):
         }
 
 class Identifier(ASTNode):
+    __slots__ = ('name', 'slot')
+
     def __init__(self, name):
         self.name = name
+        self.slot = None
     
     def to_dict(self):
         return {
@@ -83,6 +137,8 @@ class Identifier(ASTNode):
         }
 
 class Print(ASTNode):
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
     
@@ -93,6 +149,8 @@ class Print(ASTNode):
         }
 
 class IfStatement(ASTNode):
+    __slots__ = ('condition', 'consequent', 'alternate')
+
     def __init__(self, condition, consequent, alternate=None):
         self.condition = condition
         self.consequent = consequent
@@ -107,6 +165,8 @@ class IfStatement(ASTNode):
         }
 
 class WhileLoop(ASTNode):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -119,8 +179,11 @@ class WhileLoop(ASTNode):
         }
 
 class Read(ASTNode):
+    __slots__ = ('variable', 'slot')
+
     def __init__(self, variable):
         self.variable = variable
+        self.slot = None
     
     def to_dict(self):
         return {
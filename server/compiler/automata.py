@@ -1,4 +1,5 @@
 from graphviz import Digraph
+from .lalr import get_tables
 
 class AutomataVisualizer:
     def __init__(self):
@@ -74,15 +75,23 @@ Gramática del Lenguaje (BNF):
 <while_statement>::= tour_eiffel '(' <condition> ')' <block>
 <read_statement>::= lire '(' <id> ')' ';'
 <print_statement>::= afficher '(' <expression> ')' ';'
-<condition>     ::= <expression> (<rel_op> <expression>)?
-<expression>    ::= <term> (('+' | '-') <term>)*
-<term>          ::= <factor> (('*' | '/') <factor>)*
-<factor>        ::= <id> | <const> | '(' <expression> ')'
+<condition>     ::= <expression>
+<expression>    ::= <and_expr> ('||' <and_expr>)*
+<and_expr>      ::= <comparison> ('&&' <comparison>)*
+<comparison>    ::= <arith_expr> (<rel_op> <arith_expr>)*
+<arith_expr>    ::= <term> (('+' | '-') <term>)*
+<term>          ::= <unary> (('*' | '/') <unary>)*
+<unary>         ::= '-' <unary> | <factor>
+<factor>        ::= <id> | <const> | <string> | '(' <expression> ')'
 <rel_op>        ::= '==' | '!=' | '<' | '>' | '<=' | '>='
 <id>            ::= [a-zA-Z_][a-zA-Z0-9_]*
 <const>         ::= <integer_const> | <float_const>
 """
 
+    def get_parse_tables(self):
+        # Tablas LALR(1) generadas a partir de compiler/grammar.py
+        return get_tables().describe()
+
     def get_token_types(self):
         return {
             'Palabras Reservadas': [
@@ -0,0 +1,101 @@
+import time
+
+# Límites de una ejecución. Todos son opcionales (None = sin límite):
+#
+#   max_iterations  vueltas de ciclos, sumando todos los tour_eiffel
+#   max_seconds     tiempo de reloj desde start()
+#   max_output      caracteres de salida (lo aplican los destinos de
+#                   compiler.output, que reciben el límite al crearse)
+#   max_variables   ranuras de variables del programa resuelto
+#   max_strings     caracteres de las cadenas que construye `+`, sumando
+#                   todas las de más de STRING_CHECK caracteres
+#
+# Los motores no consultan el presupuesto en cada nodo: las vueltas se cuentan
+# en una variable local y se cargan con spend() cada `interval` vueltas y al
+# terminar el ciclo (o el programa), así que un límite se nota a lo más
+# `interval` vueltas tarde. Como
+# el lenguaje no tiene funciones, todo programa que no termina pasa por un
+# ciclo.
+#
+# Eso no basta con las cadenas: `s = s + s` duplica la memoria y el tiempo en
+# cada vuelta, y unas pocas vueltas (menos que `interval`) llegan a gigabytes.
+# Por eso, con presupuesto, los `+` que pueden unir dos cadenas (los marca
+# compiler.resolver) usan la suma de adder(), que carga cada cadena larga que
+# produce con grow(); grow() además mira el reloj. Las cadenas que ya existen
+# se cargaron al crearse, así que max_strings acota también la memoria que
+# ocupan. `+` es la única operación que alarga una cadena: los números son
+# float y `cadena * float` es un error.
+
+# Unidad de cada límite en el mensaje de error
+BUDGET_UNITS = {
+    'iterations': 'iterations',
+    'time': 'seconds',
+    'output': 'characters',
+    'variables': 'variables',
+    'strings': 'characters',
+}
+
+# Largo desde el que una cadena creada con `+` se carga al presupuesto
+STRING_CHECK = 4096
+
+
+class BudgetExceeded(RuntimeError):
+    def __init__(self, budget, limit):
+        super().__init__(f"{budget.capitalize()} limit exceeded: {limit} {BUDGET_UNITS[budget]}")
+        self.budget = budget
+        self.limit = limit
+
+    def to_dict(self):
+        return {'error': str(self), 'budget': self.budget, 'limit': self.limit}
+
+
+class Budget:
+    # Hasta 256 los enteros ya existen en CPython: contar una tanda con
+    # range(interval) no crea objetos
+    CHECK_INTERVAL = 256
+
+    def __init__(self, max_iterations=None, max_seconds=None, max_output=None, max_variables=None,
+                 max_strings=None, interval=CHECK_INTERVAL):
+        self.max_iterations = max_iterations
+        self.max_seconds = max_seconds
+        self.max_output = max_output
+        self.max_variables = max_variables
+        self.max_strings = max_strings
+        self.interval = interval
+        self.iterations = 0
+        self.characters = 0
+        self.deadline = None
+
+    def start(self, variables=0):
+        if self.max_variables is not None and variables > self.max_variables:
+            raise BudgetExceeded('variables', self.max_variables)
+        self.iterations = 0
+        self.characters = 0
+        if self.max_seconds is not None:
+            self.deadline = time.monotonic() + self.max_seconds
+
+    def spend(self, iterations):
+        self.iterations += iterations
+        if self.max_iterations is not None and self.iterations > self.max_iterations:
+            raise BudgetExceeded('iterations', self.max_iterations)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded('time', self.max_seconds)
+
+    def grow(self, size):
+        # Carga una cadena de `size` caracteres recién creada
+        self.characters += size
+        if self.max_strings is not None and self.characters > self.max_strings:
+            raise BudgetExceeded('strings', self.max_strings)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceeded('time', self.max_seconds)
+
+    def adder(self):
+        # operator.add que carga las cadenas largas que produce
+        grow = self.grow
+
+        def add(x, y):
+            result = x + y
+            if type(result) is str and len(result) > STRING_CHECK:
+                grow(len(result))
+            return result
+        return add
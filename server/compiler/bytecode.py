@@ -0,0 +1,410 @@
+from array import array
+
+from .ast_nodes import (
+    Program, VariableDeclaration, Assignment, BinaryOperation, UnaryOperation,
+    Number, String, Identifier, Print, IfStatement, WhileLoop, Read,
+)
+from .inputs import ConsoleInput
+from .interpreter import OPERATOR_FUNCTIONS
+from .output import OutputBuffer
+from .resolver import resolve
+
+# Código de bytes para una máquina de pila, en un array('i'): cada instrucción
+# es su código de operación seguido de sus argumentos (OPERANDS dice cuántos).
+# Los argumentos son índices en la tabla de constantes, en la de nombres, en
+# BINARY_OPERATORS o, en los saltos, la posición absoluta de destino (ya
+# resuelta al compilar). Las variables viven en ranuras, una por nombre.
+#
+#   LOAD_CONST k            apila constants[k]
+#   LOAD_NAME n             apila la variable n (error si no está definida)
+#   STORE_NAME n            desapila y guarda en la variable n
+#   CHECK_ASSIGN n          error si la variable n no está definida
+#   BINARY_OP o             desapila b y a, apila BINARY_OPERATORS[o](a, b)
+#   NEGATE                  cambia el signo del tope
+#   TO_BOOL                 convierte el tope a booleano
+#   JUMP t                  salta a t
+#   LOOP t                  salta a t, el inicio de un ciclo (cuenta la
+#                           vuelta si hay presupuesto)
+#   POP_JUMP_IF_FALSE t     desapila y salta a t si es falso
+#   POP_JUMP_IF_TRUE t      desapila y salta a t si es verdadero
+#   PRINT                   desapila y agrega su texto a la salida
+#   READ n                  lee la variable n de la entrada
+#   RAISE k                 error de ejecución con el mensaje constants[k]
+#
+# Superinstrucciones para las formas más comunes dentro de los ciclos (cada
+# una equivale a la secuencia indicada, con una sola vuelta del despacho):
+#
+#   NAME_CONST_OP n k o     LOAD_NAME n, LOAD_CONST k, BINARY_OP o
+#   NAME_NAME_OP n m o      LOAD_NAME n, LOAD_NAME m, BINARY_OP o
+#   JUMP_UNLESS n k o t     NAME_CONST_OP n k o, POP_JUMP_IF_FALSE t
+
+OPCODES = [
+    'LOAD_CONST', 'LOAD_NAME', 'STORE_NAME', 'CHECK_ASSIGN', 'BINARY_OP', 'NEGATE',
+    'TO_BOOL', 'JUMP', 'POP_JUMP_IF_FALSE', 'POP_JUMP_IF_TRUE', 'PRINT', 'READ', 'RAISE',
+    'NAME_CONST_OP', 'NAME_NAME_OP', 'JUMP_UNLESS', 'LOOP',
+]
+(LOAD_CONST, LOAD_NAME, STORE_NAME, CHECK_ASSIGN, BINARY_OP, NEGATE, TO_BOOL, JUMP,
+ POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE, PRINT, READ, RAISE,
+ NAME_CONST_OP, NAME_NAME_OP, JUMP_UNLESS, LOOP) = range(len(OPCODES))
+
+OPERANDS = [1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 0, 1, 1, 3, 3, 4, 1]
+
+# Significado de cada argumento para el desensamblador: constante, nombre,
+# operador o destino de salto
+OPERAND_KINDS = {
+    LOAD_CONST: 'k', LOAD_NAME: 'n', STORE_NAME: 'n', CHECK_ASSIGN: 'n', BINARY_OP: 'o',
+    JUMP: 't', POP_JUMP_IF_FALSE: 't', POP_JUMP_IF_TRUE: 't', READ: 'n', RAISE: 'k',
+    NAME_CONST_OP: 'nko', NAME_NAME_OP: 'nno', JUMP_UNLESS: 'nkot', LOOP: 't',
+}
+
+# Operadores binarios (sin && ni ||, que se compilan como saltos). CONCAT es
+# un `+` que puede unir cadenas (`concat`, de compiler.resolver): con
+# presupuesto, la VM usa ahí la suma que carga las cadenas largas
+# (compiler.budget)
+BINARY_OPERATORS = list(OPERATOR_FUNCTIONS) + ['CONCAT']
+BINARY_FUNCTIONS = [OPERATOR_FUNCTIONS[name] for name in OPERATOR_FUNCTIONS] + [OPERATOR_FUNCTIONS['PLUS']]
+CONCAT = BINARY_OPERATORS.index('CONCAT')
+
+# Valor de las ranuras de variables aún no declaradas
+UNDEFINED = object()
+
+
+def operator_index(node):
+    # Índice en BINARY_OPERATORS del operador de un BinaryOperation
+    return CONCAT if node.concat else BINARY_OPERATORS.index(node.operator)
+
+
+class Bytecode:
+    def __init__(self):
+        self.code = array('i')
+        self.constants = []
+        self.names = []
+        self._constant_ids = {}
+        self._name_ids = {}
+
+    def instructions(self):
+        # (posición, código, argumentos) de cada instrucción
+        code = self.code
+        position = 0
+        while position < len(code):
+            opcode = code[position]
+            end = position + 1 + OPERANDS[opcode]
+            yield position, opcode, code[position + 1:end]
+            position = end
+
+    def __len__(self):
+        return sum(1 for _ in self.instructions())
+
+    def emit(self, opcode, *arguments):
+        self.code.append(opcode)
+        self.code.extend(arguments)
+        return len(self.code) - 1 - len(arguments)
+
+    def patch(self, position, target):
+        # El destino de un salto es siempre su último argumento
+        self.code[position + OPERANDS[self.code[position]]] = target
+
+    def constant(self, value):
+        # repr distingue 1 de 1.0 y 0.0 de -0.0
+        key = (type(value), repr(value))
+        index = self._constant_ids.get(key)
+        if index is None:
+            index = self._constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def name(self, name):
+        index = self._name_ids.get(name)
+        if index is None:
+            index = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def disassemble(self):
+        # Una línea por instrucción: '>>' si es destino de un salto, posición,
+        # operación y argumentos con su significado
+        instructions = list(self.instructions())
+        targets = {arguments[-1] for _, opcode, arguments in instructions
+                   if OPERAND_KINDS.get(opcode, '').endswith('t')}
+        lines = []
+        for position, opcode, arguments in instructions:
+            details = []
+            for kind, argument in zip(OPERAND_KINDS.get(opcode, ''), arguments):
+                if kind == 'k':
+                    details.append(f'{argument} ({self.constants[argument]!r})')
+                elif kind == 'n':
+                    details.append(f'{argument} ({self.names[argument]})')
+                elif kind == 'o':
+                    details.append(f'{argument} ({BINARY_OPERATORS[argument]})')
+                else:
+                    details.append(f'-> {argument}')
+            marker = '>>' if position in targets else '  '
+            lines.append(f"{marker} {position:>5} {OPCODES[opcode]:<18} {', '.join(details)}".rstrip())
+        return '\n'.join(lines)
+
+
+# Método de BytecodeCompiler que compila cada clase de nodo
+COMPILERS = {
+    Program: 'compile_program',
+    VariableDeclaration: 'compile_variable_declaration',
+    Assignment: 'compile_assignment',
+    BinaryOperation: 'compile_binary_operation',
+    UnaryOperation: 'compile_unary_operation',
+    Number: 'compile_constant',
+    String: 'compile_constant',
+    Identifier: 'compile_identifier',
+    Print: 'compile_print',
+    IfStatement: 'compile_if_statement',
+    WhileLoop: 'compile_while_loop',
+    Read: 'compile_read',
+}
+
+
+class BytecodeCompiler:
+    def __init__(self):
+        self.bytecode = Bytecode()
+        self.compilers = {cls: getattr(self, name) for cls, name in COMPILERS.items()}
+
+    def compile(self, node):
+        method = self.compilers.get(type(node))
+        if method is None:
+            self.raise_error(f"Unknown node type: {type(node).__name__}")
+        else:
+            method(node)
+        return self.bytecode
+
+    def emit(self, opcode, *arguments):
+        return self.bytecode.emit(opcode, *arguments)
+
+    def here(self):
+        return len(self.bytecode.code)
+
+    def raise_error(self, message):
+        # Los errores se producen al ejecutar, como en Interpreter
+        self.emit(RAISE, self.bytecode.constant(message))
+
+    def simple_operation(self, node):
+        # Argumentos de NAME_CONST_OP (n, k, o) si `node` es `variable op
+        # constante`, o None
+        if (type(node) is BinaryOperation and type(node.left) is Identifier
+                and type(node.right) is Number and node.operator in OPERATOR_FUNCTIONS):
+            return (self.bytecode.name(node.left.name), self.bytecode.constant(node.right.value),
+                    operator_index(node))
+        return None
+
+    def compile_condition(self, node):
+        # Evalúa la condición y salta si es falsa; devuelve la posición del
+        # salto para fijar su destino después
+        operation = self.simple_operation(node)
+        if operation is not None:
+            return self.emit(JUMP_UNLESS, *operation, 0)
+        self.compile(node)
+        return self.emit(POP_JUMP_IF_FALSE, 0)
+
+    def compile_block(self, statements):
+        for statement in statements:
+            self.compile(statement)
+
+    def compile_program(self, node):
+        self.compile_block(node.body)
+
+    def compile_variable_declaration(self, node):
+        if node.value is not None:
+            self.compile(node.value)
+        else:
+            self.emit(LOAD_CONST, self.bytecode.constant(0 if node.var_type == 'INT' else 0.0))
+        self.emit(STORE_NAME, self.bytecode.name(node.name))
+
+    def compile_assignment(self, node):
+        name = self.bytecode.name(node.name)
+        # Se comprueba la variable antes de evaluar el valor, como Interpreter
+        self.emit(CHECK_ASSIGN, name)
+        self.compile(node.value)
+        self.emit(STORE_NAME, name)
+
+    def compile_binary_operation(self, node):
+        operation = self.simple_operation(node)
+        if operation is not None:
+            self.emit(NAME_CONST_OP, *operation)
+            return
+        if (type(node.left) is Identifier and type(node.right) is Identifier
+                and node.operator in OPERATOR_FUNCTIONS):
+            self.emit(NAME_NAME_OP, self.bytecode.name(node.left.name),
+                      self.bytecode.name(node.right.name), operator_index(node))
+            return
+        self.compile(node.left)
+        if node.operator in ('AND', 'OR'):
+            # a && b: si a es falso, False; si no, bool(b) (y al revés para ||)
+            jump = self.emit(POP_JUMP_IF_FALSE if node.operator == 'AND' else POP_JUMP_IF_TRUE, 0)
+            self.compile(node.right)
+            self.emit(TO_BOOL)
+            end = self.emit(JUMP, 0)
+            self.bytecode.patch(jump, self.here())
+            self.emit(LOAD_CONST, self.bytecode.constant(node.operator == 'OR'))
+            self.bytecode.patch(end, self.here())
+            return
+        self.compile(node.right)
+        if node.operator not in OPERATOR_FUNCTIONS:
+            self.raise_error(f"Unknown operator: {node.operator}")
+            return
+        self.emit(BINARY_OP, operator_index(node))
+
+    def compile_unary_operation(self, node):
+        self.compile(node.operand)
+        if node.operator == 'MINUS':
+            self.emit(NEGATE)
+        else:
+            self.raise_error(f"Unknown operator: {node.operator}")
+
+    def compile_constant(self, node):
+        self.emit(LOAD_CONST, self.bytecode.constant(node.value))
+
+    def compile_identifier(self, node):
+        self.emit(LOAD_NAME, self.bytecode.name(node.name))
+
+    def compile_print(self, node):
+        self.compile(node.expression)
+        self.emit(PRINT)
+
+    def compile_if_statement(self, node):
+        jump = self.compile_condition(node.condition)
+        self.compile_block(node.consequent)
+        if node.alternate:
+            end = self.emit(JUMP, 0)
+            self.bytecode.patch(jump, self.here())
+            self.compile_block(node.alternate)
+            self.bytecode.patch(end, self.here())
+        else:
+            self.bytecode.patch(jump, self.here())
+
+    def compile_while_loop(self, node):
+        start = self.here()
+        jump = self.compile_condition(node.condition)
+        self.compile_block(node.body)
+        self.emit(LOOP, start)
+        self.bytecode.patch(jump, self.here())
+
+    def compile_read(self, node):
+        self.emit(READ, self.bytecode.name(node.variable))
+
+
+class BytecodeVM:
+    # Ejecuta el código de BytecodeCompiler con la misma salida y los mismos
+    # errores que Interpreter
+    def __init__(self, output=None, budget=None, inputs=None):
+        self.output = OutputBuffer() if output is None else output
+        self.budget = budget
+        self.inputs = ConsoleInput() if inputs is None else inputs
+
+    def evaluate(self, node):
+        # Los nombres sin declarar se reportan antes de ejecutar, como en
+        # Interpreter
+        resolve(node)
+        return self.run(BytecodeCompiler().compile(node))
+
+    def run(self, bytecode):
+        # Se despacha sobre una copia en lista: leer de un array('i') crea un
+        # int nuevo en cada acceso
+        code = bytecode.code.tolist()
+        constants = bytecode.constants
+        names = bytecode.names
+        functions = BINARY_FUNCTIONS
+        values = [UNDEFINED] * len(names)
+        write = self.output.write
+        stack = []
+        push, pop = stack.append, stack.pop
+        budget = self.budget
+        # Vueltas de ciclo que faltan para cargar una tanda al presupuesto.
+        # Sin presupuesto empieza en -1 y nunca llega a 0
+        countdown = -1
+        if budget is not None:
+            budget.start(len(names))
+            interval = countdown = budget.interval
+            functions = list(BINARY_FUNCTIONS)
+            functions[CONCAT] = budget.adder()
+        pc = 0
+        end = len(code)
+        # Las operaciones van ordenadas de más a menos frecuentes en ciclos
+        while pc < end:
+            opcode = code[pc]
+            if opcode == NAME_CONST_OP:
+                value = values[code[pc + 1]]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[code[pc + 1]]}")
+                push(functions[code[pc + 3]](value, constants[code[pc + 2]]))
+                pc += 4
+            elif opcode == STORE_NAME:
+                values[code[pc + 1]] = pop()
+                pc += 2
+            elif opcode == CHECK_ASSIGN:
+                if values[code[pc + 1]] is UNDEFINED:
+                    raise RuntimeError(f"Cannot assign to undefined variable: {names[code[pc + 1]]}")
+                pc += 2
+            elif opcode == LOAD_NAME:
+                value = values[code[pc + 1]]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[code[pc + 1]]}")
+                push(value)
+                pc += 2
+            elif opcode == JUMP_UNLESS:
+                value = values[code[pc + 1]]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[code[pc + 1]]}")
+                if functions[code[pc + 3]](value, constants[code[pc + 2]]):
+                    pc += 5
+                else:
+                    pc = code[pc + 4]
+            elif opcode == LOOP:
+                pc = code[pc + 1]
+                countdown -= 1
+                if not countdown:
+                    budget.spend(interval)
+                    countdown = interval
+            elif opcode == JUMP:
+                pc = code[pc + 1]
+            elif opcode == NAME_NAME_OP:
+                left = values[code[pc + 1]]
+                if left is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[code[pc + 1]]}")
+                right = values[code[pc + 2]]
+                if right is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[code[pc + 2]]}")
+                push(functions[code[pc + 3]](left, right))
+                pc += 4
+            elif opcode == BINARY_OP:
+                right = pop()
+                stack[-1] = functions[code[pc + 1]](stack[-1], right)
+                pc += 2
+            elif opcode == LOAD_CONST:
+                push(constants[code[pc + 1]])
+                pc += 2
+            elif opcode == POP_JUMP_IF_FALSE:
+                pc = pc + 2 if pop() else code[pc + 1]
+            elif opcode == POP_JUMP_IF_TRUE:
+                pc = code[pc + 1] if pop() else pc + 2
+            elif opcode == TO_BOOL:
+                stack[-1] = bool(stack[-1])
+                pc += 1
+            elif opcode == NEGATE:
+                stack[-1] = -stack[-1]
+                pc += 1
+            elif opcode == PRINT:
+                write(str(pop()))
+                pc += 1
+            elif opcode == READ:
+                name = names[code[pc + 1]]
+                if values[code[pc + 1]] is UNDEFINED:
+                    raise RuntimeError(f"Cannot read into undefined variable: {name}")
+                value = self.inputs.read(name)
+                try:
+                    values[code[pc + 1]] = float(value)
+                except ValueError:
+                    values[code[pc + 1]] = value
+                pc += 2
+            elif opcode == RAISE:
+                raise RuntimeError(constants[code[pc + 1]])
+            else:
+                raise RuntimeError(f"Unknown opcode: {opcode}")
+        if budget is not None:
+            budget.spend(interval - countdown)
+        return self.output.getvalue()
@@ -0,0 +1,383 @@
+import re
+
+from .ir_executor import is_literal
+from .semantic_translator import COMPARISONS, RELATIONAL_BRANCHES, TEMP_NAME, temp_name
+
+# Grafo de flujo de control de los cuádruplos de SemanticTranslator. Un bloque
+# básico empieza en un LABEL (varios LABEL seguidos son el mismo bloque) o
+# después de un salto, y termina en un GOTO, en un IF_FALSE o antes del
+# siguiente LABEL. El salto final no queda entre las instrucciones del bloque:
+# se guarda en `kind`, `condition` y `successors`.
+#
+# Un salto relacional (IF_FALSE_LT a b L) entra al grafo como la comparación
+# en un temporal nuevo y un IF_FALSE sobre él, así que `condition` siempre es
+# un solo nombre. to_code() los vuelve a unir si nadie más lee el temporal.
+#
+# Los bloques se guardan en el orden del código y to_code() los vuelve a
+# escribir en ese orden, así que un salto hacia atrás sigue siendo el regreso
+# de un ciclo (el LOOP de compiler.ir_executor, que cuenta las vueltas).
+#
+# El bloque 0 es siempre una entrada vacía sin predecesores.
+
+# Cómo termina cada bloque
+FALL = 'fall'        # sigue en successors[0], el bloque siguiente (si hay)
+GOTO = 'goto'        # salta a successors[0]
+BRANCH = 'branch'    # IF_FALSE: successors[0] (el bloque siguiente) si la
+                     # condición es verdadera, successors[1] si es falsa
+
+LABEL_NAME = re.compile(r'L(\d+)$')
+
+
+def operands(instruction):
+    # Nombres que lee un cuádruplo (sin literales)
+    op = instruction['op']
+    if op == 'DECLARE':
+        args = (instruction['arg2'],)
+    elif op in ('LABEL', 'GOTO', 'READ'):
+        args = ()
+    else:
+        args = (instruction['arg1'], instruction['arg2'])
+    return [arg for arg in args if not is_literal(arg)]
+
+
+def written(instruction):
+    # Nombre que escribe un cuádruplo, o None
+    if instruction['op'] in ('LABEL', 'GOTO', 'IF_FALSE', 'PRINT') or instruction['op'] in RELATIONAL_BRANCHES:
+        return None
+    return instruction['result']
+
+
+class BasicBlock:
+    def __init__(self, index, labels=()):
+        self.index = index
+        self.labels = list(labels)
+        self.instructions = []
+        self.kind = FALL
+        self.condition = None
+        self.target = None
+        self.successors = []
+        self.predecessors = []
+        # Funciones phi al inicio del bloque, con un argumento por predecesor
+        # (solo en compiler.ssa)
+        self.phis = []
+
+
+class ControlFlowGraph:
+    def __init__(self):
+        self.blocks = [BasicBlock(0)]
+        self.label_counter = 0
+        self.temp_counter = 0
+
+    @property
+    def entry(self):
+        return self.blocks[0]
+
+    def new_label(self):
+        self.label_counter += 1
+        return f'L{self.label_counter}'
+
+    def new_temp(self):
+        self.temp_counter += 1
+        return temp_name(self.temp_counter)
+
+    def renumber(self):
+        for index, block in enumerate(self.blocks):
+            block.index = index
+
+    def reverse_postorder(self):
+        # Bloques alcanzables desde la entrada, cada uno antes que sus
+        # sucesores (salvo por las aristas de regreso de los ciclos)
+        order = []
+        visited = {self.entry}
+        work = [(self.entry, iter(self.entry.successors))]
+        while work:
+            block, successors = work[-1]
+            for successor in successors:
+                if successor not in visited:
+                    visited.add(successor)
+                    work.append((successor, iter(successor.successors)))
+                    break
+            else:
+                work.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def dominators(self):
+        # Dominador inmediato de cada bloque alcanzable (la entrada es su
+        # propio dominador), con el algoritmo de Cooper, Harvey y Kennedy
+        order = self.reverse_postorder()
+        number = {block: index for index, block in enumerate(order)}
+        idom = {order[0]: order[0]}
+
+        def intersect(a, b):
+            while a is not b:
+                while number[a] > number[b]:
+                    a = idom[a]
+                while number[b] > number[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                new = None
+                for predecessor in block.predecessors:
+                    if predecessor in idom:
+                        new = predecessor if new is None else intersect(predecessor, new)
+                if idom.get(block) is not new:
+                    idom[block] = new
+                    changed = True
+        return idom
+
+    def remove_edge(self, block, successor):
+        # Quita una arista y el argumento que le corresponde en las phi
+        block.successors.remove(successor)
+        index = successor.predecessors.index(block)
+        del successor.predecessors[index]
+        for phi in successor.phis:
+            del phi.args[index]
+
+    def remove_blocks(self, keep):
+        # Deja solo los bloques de `keep`, sin las aristas de los demás
+        for block in self.blocks:
+            if block in keep:
+                for successor in [successor for successor in block.successors if successor not in keep]:
+                    block.successors.remove(successor)
+                for index in reversed(range(len(block.predecessors))):
+                    if block.predecessors[index] not in keep:
+                        del block.predecessors[index]
+                        for phi in block.phis:
+                            del phi.args[index]
+        self.blocks = [block for block in self.blocks if block in keep]
+        self.renumber()
+
+    def split_edge(self, block, index):
+        # Bloque vacío en la arista block → block.successors[index], justo
+        # antes del sucesor; devuelve el bloque nuevo
+        successor = block.successors[index]
+        middle = BasicBlock(0)
+        middle.successors = [successor]
+        middle.predecessors = [block]
+        block.successors[index] = middle
+        successor.predecessors[successor.predecessors.index(block)] = middle
+        self.blocks.insert(self.blocks.index(successor), middle)
+        self.renumber()
+        return middle
+
+    def to_code(self):
+        # Cuádruplos de los bloques en su orden, solo con las etiquetas y los
+        # saltos que hacen falta
+        blocks = self.blocks
+        position = {block: index for index, block in enumerate(blocks)}
+
+        def destination(source, block):
+            # Un salto a un bloque vacío que solo continúa en otro puede ir
+            # directo al otro, si sigue siendo un salto hacia adelante
+            while (not block.instructions and block.kind != BRANCH and block.successors
+                   and position[block.successors[0]] > position[source]):
+                block = block.successors[0]
+            return block
+
+        # Nombres que algún bloque lee antes de escribirlos: cualquier otro
+        # está muerto al salir del bloque donde se escribe
+        exposed = set()
+        for block in blocks:
+            local = set()
+            for instruction in block.instructions:
+                exposed.update(name for name in operands(instruction) if name not in local)
+                local.add(written(instruction))
+            if block.kind == BRANCH and block.condition not in local:
+                exposed.add(block.condition)
+
+        jumps = []
+        # Cuántas instrucciones de cada bloque se escriben: sin la comparación
+        # que se une con el salto
+        sizes = []
+        for index, block in enumerate(blocks):
+            following = blocks[index + 1] if index + 1 < len(blocks) else None
+            block_jumps = []
+            size = len(block.instructions)
+            if block.kind == BRANCH:
+                target = destination(block, block.successors[1])
+                last = block.instructions[-1] if block.instructions else None
+                if (last is not None and last['op'] in COMPARISONS and last['result'] == block.condition
+                        and TEMP_NAME.match(block.condition) and block.condition not in exposed):
+                    block_jumps.append((f"IF_FALSE_{last['op']}", last['arg1'], last['arg2'], target))
+                    size -= 1
+                else:
+                    block_jumps.append(('IF_FALSE', block.condition, None, target))
+            if block.successors and block.successors[0] is not following:
+                block_jumps.append(('GOTO', None, None, destination(block, block.successors[0])))
+            jumps.append(block_jumps)
+            sizes.append(size)
+
+        labels = {}
+        for block_jumps in jumps:
+            for _, _, _, target in block_jumps:
+                if target not in labels:
+                    labels[target] = target.labels[0] if target.labels else None
+        for target in labels:
+            if labels[target] is None:
+                labels[target] = self.new_label()
+
+        code = []
+        for block, block_jumps, size in zip(blocks, jumps, sizes):
+            if block in labels:
+                code.append({'op': 'LABEL', 'arg1': None, 'arg2': None, 'result': labels[block]})
+            code.extend(block.instructions[:size])
+            for op, arg1, arg2, target in block_jumps:
+                code.append({'op': op, 'arg1': arg1, 'arg2': arg2, 'result': labels[target]})
+        return code
+
+
+def build_cfg(ir_code):
+    cfg = ControlFlowGraph()
+    block = cfg.entry
+    labels = {}
+    for instruction in ir_code:
+        for name in (instruction['arg1'], instruction['arg2'], instruction['result']):
+            match = TEMP_NAME.match(name) if isinstance(name, str) else None
+            if match:
+                cfg.temp_counter = max(cfg.temp_counter, int(match.group(1)))
+    for instruction in ir_code:
+        op = instruction['op']
+        if op == 'LABEL':
+            label = instruction['result']
+            match = LABEL_NAME.match(label)
+            if match:
+                cfg.label_counter = max(cfg.label_counter, int(match.group(1)))
+            # Un LABEL al inicio de un bloque vacío (que no sea la entrada) es
+            # otro nombre del mismo bloque
+            if block.instructions or block is cfg.entry:
+                block = BasicBlock(len(cfg.blocks))
+                cfg.blocks.append(block)
+            block.labels.append(label)
+            labels[label] = block
+        elif op == 'GOTO' or op == 'IF_FALSE':
+            block.kind = GOTO if op == 'GOTO' else BRANCH
+            block.condition = instruction['arg1']
+            block.target = instruction['result']
+            block = BasicBlock(len(cfg.blocks))
+            cfg.blocks.append(block)
+        elif op in RELATIONAL_BRANCHES:
+            condition = cfg.new_temp()
+            block.instructions.append({'op': RELATIONAL_BRANCHES[op], 'arg1': instruction['arg1'],
+                                       'arg2': instruction['arg2'], 'result': condition})
+            block.kind = BRANCH
+            block.condition = condition
+            block.target = instruction['result']
+            block = BasicBlock(len(cfg.blocks))
+            cfg.blocks.append(block)
+        else:
+            block.instructions.append(instruction)
+
+    blocks = cfg.blocks
+    for index, block in enumerate(blocks):
+        following = blocks[index + 1] if index + 1 < len(blocks) else None
+        if block.kind == GOTO:
+            block.successors = [labels[block.target]]
+        elif block.kind == BRANCH:
+            block.successors = [following, labels[block.target]]
+        elif following is not None:
+            block.successors = [following]
+        for successor in block.successors:
+            successor.predecessors.append(block)
+    return cfg
+
+
+def written_on_entry(cfg, writes):
+    # Nombres escritos en todo camino desde la entrada hasta el inicio de cada
+    # bloque, si `writes` es lo que escribe cada bloque. Lo escrito al entrar
+    # es lo escrito al salir de todos los predecesores (None mientras no se
+    # sabe: todo)
+    written_out = {}
+
+    def written_in(block):
+        if block is cfg.entry:
+            return set()
+        names = None
+        for predecessor in block.predecessors:
+            if predecessor in written_out:
+                names = set(written_out[predecessor]) if names is None else names & written_out[predecessor]
+        return names
+
+    changed = True
+    while changed:
+        changed = False
+        for block in cfg.blocks:
+            names = written_in(block)
+            if names is not None and written_out.get(block) != names | writes[block]:
+                written_out[block] = names | writes[block]
+                changed = True
+    return {block: written_in(block) or set() for block in cfg.blocks}
+
+
+def liveness(cfg):
+    # (vivos al entrar, vivos al salir) de cada bloque: los nombres que se
+    # pueden leer más adelante antes de volver a escribirse
+    uses = {}
+    kills = {}
+    for block in cfg.blocks:
+        read = uses[block] = set()
+        local = kills[block] = set()
+        for instruction in block.instructions:
+            read.update(name for name in operands(instruction) if name not in local)
+            name = written(instruction)
+            if name is not None:
+                local.add(name)
+        if block.kind == BRANCH and not is_literal(block.condition) and block.condition not in local:
+            read.add(block.condition)
+
+    live_in = {block: set(uses[block]) for block in cfg.blocks}
+    live_out = {block: set() for block in cfg.blocks}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(cfg.blocks):
+            out = set().union(*(live_in[successor] for successor in block.successors))
+            if out != live_out[block]:
+                live_out[block] = out
+                live_in[block] = uses[block] | (out - kills[block])
+                changed = True
+    return live_in, live_out
+
+
+def rename(instruction, names):
+    # Copia del cuádruplo con los nombres que lee y escribe cambiados según
+    # el diccionario `names` (los demás se quedan)
+    renamed = dict(instruction)
+    fields = ('arg2', 'result') if instruction['op'] == 'DECLARE' else ('arg1', 'arg2', 'result')
+    for field in fields:
+        if renamed[field] in names:
+            renamed[field] = names[renamed[field]]
+    return renamed
+
+
+def dominator_tree(idom):
+    # Hijos de cada bloque en el árbol de dominadores, en el orden del código
+    children = {block: [] for block in idom}
+    for block, parent in idom.items():
+        if block is not parent:
+            children[parent].append(block)
+    for blocks in children.values():
+        blocks.sort(key=lambda block: block.index)
+    return children
+
+
+def dominance_frontiers(idom):
+    # Frontera de dominancia de cada bloque: los bloques donde se juntan un
+    # camino que pasa por él y otro que no
+    frontiers = {block: [] for block in idom}
+    for block in idom:
+        predecessors = [predecessor for predecessor in block.predecessors if predecessor in idom]
+        if len(predecessors) < 2:
+            continue
+        for predecessor in predecessors:
+            runner = predecessor
+            while runner is not idom[block]:
+                if block not in frontiers[runner]:
+                    frontiers[runner].append(block)
+                runner = idom[runner]
+    return frontiers
@@ -1,3 +1,6 @@
+from .semantic_translator import RELATIONAL_BRANCHES
+
+
 class CodeGenerator:
     def __init__(self):
         self.code = []
@@ -22,12 +25,34 @@ class CodeGenerator:
                     f"{instruction['result']} = {instruction['arg1']} {op_map[op]} {instruction['arg2']}"
                 )
                 
+            elif op in ['GT', 'LT', 'EQ', 'NE', 'LE', 'GE', 'AND', 'OR']:
+                op_map = {
+                    'GT': '>', 'LT': '<', 'EQ': '==', 'NE': '!=', 'LE': '<=', 'GE': '>=',
+                    'AND': 'and', 'OR': 'or'
+                }
+                python_code.append(
+                    f"{instruction['result']} = {instruction['arg1']} {op_map[op]} {instruction['arg2']}"
+                )
+
+            elif op == 'NEG':
+                python_code.append(f"{instruction['result']} = -{instruction['arg1']}")
+
+            elif op == 'BOOL':
+                python_code.append(f"{instruction['result']} = bool({instruction['arg1']})")
+
             elif op == 'ASSIGN':
                 python_code.append(f"{instruction['result']} = {instruction['arg1']}")
                 
             elif op == 'IF_FALSE':
                 python_code.append(f"if not {instruction['arg1']}:")
                 python_code.append(f"    goto {instruction['result']}")
+
+            elif op in RELATIONAL_BRANCHES:
+                op_map = {'GT': '>', 'LT': '<', 'EQ': '==', 'NE': '!=', 'LE': '<=', 'GE': '>='}
+                python_code.append(
+                    f"if not {instruction['arg1']} {op_map[RELATIONAL_BRANCHES[op]]} {instruction['arg2']}:"
+                )
+                python_code.append(f"    goto {instruction['result']}")
                 
             elif op == 'GOTO':
                 python_code.append(f"goto {instruction['result']}")
@@ -38,4 +63,7 @@ class CodeGenerator:
             elif op == 'PRINT':
                 python_code.append(f"print({instruction['arg1']})")
 
+            elif op == 'READ':
+                python_code.append(f"{instruction['result']} = input()")
+
         return '\n'.join(python_code)
\ No newline at end of file
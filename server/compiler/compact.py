@@ -0,0 +1,197 @@
+from .arena import (
+    NODE_TYPES, OPERATORS, OPERATOR_CODES, PROGRAM, VARIABLE_DECLARATION, ASSIGNMENT,
+    BINARY_OPERATION, UNARY_OPERATION, NUMBER, STRING, IDENTIFIER, PRINT,
+    IF_STATEMENT, WHILE_LOOP, READ,
+)
+from .ast_nodes import (
+    Program, VariableDeclaration, Assignment, BinaryOperation, UnaryOperation,
+    Number, String, Identifier, Print, IfStatement, WhileLoop, Read,
+)
+
+# Formato compacto del AST para las respuestas JSON. En lugar de un objeto
+# anidado por nodo, todo el árbol es un arreglo de enteros en preorden: cada
+# nodo es un registro que empieza con su tipo (índice en `kinds`) seguido de
+# sus campos. Operadores y tipos de variable son índices en `operators`, los
+# hijos se indican con su distancia (> 0) desde el inicio del registro del
+# padre y los nombres y literales con su índice en `strings`, sin repetidos
+# (los números se guardan ahí con su tipo JSON):
+#
+#   program               n, hijo × n
+#   variable_declaration  tipo (en `operators`), nombre, valor o 0
+#   assignment            nombre, valor
+#   binary_operation      operador, izquierdo, derecho
+#   unary_operation       operador, operando
+#   number / string       literal
+#   identifier            nombre
+#   print                 expresión
+#   if_statement          condición, n, hijo × n, m (-1 sin autre), hijo × m
+#   while_loop            condición, n, hijo × n
+#   read                  nombre
+
+FORMAT = 'compact'
+VERSION = 1
+
+# Tamaño de los registros de longitud fija
+RECORD_SIZES = {
+    VARIABLE_DECLARATION: 4, ASSIGNMENT: 3, BINARY_OPERATION: 4, UNARY_OPERATION: 3,
+    NUMBER: 2, STRING: 2, IDENTIFIER: 2, PRINT: 2, READ: 2,
+}
+
+
+def encode(program):
+    # Una sola pasada sin recursión: la pila guarda cada nodo pendiente junto
+    # con la posición de su padre y la casilla donde va su distancia
+    nodes = []
+    strings = []
+    string_ids = {}
+
+    def string(value):
+        # repr distingue 1 de 1.0 y 0.0 de -0.0
+        key = (type(value), repr(value))
+        index = string_ids.get(key)
+        if index is None:
+            index = string_ids[key] = len(strings)
+            strings.append(value)
+        return index
+
+    def statements(body, pending):
+        # Reserva una casilla por sentencia; se agregan a `pending` en orden
+        slot = len(nodes) + 1
+        nodes.append(len(body))
+        nodes.extend([0] * len(body))
+        pending.extend(zip(body, range(slot, slot + len(body))))
+
+    stack = [(program, 0, -1)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node, parent, slot = pop()
+        position = len(nodes)
+        if slot >= 0:
+            nodes[slot] = position - parent
+        cls = type(node)
+        # Los hijos se apilan del último al primero para que salgan en orden
+        if cls is BinaryOperation:
+            nodes += (BINARY_OPERATION, OPERATOR_CODES[node.operator], 0, 0)
+            push((node.right, position, position + 3))
+            push((node.left, position, position + 2))
+        elif cls is Identifier:
+            nodes += (IDENTIFIER, string(node.name))
+        elif cls is Number:
+            nodes += (NUMBER, string(node.value))
+        elif cls is String:
+            nodes += (STRING, string(node.value))
+        elif cls is UnaryOperation:
+            nodes += (UNARY_OPERATION, OPERATOR_CODES[node.operator], 0)
+            push((node.operand, position, position + 2))
+        elif cls is Assignment:
+            nodes += (ASSIGNMENT, string(node.name), 0)
+            push((node.value, position, position + 2))
+        elif cls is VariableDeclaration:
+            nodes += (VARIABLE_DECLARATION, OPERATOR_CODES[node.var_type], string(node.name), 0)
+            if node.value is not None:
+                push((node.value, position, position + 3))
+        elif cls is Print:
+            nodes += (PRINT, 0)
+            push((node.expression, position, position + 1))
+        elif cls is Read:
+            nodes += (READ, string(node.variable))
+        else:
+            pending = []
+            if cls is IfStatement:
+                nodes += (IF_STATEMENT, 0)
+                pending.append((node.condition, position + 1))
+                statements(node.consequent, pending)
+                if node.alternate is None:
+                    nodes.append(-1)
+                else:
+                    statements(node.alternate, pending)
+            elif cls is WhileLoop:
+                nodes += (WHILE_LOOP, 0)
+                pending.append((node.condition, position + 1))
+                statements(node.body, pending)
+            elif cls is Program:
+                nodes.append(PROGRAM)
+                statements(node.body, pending)
+            else:
+                raise TypeError(f"Unknown node: {cls.__name__}")
+            stack.extend((child, position, child_slot) for child, child_slot in reversed(pending))
+
+    return {
+        'format': FORMAT,
+        'version': VERSION,
+        'kinds': NODE_TYPES,
+        'operators': OPERATORS,
+        'strings': strings,
+        'nodes': nodes,
+    }
+
+
+def decode(data):
+    # Decodificador de referencia: devuelve el AST de objetos (ast_nodes).
+    # Los hijos siempre están después del padre, así que basta ubicar el
+    # inicio de cada registro y construir los nodos del último al primero.
+    if data.get('format') != FORMAT or data.get('version') != VERSION:
+        raise ValueError(f"Unsupported AST format: {data.get('format')} {data.get('version')}")
+    kinds = [NODE_TYPES.index(kind) for kind in data['kinds']]
+    operators = data['operators']
+    strings = data['strings']
+    nodes = data['nodes']
+
+    starts = []
+    position = 0
+    while position < len(nodes):
+        starts.append(position)
+        kind = kinds[nodes[position]]
+        if kind == PROGRAM:
+            position += 2 + nodes[position + 1]
+        elif kind == IF_STATEMENT:
+            position += 3 + nodes[position + 2]
+            position += 1 + max(nodes[position], 0)
+        elif kind == WHILE_LOOP:
+            position += 3 + nodes[position + 2]
+        else:
+            position += RECORD_SIZES[kind]
+
+    built = {}
+
+    def child(position, offset):
+        return built.pop(position + offset)
+
+    def children(position, at):
+        return [child(position, nodes[at + 1 + index]) for index in range(nodes[at])], at + 1 + max(nodes[at], 0)
+
+    for position in reversed(starts):
+        kind = kinds[nodes[position]]
+        if kind == BINARY_OPERATION:
+            node = BinaryOperation(operators[nodes[position + 1]], child(position, nodes[position + 2]),
+                                   child(position, nodes[position + 3]))
+        elif kind == IDENTIFIER:
+            node = Identifier(strings[nodes[position + 1]])
+        elif kind == NUMBER:
+            node = Number(strings[nodes[position + 1]])
+        elif kind == STRING:
+            node = String(strings[nodes[position + 1]])
+        elif kind == UNARY_OPERATION:
+            node = UnaryOperation(operators[nodes[position + 1]], child(position, nodes[position + 2]))
+        elif kind == ASSIGNMENT:
+            node = Assignment(strings[nodes[position + 1]], child(position, nodes[position + 2]))
+        elif kind == VARIABLE_DECLARATION:
+            value = child(position, nodes[position + 3]) if nodes[position + 3] else None
+            node = VariableDeclaration(operators[nodes[position + 1]], strings[nodes[position + 2]], value)
+        elif kind == PRINT:
+            node = Print(child(position, nodes[position + 1]))
+        elif kind == READ:
+            node = Read(strings[nodes[position + 1]])
+        elif kind == IF_STATEMENT:
+            condition = child(position, nodes[position + 1])
+            consequent, at = children(position, position + 2)
+            alternate = children(position, at)[0] if nodes[at] >= 0 else None
+            node = IfStatement(condition, consequent, alternate)
+        elif kind == WHILE_LOOP:
+            condition = child(position, nodes[position + 1])
+            node = WhileLoop(condition, children(position, position + 2)[0])
+        else:
+            node = Program(children(position, position + 1)[0])
+        built[position] = node
+    return built[0]
+
@@ -0,0 +1,418 @@
+from .tokens import TOKEN_SPEC
+
+# Motor léxico basado en autómatas: TOKEN_SPEC -> NFA de Thompson ->
+# construcción de subconjuntos -> DFA minimizado, ejecutado como tabla.
+#
+# La alternancia de `re` elige la PRIMERA regla que coincide (no la más
+# larga), por eso `mainx` produce MAIN + ID. Para reproducirlo, al construir
+# el DFA se descartan los estados NFA de las reglas con menor prioridad que
+# una regla que ya aceptó. Cada regla de TOKEN_SPEC es "codiciosa = más
+# larga", así que el último estado de aceptación visitado decide el token.
+
+
+class RegexSyntaxError(ValueError):
+    pass
+
+
+# Predicados de caracteres con la misma semántica Unicode que `re` sobre str
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _is_digit(ch):
+    return ch.isdecimal()
+
+
+def _is_space(ch):
+    return ch.isspace()
+
+
+_ESCAPE_CLASSES = {
+    'd': ('digit', _is_digit),
+    'w': ('word', _is_word),
+    's': ('space', _is_space),
+}
+
+_ESCAPE_CHARS = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v', '0': '\0'}
+
+# Representantes de los caracteres no ASCII que no aparecen literalmente en
+# las reglas: para ellos solo importa si son dígito, alfanumérico u otro.
+_NON_ASCII_BUCKETS = [
+    ('٣', lambda ch: ch.isdecimal()),
+    ('é', lambda ch: ch.isalnum()),
+    ('€', lambda ch: True),
+]
+
+
+class CharSet:
+    def __init__(self, predicate, negated=False):
+        self.predicate = predicate
+        self.negated = negated
+
+    def __contains__(self, ch):
+        return self.predicate(ch) != self.negated
+
+
+def _literal(ch):
+    return CharSet(lambda c: c == ch)
+
+
+class _RegexParser:
+    # Subconjunto de la sintaxis de `re`: |, (...), (?:...), *, +, ?, ., [...]
+    # y los escapes \d, \w, \s, \n, \t. Devuelve un árbol de tuplas.
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pos = 0
+        self.literals = set()
+
+    def peek(self):
+        if self.pos < len(self.pattern):
+            return self.pattern[self.pos]
+        return None
+
+    def next(self):
+        ch = self.peek()
+        if ch is None:
+            raise RegexSyntaxError(f"Unexpected end of pattern {self.pattern!r}")
+        self.pos += 1
+        return ch
+
+    def parse(self):
+        tree = self.parse_alternation()
+        if self.peek() is not None:
+            raise RegexSyntaxError(f"Unexpected {self.peek()!r} in pattern {self.pattern!r}")
+        return tree
+
+    def parse_alternation(self):
+        options = [self.parse_concatenation()]
+        while self.peek() == '|':
+            self.next()
+            options.append(self.parse_concatenation())
+        return options[0] if len(options) == 1 else ('alt', options)
+
+    def parse_concatenation(self):
+        items = []
+        while self.peek() not in (None, '|', ')'):
+            items.append(self.parse_repeat())
+        return ('cat', items)
+
+    def parse_repeat(self):
+        atom = self.parse_atom()
+        while self.peek() in ('*', '+', '?'):
+            atom = (self.next(), atom)
+        return atom
+
+    def parse_atom(self):
+        ch = self.next()
+        if ch == '(':
+            if self.pattern.startswith('?:', self.pos):
+                self.pos += 2
+            tree = self.parse_alternation()
+            if self.next() != ')':
+                raise RegexSyntaxError(f"Expected ')' in pattern {self.pattern!r}")
+            return tree
+        if ch == '[':
+            return ('set', self.parse_class())
+        if ch == '.':
+            return ('set', CharSet(lambda c: c == '\n', negated=True))
+        if ch == '\\':
+            return ('set', self.parse_escape())
+        if ch in '*+?':
+            raise RegexSyntaxError(f"Nothing to repeat in pattern {self.pattern!r}")
+        self.literals.add(ch)
+        return ('set', _literal(ch))
+
+    def parse_escape(self):
+        ch = self.next()
+        if ch in _ESCAPE_CLASSES:
+            return CharSet(_ESCAPE_CLASSES[ch][1])
+        ch = _ESCAPE_CHARS.get(ch, ch)
+        self.literals.add(ch)
+        return _literal(ch)
+
+    def parse_class(self):
+        negated = False
+        if self.peek() == '^':
+            self.next()
+            negated = True
+        members = []
+        first = True
+        while first or self.peek() != ']':
+            first = False
+            ch = self.next()
+            if ch == '\\':
+                escaped = self.next()
+                if escaped in _ESCAPE_CLASSES:
+                    members.append(_ESCAPE_CLASSES[escaped][1])
+                    continue
+                ch = _ESCAPE_CHARS.get(escaped, escaped)
+            if self.peek() == '-' and self.pattern[self.pos + 1:self.pos + 2] not in ('', ']'):
+                self.next()
+                high = self.next()
+                if high == '\\':
+                    high = _ESCAPE_CHARS.get(self.next(), self.pattern[self.pos - 1])
+                members.append(lambda c, lo=ch, hi=high: lo <= c <= hi)
+                self.literals.update((ch, high))
+            else:
+                members.append(lambda c, lit=ch: c == lit)
+                self.literals.add(ch)
+        self.next()
+        return CharSet(lambda c: any(member(c) for member in members), negated)
+
+
+class _NFA:
+    def __init__(self):
+        self.epsilon = []
+        self.moves = []
+        self.owner = []
+
+    def new_state(self, owner):
+        self.epsilon.append([])
+        self.moves.append([])
+        self.owner.append(owner)
+        return len(self.epsilon) - 1
+
+    def build(self, tree, owner):
+        # Construcción de Thompson; devuelve (inicio, fin) del fragmento
+        kind = tree[0]
+        if kind == 'set':
+            start, end = self.new_state(owner), self.new_state(owner)
+            self.moves[start].append((tree[1], end))
+            return start, end
+        if kind == 'cat':
+            start = end = self.new_state(owner)
+            for item in tree[1]:
+                item_start, item_end = self.build(item, owner)
+                self.epsilon[end].append(item_start)
+                end = item_end
+            return start, end
+        if kind == 'alt':
+            start, end = self.new_state(owner), self.new_state(owner)
+            for option in tree[1]:
+                option_start, option_end = self.build(option, owner)
+                self.epsilon[start].append(option_start)
+                self.epsilon[option_end].append(end)
+            return start, end
+        inner_start, inner_end = self.build(tree[1], owner)
+        start, end = self.new_state(owner), self.new_state(owner)
+        self.epsilon[start].append(inner_start)
+        self.epsilon[inner_end].append(end)
+        if kind in ('*', '?'):
+            self.epsilon[start].append(end)
+        if kind in ('*', '+'):
+            self.epsilon[inner_end].append(inner_start)
+        return start, end
+
+    def closure(self, states):
+        stack = list(states)
+        seen = set(states)
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+
+class TokenDFA:
+    def __init__(self, spec=TOKEN_SPEC):
+        self.names = [name for name, _ in spec]
+        nfa = _NFA()
+        start = nfa.new_state(-1)
+        finals = {}
+        literals = set()
+        for rule, (name, pattern) in enumerate(spec):
+            parser = _RegexParser(pattern)
+            tree = parser.parse()
+            literals |= parser.literals
+            rule_start, rule_end = nfa.build(tree, rule)
+            nfa.epsilon[start].append(rule_start)
+            finals[rule_end] = rule
+
+        self._build_alphabet(nfa, literals)
+        self._build_tables(nfa, start, finals)
+
+    def _build_alphabet(self, nfa, literals):
+        # Particiona el alfabeto en clases de equivalencia: dos caracteres
+        # comparten clase si ninguna transición del NFA los distingue.
+        charsets = []
+        for moves in nfa.moves:
+            for charset, _ in moves:
+                charsets.append(charset)
+
+        samples = [chr(code) for code in range(128)]
+        samples += sorted(ch for ch in literals if ord(ch) >= 128)
+        for rep, _ in _NON_ASCII_BUCKETS:
+            if rep in literals:
+                raise ValueError(f"Bucket representative {rep!r} is used as a literal")
+            samples.append(rep)
+
+        signatures = {}
+        self.sample_class = {}
+        for ch in samples:
+            signature = tuple(ch in charset for charset in charsets)
+            self.sample_class[ch] = signatures.setdefault(signature, len(signatures))
+        self.class_count = len(signatures)
+
+        self.ascii_classes = [self.sample_class[chr(code)] for code in range(128)]
+        self.extra_classes = {ch: self.sample_class[ch] for ch in literals if ord(ch) >= 128}
+        self.bucket_classes = [(test, self.sample_class[rep]) for rep, test in _NON_ASCII_BUCKETS]
+        self._charset_classes = {
+            id(charset): frozenset(
+                cls for ch, cls in self.sample_class.items() if ch in charset
+            )
+            for charset in charsets
+        }
+
+    def classify(self, ch):
+        code = ord(ch)
+        if code < 128:
+            return self.ascii_classes[code]
+        cls = self.extra_classes.get(ch)
+        if cls is not None:
+            return cls
+        for test, bucket in self.bucket_classes:
+            if test(ch):
+                return bucket
+
+    def _build_tables(self, nfa, start, finals):
+        def prune(states):
+            accepting = [finals[s] for s in states if s in finals]
+            if not accepting:
+                return frozenset(states), -1
+            rule = min(accepting)
+            return frozenset(s for s in states if nfa.owner[s] <= rule), rule
+
+        initial, initial_rule = prune(nfa.closure([start]))
+        index = {initial: 0}
+        accept = [initial_rule]
+        rows = []
+        pending = [initial]
+        while pending:
+            states = pending.pop(0)
+            row = []
+            for cls in range(self.class_count):
+                targets = [
+                    target
+                    for s in states
+                    for charset, target in nfa.moves[s]
+                    if cls in self._charset_classes[id(charset)]
+                ]
+                if not targets:
+                    row.append(-1)
+                    continue
+                target_set, rule = prune(nfa.closure(targets))
+                if target_set not in index:
+                    index[target_set] = len(accept)
+                    accept.append(rule)
+                    pending.append(target_set)
+                row.append(index[target_set])
+            rows.append(row)
+
+        self.subset_state_count = len(rows)
+        self.rows, self.accept = self._minimize(rows, accept)
+        self.state_count = len(self.rows)
+
+    def _minimize(self, rows, accept):
+        # Refinamiento de particiones de Moore; el estado muerto es -1
+        block = list(accept)
+        while True:
+            signatures = {}
+            refined = [
+                signatures.setdefault(
+                    (block[s], tuple(block[t] if t >= 0 else None for t in rows[s])),
+                    len(signatures),
+                )
+                for s in range(len(rows))
+            ]
+            if len(signatures) == len(set(block)):
+                block = refined
+                break
+            block = refined
+
+        # Renumera para que el estado inicial siga siendo 0
+        order = {}
+        for s in range(len(rows)):
+            order.setdefault(block[s], len(order))
+        new_rows = [None] * len(order)
+        new_accept = [-1] * len(order)
+        for s in range(len(rows)):
+            b = order[block[s]]
+            if new_rows[b] is None:
+                new_rows[b] = [order[block[t]] if t >= 0 else -1 for t in rows[s]]
+                new_accept[b] = accept[s]
+        return new_rows, new_accept
+
+    def class_table(self):
+        # Mapa para str.translate: carácter -> byte con su clase
+        dfa = self
+
+        class _Classes(dict):
+            def __missing__(self, code):
+                value = self[code] = dfa.classify(chr(code))
+                return value
+
+        table = _Classes()
+        table.update({code: cls for code, cls in enumerate(self.ascii_classes)})
+        return table
+
+    def scan(self, text, pos=0, endpos=None):
+        # Genera (regla, inicio, fin) como re.finditer sobre la alternancia:
+        # los caracteres que no coinciden con ninguna regla se saltan.
+        if endpos is None:
+            endpos = len(text)
+        classes = text[pos:endpos].translate(self._class_table).encode('latin-1')
+        table = self._flat_table
+        accept = self._flat_accept
+        dead = self._dead
+        offset = pos
+        n = len(classes)
+        pos = 0
+        while pos < n:
+            state = 0
+            i = pos
+            last_rule = -1
+            last_end = pos
+            while i < n:
+                state = table[state + classes[i]]
+                if state == dead:
+                    break
+                i += 1
+                rule = accept[state]
+                if rule >= 0:
+                    last_rule = rule
+                    last_end = i
+            if last_rule < 0:
+                pos += 1
+                continue
+            yield last_rule, pos + offset, last_end + offset
+            pos = last_end
+
+    def compile(self):
+        # Tabla plana con estados premultiplicados por el número de clases
+        width = self.class_count
+        dead = len(self.rows) * width
+        table = []
+        for row in self.rows:
+            table.extend(dead if t < 0 else t * width for t in row)
+        table.extend([dead] * width)
+        accept = [-1] * (dead + width)
+        for s, rule in enumerate(self.accept):
+            accept[s * width] = rule
+        self._flat_table = table
+        self._flat_accept = accept
+        self._dead = dead
+        self._class_table = self.class_table()
+        return self
+
+    def to_dict(self):
+        return {
+            'rules': self.names,
+            'states': self.state_count,
+            'classes': self.class_count,
+            'transitions': self.rows,
+            'accept': [self.names[r] if r >= 0 else None for r in self.accept],
+        }
+
+
+TOKEN_DFA = TokenDFA(TOKEN_SPEC).compile()
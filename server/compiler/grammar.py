@@ -0,0 +1,82 @@
+# Gramática del lenguaje en forma legible por máquina; es la misma que
+# describe AutomataVisualizer.get_grammar(). A partir de ella lalr.py genera
+# las tablas LALR(1) del analizador ascendente.
+#
+# Cada producción es (lado izquierdo, lado derecho, acción). Los símbolos en
+# mayúsculas son tipos de token de TOKEN_SPEC; el resto son no terminales.
+# La acción construye el valor del lado izquierdo: el primer elemento es el
+# constructor (una clase de ast_nodes o uno de 'pass', 'list', 'append',
+# 'number', 'string') y los siguientes sus argumentos, donde un entero es la
+# posición de un símbolo del lado derecho y una cadena es un valor literal.
+# El valor de un terminal es el texto del token.
+
+START_SYMBOL = 'program'
+
+GRAMMAR = [
+    ('program',     ['MAIN', 'LBRACE', 'statements', 'RBRACE'],   ['Program', 2]),
+
+    ('statements',  [],                                          ['list']),
+    ('statements',  ['statements', 'statement'],                 ['append', 0, 1]),
+
+    ('statement',   ['declaration'],                             ['pass', 0]),
+    ('statement',   ['assignment'],                              ['pass', 0]),
+    ('statement',   ['if_statement'],                            ['pass', 0]),
+    ('statement',   ['while_statement'],                         ['pass', 0]),
+    ('statement',   ['read_statement'],                          ['pass', 0]),
+    ('statement',   ['print_statement'],                         ['pass', 0]),
+
+    ('declaration', ['type', 'ID', 'PCOMMA'],                    ['VariableDeclaration', 0, 1]),
+    ('declaration', ['type', 'ID', 'ATTR', 'expression', 'PCOMMA'],
+                                                                 ['VariableDeclaration', 0, 1, 3]),
+    ('type',        ['INT'],                                     ['pass', 'INT']),
+    ('type',        ['FLOAT'],                                   ['pass', 'FLOAT']),
+
+    ('assignment',  ['ID', 'ATTR', 'expression', 'PCOMMA'],      ['Assignment', 0, 2]),
+
+    ('if_statement', ['IF', 'LBRACKET', 'expression', 'RBRACKET', 'LBRACE', 'statements', 'RBRACE'],
+                                                                 ['IfStatement', 2, 5]),
+    ('if_statement', ['IF', 'LBRACKET', 'expression', 'RBRACKET', 'LBRACE', 'statements', 'RBRACE',
+                      'ELSE', 'LBRACE', 'statements', 'RBRACE'],
+                                                                 ['IfStatement', 2, 5, 9]),
+
+    ('while_statement', ['WHILE', 'LBRACKET', 'expression', 'RBRACKET', 'LBRACE', 'statements', 'RBRACE'],
+                                                                 ['WhileLoop', 2, 5]),
+
+    ('read_statement',  ['READ', 'LBRACKET', 'ID', 'RBRACKET', 'PCOMMA'],  ['Read', 2]),
+    ('print_statement', ['PRINT', 'LBRACKET', 'expression', 'RBRACKET', 'PCOMMA'],
+                                                                 ['Print', 2]),
+
+    # Un nivel por precedencia, de menor a mayor (ver BINARY_PRECEDENCE)
+    ('expression',  ['or_expr'],                                 ['pass', 0]),
+
+    ('or_expr',     ['or_expr', 'OR', 'and_expr'],               ['BinaryOperation', 'OR', 0, 2]),
+    ('or_expr',     ['and_expr'],                                ['pass', 0]),
+
+    ('and_expr',    ['and_expr', 'AND', 'comparison'],           ['BinaryOperation', 'AND', 0, 2]),
+    ('and_expr',    ['comparison'],                              ['pass', 0]),
+
+    ('comparison',  ['comparison', 'EQ', 'arith_expr'],          ['BinaryOperation', 'EQ', 0, 2]),
+    ('comparison',  ['comparison', 'NE', 'arith_expr'],          ['BinaryOperation', 'NE', 0, 2]),
+    ('comparison',  ['comparison', 'LT', 'arith_expr'],          ['BinaryOperation', 'LT', 0, 2]),
+    ('comparison',  ['comparison', 'GT', 'arith_expr'],          ['BinaryOperation', 'GT', 0, 2]),
+    ('comparison',  ['comparison', 'LE', 'arith_expr'],          ['BinaryOperation', 'LE', 0, 2]),
+    ('comparison',  ['comparison', 'GE', 'arith_expr'],          ['BinaryOperation', 'GE', 0, 2]),
+    ('comparison',  ['arith_expr'],                              ['pass', 0]),
+
+    ('arith_expr',  ['arith_expr', 'PLUS', 'term'],              ['BinaryOperation', 'PLUS', 0, 2]),
+    ('arith_expr',  ['arith_expr', 'MINUS', 'term'],             ['BinaryOperation', 'MINUS', 0, 2]),
+    ('arith_expr',  ['term'],                                    ['pass', 0]),
+
+    ('term',        ['term', 'MULT', 'unary'],                   ['BinaryOperation', 'MULT', 0, 2]),
+    ('term',        ['term', 'DIV', 'unary'],                    ['BinaryOperation', 'DIV', 0, 2]),
+    ('term',        ['unary'],                                   ['pass', 0]),
+
+    ('unary',       ['MINUS', 'unary'],                          ['UnaryOperation', 'MINUS', 1]),
+    ('unary',       ['factor'],                                  ['pass', 0]),
+
+    ('factor',      ['ID'],                                      ['Identifier', 0]),
+    ('factor',      ['INTEGER_CONST'],                           ['number', 0]),
+    ('factor',      ['FLOAT_CONST'],                             ['number', 0]),
+    ('factor',      ['STRING'],                                  ['string', 0]),
+    ('factor',      ['LBRACKET', 'expression', 'RBRACKET'],      ['pass', 1]),
+]
@@ -0,0 +1,130 @@
+from .ast_nodes import Block, IfStatement, WhileLoop
+from .lexer import relex_span
+from .parser import Parser
+
+# Análisis sintáctico incremental. El AST que produce Parser guarda en cada
+# Block los rangos de tokens de sus sentencias (ver ast_nodes.Block). Tras una
+# edición, relex_span() dice qué tokens cambiaron; se busca el bloque más
+# interno que contiene el cambio sin tocar sus llaves y solo se vuelven a
+# analizar las sentencias de ese bloque que se solapan con él. Las demás se
+# reutilizan tal cual: sus rangos son relativos al bloque, así que basta
+# desplazar (de forma diferida, con OffsetArray) las posiciones posteriores
+# del bloque y las de cada bloque que lo contiene.
+#
+# Si el nuevo código ya no encaja en ese bloque (p. ej. se borró una llave)
+# se prueba con el bloque padre y, en último caso, se analiza todo de nuevo.
+
+
+def reparse(program, stream, offset: int, deleted: int, inserted: str):
+    # Aplica la edición al TokenStream `stream` (el del código de `program`)
+    # y devuelve el Program actualizado. `program` se modifica en el lugar
+    # salvo cuando hay que analizarlo completo; usar siempre el resultado.
+    first, old_end, new_end = relex_span(stream, offset, deleted, inserted)
+    delta = new_end - old_end
+
+    body = program.body
+    if isinstance(body, Block):
+        path = _enclosing_blocks(body, first, old_end)
+        for level in range(len(path) - 1, -1, -1):
+            block, block_open = path[level][:2]
+            if _reparse_block(block, block_open, stream, first, old_end, delta):
+                _shift_ancestors(path, level, delta)
+                return program
+
+    return Parser(stream).parse()
+
+
+def _blocks(node):
+    if isinstance(node, IfStatement):
+        if node.alternate is not None:
+            return [node.consequent, node.alternate]
+        return [node.consequent]
+    if isinstance(node, WhileLoop):
+        return [node.body]
+    return []
+
+
+def _enclosing_blocks(body, first, old_end):
+    # Bloques que contienen los tokens [first, old_end) sin incluir sus
+    # llaves, del más externo al más interno: (bloque, índice absoluto de su
+    # '{', posición de la sentencia dueña en el bloque padre)
+    path = []
+    block, block_open, index = body, body.open, None
+    while block_open < first and old_end <= block_open + block.close:
+        path.append((block, block_open, index))
+        index = block.ends.bisect_right(first - block_open)
+        if index == len(block):
+            break
+        start = block_open + block.starts[index]
+        if not (start <= first and old_end <= block_open + block.ends[index]):
+            break
+        for nested in _blocks(block[index]):
+            nested_open = start + nested.open
+            if nested_open < first and old_end <= nested_open + nested.close:
+                block, block_open = nested, nested_open
+                break
+        else:
+            break
+    return path
+
+
+def _reparse_block(block, block_open, stream, first, old_end, delta):
+    # Vuelve a analizar las sentencias de `block` afectadas por la edición.
+    # Devuelve False (sin modificar nada) si el resultado no encaja en el
+    # bloque.
+    starts, ends = block.starts, block.ends
+    first_changed = ends.bisect_right(first - block_open)
+    reused = starts.bisect_left(old_end - block_open)
+    position = block_open + (ends[first_changed - 1] if first_changed else 1)
+    close = block_open + block.close + delta
+
+    parser = Parser(stream[index] for index in range(position, len(stream)))
+    parser.current = position
+    statements = []
+    new_starts = []
+    new_ends = []
+    while True:
+        position = parser.current
+        while reused < len(block) and block_open + starts[reused] + delta < position:
+            reused += 1
+        # Se vuelve a sincronizar cuando el análisis llega al inicio
+        # (desplazado) de una sentencia anterior que no cambió
+        if reused < len(block) and block_open + starts[reused] + delta == position:
+            break
+        token = parser.peek()
+        if position > close or token is None:
+            return False
+        if token['type'] == 'RBRACE':
+            if position != close:
+                return False
+            break
+        try:
+            statement = parser.parse_statement()
+        except SyntaxError:
+            return False
+        if statement is not None:
+            statements.append(statement)
+            new_starts.append(position - block_open)
+            new_ends.append(parser.current - block_open)
+
+    block[first_changed:reused] = statements
+    starts.splice(first_changed, reused, new_starts, delta)
+    ends.splice(first_changed, reused, new_ends, delta)
+    block.close += delta
+    return True
+
+
+def _shift_ancestors(path, level, delta):
+    # La sentencia dueña de cada bloque de la ruta crece en `delta` tokens:
+    # se desplazan su fin, las sentencias que la siguen y la '}' del padre
+    if not delta:
+        return
+    for level in range(level, 0, -1):
+        block, _, index = path[level]
+        parent = path[level - 1][0]
+        owner = parent[index]
+        if isinstance(owner, IfStatement) and owner.alternate is not None and block is owner.consequent:
+            owner.alternate.open += delta
+        parent.ends.splice(index, index + 1, [parent.ends[index] + delta], delta)
+        parent.starts.splice(index + 1, index + 1, [], delta)
+        parent.close += delta
@@ -0,0 +1,38 @@
+# Fuentes de los valores que lee `lire`. Los motores llaman a read(nombre) y
+# convierten el texto a número si pueden, como siempre.
+#
+#   ConsoleInput    pide el valor en la terminal con input() (uso local)
+#   InputQueue      toma los valores de una lista; al acabarse lanza
+#                   InputRequired en lugar de esperar
+#
+# El lenguaje es determinista (la única entrada es `lire`), así que un
+# programa detenido por InputRequired se reanuda ejecutándolo otra vez desde
+# el inicio con las mismas entradas más las nuevas: llega al mismo punto con
+# el mismo estado y sigue. Ver compiler.output.ResumedOutput para no repetir
+# la salida ya entregada.
+
+
+class InputRequired(Exception):
+    # No es un RuntimeError: no es un error del programa sino una pausa
+    def __init__(self, name, consumed):
+        super().__init__(f"Input required for {name}")
+        self.name = name
+        self.consumed = consumed
+
+
+class ConsoleInput:
+    def read(self, name):
+        return input(f"Enter value for {name}: ")
+
+
+class InputQueue:
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.position = 0
+
+    def read(self, name):
+        if self.position == len(self.values):
+            raise InputRequired(name, self.position)
+        value = self.values[self.position]
+        self.position += 1
+        return value
@@ -1,109 +1,576 @@
+import operator
+
+from .arena import (
+    NODE_TYPES, OPERATORS, VARIABLE_DECLARATION, ASSIGNMENT, BINARY_OPERATION,
+    UNARY_OPERATION, NUMBER, STRING, IDENTIFIER, PRINT, IF_STATEMENT, WHILE_LOOP, READ,
+)
+from .ast_nodes import (
+    Program, VariableDeclaration, Assignment, BinaryOperation, UnaryOperation,
+    Number, String, Identifier, Print, IfStatement, WhileLoop, Read,
+)
+from .inputs import ConsoleInput
+from .output import OutputBuffer
+from .resolver import UNDEFINED, resolve
+
+BINARY_OPERATORS = {
+    'PLUS': lambda x, y: x + y,
+    'MINUS': lambda x, y: x - y,
+    'MULT': lambda x, y: x * y,
+    'DIV': lambda x, y: x / y if y != 0 else (_ for _ in ()).throw(RuntimeError("Division by zero")),
+    'GT': lambda x, y: x > y,
+    'LT': lambda x, y: x < y,
+    'EQ': lambda x, y: x == y,
+    'NE': lambda x, y: x != y,
+    'LE': lambda x, y: x <= y,
+    'GE': lambda x, y: x >= y,
+}
+
+def divide(x, y):
+    if y != 0:
+        return x / y
+    raise RuntimeError("Division by zero")
+
+# Mismas operaciones que BINARY_OPERATORS, como funciones de `operator` (más
+# rápidas de llamar que las lambdas) para ClosureInterpreter
+OPERATOR_FUNCTIONS = {
+    'PLUS': operator.add,
+    'MINUS': operator.sub,
+    'MULT': operator.mul,
+    'DIV': divide,
+    'GT': operator.gt,
+    'LT': operator.lt,
+    'EQ': operator.eq,
+    'NE': operator.ne,
+    'LE': operator.le,
+    'GE': operator.ge,
+}
+
+# Método de Interpreter que evalúa cada clase de nodo
+EVALUATORS = {
+    Program: 'evaluate_program',
+    VariableDeclaration: 'evaluate_variable_declaration',
+    Assignment: 'evaluate_assignment',
+    BinaryOperation: 'evaluate_binary_operation',
+    UnaryOperation: 'evaluate_unary_operation',
+    Number: 'evaluate_number',
+    String: 'evaluate_string',
+    Identifier: 'evaluate_identifier',
+    Print: 'evaluate_print',
+    IfStatement: 'evaluate_if_statement',
+    WhileLoop: 'evaluate_while_loop',
+    Read: 'evaluate_read',
+}
+
 class Interpreter:
-    def __init__(self):
-        self.variables = {}
-        self.output = []
+    # Evalúa directamente el AST de objetos (ast_nodes); el método de cada
+    # nodo se elige por su clase con una sola búsqueda en un dict. Antes de
+    # ejecutar el programa se resuelven sus variables (compiler.resolver) y
+    # sus valores viven en la lista `frame`, indexada por la ranura del nodo.
+    # Lo que imprime el programa va directo a `output` (compiler.output) y,
+    # con un `budget` (compiler.budget), los ciclos cuentan sus vueltas.
+    # `lire` lee de `inputs` (compiler.inputs; por omisión, la terminal).
+    def __init__(self, output=None, budget=None, inputs=None):
+        self.frame = []
+        self.output = OutputBuffer() if output is None else output
+        self.budget = budget
+        self.inputs = ConsoleInput() if inputs is None else inputs
+        self.dispatch = {cls: getattr(self, name) for cls, name in EVALUATORS.items()}
+        # Suma de los `+` que pueden unir cadenas (compiler.resolver): con
+        # presupuesto, carga las cadenas largas (compiler.budget)
+        self.concat = operator.add if budget is None else budget.adder()
 
     def evaluate(self, node):
-        method = getattr(self, f'evaluate_{node["type"]}', None)
+        method = self.dispatch.get(type(node))
         if method is None:
-            raise RuntimeError(f"Unknown node type: {node['type']}")
+            raise RuntimeError(f"Unknown node type: {type(node).__name__}")
         return method(node)
 
     def evaluate_program(self, node):
-        results = []
-        for statement in node['body']:
-            result = self.evaluate(statement)
-            if result is not None:
-                results.append(str(result))
-        return '\n'.join(results)
+        self.frame = resolve(node).frame()
+        if self.budget is not None:
+            self.budget.start(len(self.frame))
+        self.evaluate_block(node.body)
+        return self.output.getvalue()
+
+    def evaluate_block(self, statements):
+        evaluate = self.evaluate
+        for statement in statements:
+            evaluate(statement)
 
     def evaluate_variable_declaration(self, node):
-        if node.get('value'):
-            value = self.evaluate(node['value'])
-            self.variables[node['name']] = value
+        if node.value is not None:
+            value = self.evaluate(node.value)
+            self.frame[node.slot] = value
         else:
-            self.variables[node['name']] = 0 if node['var_type'] == 'INT' else 0.0
+            self.frame[node.slot] = 0 if node.var_type == 'INT' else 0.0
         return None
 
     def evaluate_assignment(self, node):
-        if node['name'] not in self.variables:
-            raise RuntimeError(f"Cannot assign to undefined variable: {node['name']}")
-        value = self.evaluate(node['value'])
-        self.variables[node['name']] = value
+        if self.frame[node.slot] is UNDEFINED:
+            raise RuntimeError(f"Cannot assign to undefined variable: {node.name}")
+        value = self.evaluate(node.value)
+        self.frame[node.slot] = value
         return None
 
     def evaluate_binary_operation(self, node):
-        left = self.evaluate(node['left'])
-        right = self.evaluate(node['right'])
-        
-        operators = {
-            'PLUS': lambda x, y: x + y,
-            'MINUS': lambda x, y: x - y,
-            'MULT': lambda x, y: x * y,
-            'DIV': lambda x, y: x / y if y != 0 else (_ for _ in ()).throw(RuntimeError("Division by zero")),
-            'GT': lambda x, y: x > y,
-            'LT': lambda x, y: x < y,
-            'EQ': lambda x, y: x == y,
-            'NE': lambda x, y: x != y,
-            'LE': lambda x, y: x <= y,
-            'GE': lambda x, y: x >= y,
-        }
+        left = self.evaluate(node.left)
+
+        # && y || evalúan el lado derecho solo si hace falta y, como las
+        # comparaciones, producen un booleano
+        if node.operator == 'AND':
+            return bool(left) and bool(self.evaluate(node.right))
+        if node.operator == 'OR':
+            return bool(left) or bool(self.evaluate(node.right))
+
+        right = self.evaluate(node.right)
+        if node.concat:
+            return self.concat(left, right)
         
-        if node['operator'] not in operators:
-            raise RuntimeError(f"Unknown operator: {node['operator']}")
+        if node.operator not in BINARY_OPERATORS:
+            raise RuntimeError(f"Unknown operator: {node.operator}")
             
-        return operators[node['operator']](left, right)
+        return BINARY_OPERATORS[node.operator](left, right)
+
+    def evaluate_unary_operation(self, node):
+        operand = self.evaluate(node.operand)
+        if node.operator == 'MINUS':
+            return -operand
+        raise RuntimeError(f"Unknown operator: {node.operator}")
 
     def evaluate_number(self, node):
-        return node['value']
+        return node.value
 
     def evaluate_string(self, node):
-        return node['value']
+        return node.value
 
     def evaluate_identifier(self, node):
-        if node['name'] not in self.variables:
-            raise RuntimeError(f"Undefined variable: {node['name']}")
-        return self.variables[node['name']]
+        value = self.frame[node.slot]
+        if value is UNDEFINED:
+            raise RuntimeError(f"Undefined variable: {node.name}")
+        return value
 
     def evaluate_print(self, node):
-        value = self.evaluate(node['expression'])
-        return str(value)
+        value = self.evaluate(node.expression)
+        self.output.write(str(value))
+        return None
 
     def evaluate_if_statement(self, node):
-        condition = self.evaluate(node['condition'])
+        condition = self.evaluate(node.condition)
         if condition:
-            results = []
-            for statement in node['consequent']:
-                result = self.evaluate(statement)
-                if result is not None:
-                    results.append(str(result))
-            return '\n'.join(results) if results else None
-        elif node['alternate']:
-            results = []
-            for statement in node['alternate']:
-                result = self.evaluate(statement)
-                if result is not None:
-                    results.append(str(result))
-            return '\n'.join(results) if results else None
+            self.evaluate_block(node.consequent)
+        elif node.alternate:
+            self.evaluate_block(node.alternate)
         return None
 
     def evaluate_while_loop(self, node):
-        results = []
-        while self.evaluate(node['condition']):
-            for statement in node['body']:
-                result = self.evaluate(statement)
-                if result is not None:
-                    results.append(str(result))
-        return '\n'.join(results) if results else None
+        if self.budget is not None:
+            return self.evaluate_budgeted_loop(node)
+        while self.evaluate(node.condition):
+            self.evaluate_block(node.body)
+        return None
+
+    def evaluate_budgeted_loop(self, node):
+        # Las vueltas se hacen en tandas de budget.interval: el for sobre el
+        # range las cuenta sin aritmética en cada vuelta, y cada tanda (y la
+        # última, incompleta) se carga al presupuesto
+        budget = self.budget
+        interval = budget.interval
+        while True:
+            for count in range(interval):
+                if not self.evaluate(node.condition):
+                    budget.spend(count)
+                    return None
+                self.evaluate_block(node.body)
+            budget.spend(interval)
 
     def evaluate_read(self, node):
-        if node['variable'] not in self.variables:
-            raise RuntimeError(f"Cannot read into undefined variable: {node['variable']}")
-        value = input(f"Enter value for {node['variable']}: ")
+        if self.frame[node.slot] is UNDEFINED:
+            raise RuntimeError(f"Cannot read into undefined variable: {node.variable}")
+        value = self.inputs.read(node.variable)
         try:
             # Try to convert to float first
-            self.variables[node['variable']] = float(value)
+            self.frame[node.slot] = float(value)
         except ValueError:
             # If conversion fails, store as string
-            self.variables[node['variable']] = value
-        return None
\ No newline at end of file
+            self.frame[node.slot] = value
+        return None
+
+class ArenaInterpreter:
+    # Mismo comportamiento que Interpreter, sobre un AST plano (ASTArena):
+    # cada nodo es un entero y se despacha por su tipo numérico
+    def __init__(self, output=None, inputs=None):
+        self.variables = {}
+        self.output = OutputBuffer() if output is None else output
+        self.inputs = ConsoleInput() if inputs is None else inputs
+
+    def evaluate(self, arena, node=None):
+        self.arena = arena
+        node = arena.root if node is None else node
+        for statement in arena.statements(arena.first[node]):
+            self.execute(statement)
+        return self.output.getvalue()
+
+    def execute_list(self, list_id):
+        for statement in self.arena.statements(list_id):
+            self.execute(statement)
+
+    def execute(self, node):
+        arena = self.arena
+        kind = arena.kinds[node]
+        if kind == VARIABLE_DECLARATION:
+            name = arena.constants[arena.first[node]]
+            if arena.second[node] >= 0:
+                self.variables[name] = self.value(arena.second[node])
+            else:
+                self.variables[name] = 0 if OPERATORS[arena.operators[node]] == 'INT' else 0.0
+        elif kind == ASSIGNMENT:
+            name = arena.constants[arena.first[node]]
+            if name not in self.variables:
+                raise RuntimeError(f"Cannot assign to undefined variable: {name}")
+            self.variables[name] = self.value(arena.second[node])
+        elif kind == PRINT:
+            self.output.write(str(self.value(arena.first[node])))
+        elif kind == IF_STATEMENT:
+            if self.value(arena.first[node]):
+                self.execute_list(arena.second[node])
+            elif arena.third[node] >= 0:
+                self.execute_list(arena.third[node])
+        elif kind == WHILE_LOOP:
+            while self.value(arena.first[node]):
+                self.execute_list(arena.second[node])
+        elif kind == READ:
+            name = arena.constants[arena.first[node]]
+            if name not in self.variables:
+                raise RuntimeError(f"Cannot read into undefined variable: {name}")
+            value = self.inputs.read(name)
+            try:
+                self.variables[name] = float(value)
+            except ValueError:
+                self.variables[name] = value
+        else:
+            raise RuntimeError(f"Unknown node type: {NODE_TYPES[kind]}")
+
+    def value(self, node):
+        arena = self.arena
+        kind = arena.kinds[node]
+        if kind == NUMBER or kind == STRING:
+            return arena.constants[arena.first[node]]
+        if kind == IDENTIFIER:
+            name = arena.constants[arena.first[node]]
+            if name not in self.variables:
+                raise RuntimeError(f"Undefined variable: {name}")
+            return self.variables[name]
+        if kind == BINARY_OPERATION:
+            operator = OPERATORS[arena.operators[node]]
+            left = self.value(arena.first[node])
+            if operator == 'AND':
+                return bool(left) and bool(self.value(arena.second[node]))
+            if operator == 'OR':
+                return bool(left) or bool(self.value(arena.second[node]))
+            right = self.value(arena.second[node])
+            if operator not in BINARY_OPERATORS:
+                raise RuntimeError(f"Unknown operator: {operator}")
+            return BINARY_OPERATORS[operator](left, right)
+        if kind == UNARY_OPERATION:
+            operand = self.value(arena.first[node])
+            if OPERATORS[arena.operators[node]] == 'MINUS':
+                return -operand
+            raise RuntimeError(f"Unknown operator: {OPERATORS[arena.operators[node]]}")
+        raise RuntimeError(f"Unknown node type: {NODE_TYPES[kind]}")
+
+# Método de ClosureInterpreter que compila cada clase de nodo
+COMPILERS = {
+    Program: 'compile_program',
+    VariableDeclaration: 'compile_variable_declaration',
+    Assignment: 'compile_assignment',
+    BinaryOperation: 'compile_binary_operation',
+    UnaryOperation: 'compile_unary_operation',
+    Number: 'compile_number',
+    String: 'compile_string',
+    Identifier: 'compile_identifier',
+    Print: 'compile_print',
+    IfStatement: 'compile_if_statement',
+    WhileLoop: 'compile_while_loop',
+    Read: 'compile_read',
+}
+
+class ClosureInterpreter:
+    # Mismo resultado y mismos errores que Interpreter, pero el AST se compila
+    # una sola vez a funciones anidadas (una por nodo) que ya tienen ligados
+    # sus hijos, su operador y sus nombres; ejecutar el programa es llamar a
+    # la función de la raíz. Las expresiones devuelven su valor y las
+    # sentencias agregan lo que imprimen a `output`. Las variables se leen
+    # de `frame` con la ranura que les dio compiler.resolver.
+    def __init__(self, output=None, budget=None, inputs=None):
+        self.frame = []
+        self.output = OutputBuffer() if output is None else output
+        self.budget = budget
+        self.inputs = ConsoleInput() if inputs is None else inputs
+        self.compilers = {cls: getattr(self, name) for cls, name in COMPILERS.items()}
+        # Como en Interpreter
+        self.concat = operator.add if budget is None else budget.adder()
+
+    def evaluate(self, node):
+        self.compile(node)()
+        return self.output.getvalue()
+
+    def compile(self, node):
+        method = self.compilers.get(type(node))
+        if method is None:
+            name = type(node).__name__
+            def unknown():
+                raise RuntimeError(f"Unknown node type: {name}")
+            return unknown
+        return method(node)
+
+    def compile_block(self, statements):
+        statements = tuple(self.compile(statement) for statement in statements)
+        # Los bloques cortos (el cuerpo típico de un ciclo) se llaman sin
+        # recorrer la tupla
+        if len(statements) == 1:
+            return statements[0]
+        if len(statements) == 2:
+            first, second = statements
+            def block():
+                first()
+                second()
+            return block
+        if len(statements) == 3:
+            first, second, third = statements
+            def block():
+                first()
+                second()
+                third()
+            return block
+        def block():
+            for statement in statements:
+                statement()
+        return block
+
+    def compile_program(self, node):
+        # Las funciones de los nodos capturan la lista, que se crea antes
+        self.frame = resolve(node).frame()
+        if self.budget is not None:
+            self.budget.start(len(self.frame))
+        return self.compile_block(node.body)
+
+    def compile_variable_declaration(self, node):
+        frame, slot = self.frame, node.slot
+        if node.value is not None:
+            value = self.compile(node.value)
+            def declare():
+                frame[slot] = value()
+        else:
+            default = 0 if node.var_type == 'INT' else 0.0
+            def declare():
+                frame[slot] = default
+        return declare
+
+    def compile_assignment(self, node):
+        frame, name, slot = self.frame, node.name, node.slot
+        # `x = y op constante` (p. ej. `i = i + 1`) se calcula en la misma
+        # función, sin llamar a la de la operación
+        operation = self.simple_operation(node.value)
+        if operation is not None:
+            function, operand, operand_slot, constant = operation
+            def assign():
+                if frame[slot] is UNDEFINED:
+                    raise RuntimeError(f"Cannot assign to undefined variable: {name}")
+                value = frame[operand_slot]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {operand}")
+                frame[slot] = function(value, constant)
+            return assign
+        value = self.compile(node.value)
+        def assign():
+            if frame[slot] is UNDEFINED:
+                raise RuntimeError(f"Cannot assign to undefined variable: {name}")
+            frame[slot] = value()
+        return assign
+
+    def compile_binary_operation(self, node):
+        operator_name = node.operator
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+
+        if operator_name == 'AND':
+            def binary():
+                return bool(left()) and bool(right())
+            return binary
+        if operator_name == 'OR':
+            def binary():
+                return bool(left()) or bool(right())
+            return binary
+
+        function = self.concat if node.concat else OPERATOR_FUNCTIONS.get(operator_name)
+        if function is None:
+            def binary():
+                left()
+                right()
+                raise RuntimeError(f"Unknown operator: {operator_name}")
+            return binary
+
+        # Casos comunes en ciclos (`i < 10`, `i + 1`, `x * y`): el operando
+        # variable o constante se lee dentro de la misma función, sin otra
+        # llamada
+        frame = self.frame
+        operation = self.simple_operation(node)
+        if operation is not None:
+            function, name, slot, constant = operation
+            def binary():
+                value = frame[slot]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {name}")
+                return function(value, constant)
+            return binary
+        left_node, right_node = node.left, node.right
+        if type(right_node) is Number:
+            constant = right_node.value
+            if function is divide and constant != 0:
+                function = operator.truediv
+            def binary():
+                return function(left(), constant)
+            return binary
+        if type(left_node) is Identifier and type(right_node) is Identifier:
+            left_name, right_name = left_node.name, right_node.name
+            left_slot, right_slot = left_node.slot, right_node.slot
+            def binary():
+                value = frame[left_slot]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {left_name}")
+                other = frame[right_slot]
+                if other is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {right_name}")
+                return function(value, other)
+            return binary
+        def binary():
+            return function(left(), right())
+        return binary
+
+    def simple_operation(self, node):
+        # (función, variable, ranura, constante) si `node` es
+        # `variable op constante` con un operador de OPERATOR_FUNCTIONS, o None
+        if type(node) is not BinaryOperation or type(node.left) is not Identifier:
+            return None
+        function = OPERATOR_FUNCTIONS.get(node.operator)
+        if function is None or type(node.right) is not Number:
+            return None
+        constant = node.right.value
+        if function is divide and constant != 0:
+            function = operator.truediv
+        return function, node.left.name, node.left.slot, constant
+
+    def compile_unary_operation(self, node):
+        operand = self.compile(node.operand)
+        operator_name = node.operator
+        if operator_name == 'MINUS':
+            def unary():
+                return -operand()
+        else:
+            def unary():
+                operand()
+                raise RuntimeError(f"Unknown operator: {operator_name}")
+        return unary
+
+    def compile_number(self, node):
+        value = node.value
+        def constant():
+            return value
+        return constant
+
+    def compile_string(self, node):
+        return self.compile_number(node)
+
+    def compile_identifier(self, node):
+        frame, name, slot = self.frame, node.name, node.slot
+        def identifier():
+            value = frame[slot]
+            if value is UNDEFINED:
+                raise RuntimeError(f"Undefined variable: {name}")
+            return value
+        return identifier
+
+    def compile_print(self, node):
+        write = self.output.write
+        expression = self.compile(node.expression)
+        def print_():
+            write(str(expression()))
+        return print_
+
+    def compile_if_statement(self, node):
+        condition = self.compile(node.condition)
+        consequent = self.compile_block(node.consequent)
+        if node.alternate:
+            alternate = self.compile_block(node.alternate)
+            def if_statement():
+                if condition():
+                    consequent()
+                else:
+                    alternate()
+        else:
+            def if_statement():
+                if condition():
+                    consequent()
+        return if_statement
+
+    def compile_while_loop(self, node):
+        body = self.compile_block(node.body)
+        # `tour_eiffel (i < n)`: la comparación se hace en el propio ciclo
+        operation = self.simple_operation(node.condition)
+        budget = self.budget
+        if operation is not None:
+            frame = self.frame
+            function, name, slot, constant = operation
+            if budget is not None:
+                # Vueltas en tandas, como Interpreter.evaluate_budgeted_loop
+                interval = budget.interval
+                def while_loop():
+                    while True:
+                        for count in range(interval):
+                            value = frame[slot]
+                            if value is UNDEFINED:
+                                raise RuntimeError(f"Undefined variable: {name}")
+                            if not function(value, constant):
+                                budget.spend(count)
+                                return
+                            body()
+                        budget.spend(interval)
+                return while_loop
+            def while_loop():
+                while True:
+                    value = frame[slot]
+                    if value is UNDEFINED:
+                        raise RuntimeError(f"Undefined variable: {name}")
+                    if not function(value, constant):
+                        break
+                    body()
+            return while_loop
+        condition = self.compile(node.condition)
+        if budget is not None:
+            interval = budget.interval
+            def while_loop():
+                while True:
+                    for count in range(interval):
+                        if not condition():
+                            budget.spend(count)
+                            return
+                        body()
+                    budget.spend(interval)
+            return while_loop
+        def while_loop():
+            while condition():
+                body()
+        return while_loop
+
+    def compile_read(self, node):
+        frame, name, slot = self.frame, node.variable, node.slot
+        read_input = self.inputs.read
+        def read():
+            if frame[slot] is UNDEFINED:
+                raise RuntimeError(f"Cannot read into undefined variable: {name}")
+            value = read_input(name)
+            try:
+                frame[slot] = float(value)
+            except ValueError:
+                frame[slot] = value
+        return read
@@ -0,0 +1,307 @@
+import json
+
+from .inputs import ConsoleInput
+from .interpreter import OPERATOR_FUNCTIONS
+from .output import OutputBuffer
+from .resolver import resolve
+from .semantic_translator import RELATIONAL_BRANCHES, TEMP_NAME, SemanticTranslator
+
+# Ejecuta directamente los cuádruplos de SemanticTranslator. Antes de correr,
+# load() los decodifica una sola vez: cada variable, temporal y literal recibe
+# una ranura en una lista plana de registros (los literales ya cargados), las
+# etiquetas se convierten en índices de instrucción y cada cuádruplo queda
+# como una tupla (operación, a, b, resultado, función) con enteros.
+#
+# Un salto relacional (IF_FALSE_LT a b L) es un salto condicional que compara
+# sus dos operandos (BRANCH_UNLESS). Al decodificar, un temporal que se
+# escribe una sola vez y solo recibe un literal comparte la ranura del literal
+# (sin instrucción), y una comparación cuyo resultado solo usa el IF_FALSE que
+# la sigue (el IR de otros traductores) se une con él en un BRANCH_UNLESS.
+# Para eso basta que ningún otro bloque lea el temporal sin escribirlo antes,
+# aunque se reutilice como los registros de compiler.regalloc. Un GOTO hacia
+# una etiqueta anterior (el regreso al inicio de un ciclo) queda como LOOP,
+# que cuenta la vuelta si hay presupuesto.
+#
+# Diferencia con Interpreter que viene de la forma del IR: en `x = expr` se
+# comprueba que x exista después de evaluar expr (el mensaje de error puede
+# ser otro si ambos fallan).
+
+IR_OPCODES = [
+    'COPY', 'STORE', 'BINARY', 'AND', 'OR', 'NEG', 'JUMP', 'JUMP_IF_FALSE', 'PRINT', 'READ',
+    'BRANCH_UNLESS', 'LOOP', 'BOOL',
+]
+(COPY, STORE, BINARY, AND, OR, NEG, JUMP, JUMP_IF_FALSE, PRINT, READ,
+ BRANCH_UNLESS, LOOP, BOOL) = range(len(IR_OPCODES))
+
+# Valor de los registros de variables aún no declaradas
+UNDEFINED = object()
+
+
+class LoadedIR:
+    def __init__(self):
+        self.instructions = []
+        self.registers = []
+        self.names = []
+        self.variables = 0
+        self._slots = {}
+
+    def slot(self, operand):
+        # Ranura de un operando: nombre (inicialmente sin definir) o literal
+        # (número como str(valor) o cadena JSON), ya con su valor
+        index = self._slots.get(operand)
+        if index is None:
+            index = self._slots[operand] = len(self.registers)
+            if operand is None:
+                self.registers.append(None)
+            elif is_literal(operand):
+                self.registers.append(literal_value(operand))
+            else:
+                self.registers.append(UNDEFINED)
+            self.names.append(operand)
+        return index
+
+
+def is_literal(operand):
+    return operand is None or operand[:1] == '"' or operand[:1].isdigit() or operand[:1] in '-.'
+
+
+def literal_value(operand):
+    # Valor de un literal del IR: cadena JSON, entero (el cero de INT) o float
+    if operand[:1] == '"':
+        return json.loads(operand)
+    try:
+        return int(operand)
+    except ValueError:
+        return float(operand)
+
+
+def load(ir_code):
+    loaded = LoadedIR()
+    declared = set()
+    writes = {}
+    # Nombres que algún bloque lee antes de escribirlos: cualquier otro está
+    # muerto al salir del bloque donde se escribe
+    exposed = set()
+    local = set()
+    for instruction in ir_code:
+        op = instruction['op']
+        if op == 'LABEL':
+            local = set()
+            continue
+        for arg in ((instruction['arg2'],) if op == 'DECLARE' else (instruction['arg1'], instruction['arg2'])):
+            if arg not in local and not is_literal(arg):
+                exposed.add(arg)
+        if op == 'GOTO' or op == 'IF_FALSE' or op in RELATIONAL_BRANCHES:
+            local = set()
+            continue
+        if op == 'DECLARE':
+            declared.add(instruction['result'])
+        elif op != 'PRINT':
+            writes[instruction['result']] = writes.get(instruction['result'], 0) + 1
+        local.add(instruction['result'])
+
+    def is_temp(name):
+        return name is not None and TEMP_NAME.match(name) and name not in declared and writes.get(name) == 1
+
+    # Temporales que solo reciben un literal: se leen de la ranura del literal
+    aliases = {}
+    for instruction in ir_code:
+        if instruction['op'] == 'ASSIGN' and is_literal(instruction['arg1']) and is_temp(instruction['result']):
+            aliases[instruction['result']] = instruction['arg1']
+
+    def slot(operand):
+        return loaded.slot(aliases.get(operand, operand))
+
+    loaded.variables = len(declared)
+    instructions = loaded.instructions
+    labels = {}
+    # Índices a los que apunta alguna etiqueta
+    targets = set()
+    jumps = []
+    for instruction in ir_code:
+        op = instruction['op']
+        arg1, arg2, result = instruction['arg1'], instruction['arg2'], instruction['result']
+        if op in OPERATOR_FUNCTIONS:
+            decoded = (BINARY, slot(arg1), slot(arg2), slot(result), OPERATOR_FUNCTIONS[op])
+        elif op == 'AND' or op == 'OR':
+            decoded = (AND if op == 'AND' else OR, slot(arg1), slot(arg2), slot(result), None)
+        elif op == 'NEG' or op == 'BOOL':
+            decoded = (NEG if op == 'NEG' else BOOL, slot(arg1), 0, slot(result), None)
+        elif op == 'ASSIGN':
+            if result in aliases:
+                continue
+            # Copiar a un temporal no necesita comprobar nada; asignar a una
+            # variable exige que ya esté declarada
+            target = COPY if TEMP_NAME.match(result) and result not in declared else STORE
+            decoded = (target, slot(arg1), 0, slot(result), None)
+        elif op == 'DECLARE':
+            decoded = (COPY, slot(arg2), 0, slot(result), None)
+        elif op == 'IF_FALSE':
+            previous = instructions[-1] if instructions else None
+            # El IF_FALSE termina el bloque: si el temporal no se lee en otro
+            # sin escribirse antes, nadie más ve el resultado de la comparación
+            if (previous is not None and previous[0] == BINARY and TEMP_NAME.match(arg1)
+                    and arg1 not in declared and arg1 not in exposed and previous[3] == slot(arg1)
+                    and len(instructions) not in targets):
+                instructions.pop()
+                decoded = (BRANCH_UNLESS, previous[1], previous[2], result, previous[4])
+            else:
+                decoded = (JUMP_IF_FALSE, slot(arg1), 0, result, None)
+            jumps.append(len(instructions))
+        elif op in RELATIONAL_BRANCHES:
+            jumps.append(len(instructions))
+            decoded = (BRANCH_UNLESS, slot(arg1), slot(arg2), result, OPERATOR_FUNCTIONS[RELATIONAL_BRANCHES[op]])
+        elif op == 'GOTO':
+            jumps.append(len(instructions))
+            decoded = (LOOP if result in labels else JUMP, 0, 0, result, None)
+        elif op == 'PRINT':
+            decoded = (PRINT, slot(arg1), 0, 0, None)
+        elif op == 'READ':
+            decoded = (READ, 0, 0, slot(result), None)
+        elif op == 'LABEL':
+            # La etiqueta apunta a la siguiente instrucción que se decodifique
+            labels[result] = len(instructions)
+            targets.add(len(instructions))
+            continue
+        else:
+            raise RuntimeError(f"Unknown IR operation: {op}")
+        instructions.append(decoded)
+
+    # Los saltos guardan el nombre de la etiqueta hasta conocer su índice
+    for index in jumps:
+        op, a, b, label, function = instructions[index]
+        instructions[index] = (op, a, b, labels[label], function)
+    return loaded
+
+
+def budgeted(loaded, budget):
+    # Instrucciones de `loaded` en las que un `+` que puede unir cadenas carga
+    # al presupuesto las largas (compiler.budget). Una ranura puede guardar
+    # una cadena si es un literal de cadena, si recibe `lire`, una copia de
+    # otra que puede, o la suma de dos que pueden
+    add = OPERATOR_FUNCTIONS['PLUS']
+    instructions = loaded.instructions
+    strings = {slot for slot, value in enumerate(loaded.registers) if type(value) is str}
+    # Instrucciones que escriben su resultado a partir de cada ranura
+    readers = {}
+    for instruction in instructions:
+        op, a, b, result, function = instruction
+        if op == READ:
+            strings.add(result)
+        elif op == COPY or op == STORE:
+            readers.setdefault(a, []).append(instruction)
+        elif function is add:
+            readers.setdefault(a, []).append(instruction)
+            readers.setdefault(b, []).append(instruction)
+    work = list(strings)
+    while work:
+        for op, a, b, result, function in readers.get(work.pop(), ()):
+            if result not in strings and (function is not add or a in strings and b in strings):
+                strings.add(result)
+                work.append(result)
+    concat = budget.adder()
+    return [(op, a, b, result, concat) if function is add and a in strings and b in strings
+            else (op, a, b, result, function)
+            for op, a, b, result, function in instructions]
+
+
+class IRExecutor:
+    # Motor de /api/run que traduce a cuádruplos y los ejecuta
+    def __init__(self, output=None, budget=None, inputs=None):
+        self.output = OutputBuffer() if output is None else output
+        self.budget = budget
+        self.inputs = ConsoleInput() if inputs is None else inputs
+
+    def evaluate(self, node):
+        # Los nombres sin declarar se reportan antes de ejecutar, como en
+        # Interpreter
+        resolve(node)
+        return self.execute(SemanticTranslator().translate(node))
+
+    def execute(self, ir_code):
+        return self.run(load(ir_code))
+
+    def run(self, loaded):
+        instructions = loaded.instructions
+        registers = list(loaded.registers)
+        names = loaded.names
+        write = self.output.write
+        budget = self.budget
+        # Vueltas que faltan para cargar una tanda al presupuesto; sin
+        # presupuesto empieza en -1 y nunca llega a 0
+        countdown = -1
+        if budget is not None:
+            budget.start(loaded.variables)
+            interval = countdown = budget.interval
+            instructions = budgeted(loaded, budget)
+        end = len(instructions)
+        pc = 0
+        while pc < end:
+            op, a, b, result, function = instructions[pc]
+            pc += 1
+            if op == BINARY or op == BRANCH_UNLESS:
+                left = registers[a]
+                right = registers[b]
+                if left is UNDEFINED or right is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a if left is UNDEFINED else b]}")
+                if op == BINARY:
+                    registers[result] = function(left, right)
+                elif not function(left, right):
+                    pc = result
+            elif op == JUMP_IF_FALSE:
+                value = registers[a]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a]}")
+                if not value:
+                    pc = result
+            elif op == LOOP:
+                pc = result
+                countdown -= 1
+                if not countdown:
+                    budget.spend(interval)
+                    countdown = interval
+            elif op == JUMP:
+                pc = result
+            elif op == COPY or op == STORE:
+                value = registers[a]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a]}")
+                if op == STORE and registers[result] is UNDEFINED:
+                    raise RuntimeError(f"Cannot assign to undefined variable: {names[result]}")
+                registers[result] = value
+            elif op == PRINT:
+                value = registers[a]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a]}")
+                write(str(value))
+            elif op == NEG:
+                value = registers[a]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a]}")
+                registers[result] = -value
+            elif op == BOOL:
+                value = registers[a]
+                if value is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a]}")
+                registers[result] = bool(value)
+            elif op == AND or op == OR:
+                left = registers[a]
+                right = registers[b]
+                if left is UNDEFINED or right is UNDEFINED:
+                    raise RuntimeError(f"Undefined variable: {names[a if left is UNDEFINED else b]}")
+                if op == AND:
+                    registers[result] = bool(left) and bool(right)
+                else:
+                    registers[result] = bool(left) or bool(right)
+            elif op == READ:
+                name = names[result]
+                if registers[result] is UNDEFINED:
+                    raise RuntimeError(f"Cannot read into undefined variable: {name}")
+                value = self.inputs.read(name)
+                try:
+                    registers[result] = float(value)
+                except ValueError:
+                    registers[result] = value
+        if budget is not None:
+            budget.spend(interval - countdown)
+        return self.output.getvalue()
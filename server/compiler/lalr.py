@@ -0,0 +1,400 @@
+import hashlib
+import json
+import os
+
+from . import ast_nodes
+from .grammar import GRAMMAR, START_SYMBOL
+
+# Generador LALR(1): GRAMMAR -> colección LR(0) -> propagación de símbolos de
+# anticipación (algoritmo del libro del dragón, §4.7.5) -> tablas de acción y
+# de ir_a. Las tablas se guardan en disco (cache_directory()) con el hash de
+# la gramática como clave, así solo se regeneran cuando la gramática cambia.
+#
+# Codificación de la tabla de acción: n > 0 desplaza al estado n, -p reduce
+# por la producción p y 0 acepta (reducir por la producción 0, la aumentada).
+# El estado 0 es el inicial y nunca es destino de un desplazamiento.
+
+END = '$end'
+AUGMENTED_START = '$accept'
+
+# Cambiar al modificar el generador o el formato, para invalidar la caché
+TABLE_FORMAT = 1
+
+# Directorio de la caché de tablas: LALR_CACHE_DIR si está definida (vacía
+# desactiva la caché y las tablas se generan en memoria en cada proceso); si
+# no, el directorio de caché del usuario, fuera del código del paquete
+CACHE_ENV = 'LALR_CACHE_DIR'
+CACHE_NAME = 'lya2-compiler'
+
+
+def cache_directory():
+    configured = os.environ.get(CACHE_ENV)
+    if configured is not None:
+        return configured or None
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        base = os.environ['LOCALAPPDATA']
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, CACHE_NAME)
+
+
+class GrammarError(ValueError):
+    pass
+
+
+def grammar_hash(grammar=GRAMMAR, start=START_SYMBOL):
+    text = json.dumps([TABLE_FORMAT, start, grammar], separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LALRTables:
+    def __init__(self, productions, terminals, nonterminals, action, goto, digest):
+        # productions[p] = (lado izquierdo, lado derecho, acción)
+        self.productions = productions
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.action = action
+        self.goto = goto
+        self.hash = digest
+
+    @classmethod
+    def build(cls, grammar=GRAMMAR, start=START_SYMBOL):
+        return _Generator(grammar, start).build()
+
+    @classmethod
+    def load(cls, grammar=GRAMMAR, start=START_SYMBOL, cache_dir=None):
+        # Lee las tablas de la caché o las genera y las guarda. Sin caché
+        # (cache_directory() da None) o si el directorio no se puede
+        # escribir, se generan en memoria y no se guardan.
+        cache_dir = cache_directory() if cache_dir is None else cache_dir
+        if not cache_dir:
+            return cls.build(grammar, start)
+        digest = grammar_hash(grammar, start)
+        path = os.path.join(cache_dir, f'lalr.{digest[:16]}.json')
+        try:
+            with open(path, encoding='utf-8') as cached:
+                data = json.load(cached)
+            if data.get('hash') == digest:
+                return cls.from_dict(data)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        tables = cls.build(grammar, start)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8') as output:
+                json.dump(tables.to_dict(), output, separators=(',', ':'))
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+        return tables
+
+    def to_dict(self):
+        return {
+            'hash': self.hash,
+            'productions': [[lhs, list(rhs), list(action)] for lhs, rhs, action in self.productions],
+            'terminals': self.terminals,
+            'nonterminals': self.nonterminals,
+            'action': self.action,
+            'goto': self.goto
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        productions = [(lhs, rhs, action) for lhs, rhs, action in data['productions']]
+        return cls(productions, data['terminals'], data['nonterminals'],
+                   data['action'], data['goto'], data['hash'])
+
+    def describe(self):
+        # Versión legible para /api/language/theory: 'sN' desplaza al estado
+        # N, 'rP' reduce por la producción P y 'acc' acepta
+        def entry(code):
+            if code > 0:
+                return f's{code}'
+            return f'r{-code}' if code else 'acc'
+
+        return {
+            'hash': self.hash,
+            'productions': [f"{lhs} -> {' '.join(rhs) or 'ε'}" for lhs, rhs, _ in self.productions],
+            'terminals': self.terminals,
+            'nonterminals': self.nonterminals,
+            'action': [{symbol: entry(code) for symbol, code in row.items()} for row in self.action],
+            'goto': self.goto
+        }
+
+
+class _Generator:
+    def __init__(self, grammar, start):
+        self.productions = [(AUGMENTED_START, [start], ['pass', 0])]
+        self.productions += [(lhs, list(rhs), list(action)) for lhs, rhs, action in grammar]
+        self.nonterminals = list(dict.fromkeys(lhs for lhs, _, _ in self.productions))
+        nonterminal_set = set(self.nonterminals)
+        self.terminals = list(dict.fromkeys(
+            symbol for _, rhs, _ in self.productions for symbol in rhs if symbol not in nonterminal_set
+        )) + [END]
+        self.by_lhs = {name: [] for name in self.nonterminals}
+        for index, (lhs, _, _) in enumerate(self.productions):
+            self.by_lhs[lhs].append(index)
+        for _, rhs, _ in self.productions:
+            for symbol in rhs:
+                if symbol in nonterminal_set and not self.by_lhs[symbol]:
+                    raise GrammarError(f"Nonterminal '{symbol}' has no productions")
+        self._first_sets()
+
+    def _first_sets(self):
+        self.nullable = set()
+        self.first = {name: set() for name in self.nonterminals}
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs, _ in self.productions:
+                first = self.first[lhs]
+                size = len(first)
+                for symbol in rhs:
+                    if symbol in self.first:
+                        first |= self.first[symbol]
+                        if symbol not in self.nullable:
+                            break
+                    else:
+                        first.add(symbol)
+                        break
+                else:
+                    if lhs not in self.nullable:
+                        self.nullable.add(lhs)
+                        changed = True
+                changed = changed or len(first) != size
+
+    def _first_of(self, symbols, lookahead):
+        # FIRST(símbolos · lookahead)
+        result = set()
+        for symbol in symbols:
+            if symbol not in self.first:
+                result.add(symbol)
+                return result
+            result |= self.first[symbol]
+            if symbol not in self.nullable:
+                return result
+        result.add(lookahead)
+        return result
+
+    def _closure0(self, kernel):
+        items = list(kernel)
+        seen = set(items)
+        for production, dot in items:
+            rhs = self.productions[production][1]
+            if dot < len(rhs) and rhs[dot] in self.by_lhs:
+                for candidate in self.by_lhs[rhs[dot]]:
+                    if (candidate, 0) not in seen:
+                        seen.add((candidate, 0))
+                        items.append((candidate, 0))
+        return items
+
+    def _closure1(self, items):
+        # items: {(producción, punto): conjunto de anticipación}
+        result = {item: set(lookaheads) for item, lookaheads in items.items()}
+        pending = list(result)
+        while pending:
+            production, dot = pending.pop()
+            rhs = self.productions[production][1]
+            if dot >= len(rhs) or rhs[dot] not in self.by_lhs:
+                continue
+            lookaheads = set()
+            for lookahead in result[(production, dot)]:
+                lookaheads |= self._first_of(rhs[dot + 1:], lookahead)
+            for candidate in self.by_lhs[rhs[dot]]:
+                current = result.setdefault((candidate, 0), set())
+                if not lookaheads <= current:
+                    current |= lookaheads
+                    pending.append((candidate, 0))
+        return result
+
+    def _lr0_states(self):
+        kernels = [((0, 0),)]
+        index = {kernels[0]: 0}
+        transitions = []
+        for kernel in kernels:
+            moves = {}
+            for production, dot in self._closure0(kernel):
+                rhs = self.productions[production][1]
+                if dot < len(rhs):
+                    moves.setdefault(rhs[dot], []).append((production, dot + 1))
+            edges = {}
+            for symbol, items in moves.items():
+                target = tuple(sorted(set(items)))
+                if target not in index:
+                    index[target] = len(kernels)
+                    kernels.append(target)
+                edges[symbol] = index[target]
+            transitions.append(edges)
+        return kernels, transitions
+
+    def _lookaheads(self, kernels, transitions):
+        lookaheads = [{item: set() for item in kernel} for kernel in kernels]
+        lookaheads[0][(0, 0)].add(END)
+        propagate = []
+        probe = '#'
+        for state, kernel in enumerate(kernels):
+            for item in kernel:
+                for (production, dot), symbols in self._closure1({item: {probe}}).items():
+                    rhs = self.productions[production][1]
+                    if dot >= len(rhs):
+                        continue
+                    target = (transitions[state][rhs[dot]], (production, dot + 1))
+                    for symbol in symbols:
+                        if symbol == probe:
+                            propagate.append(((state, item), target))
+                        else:
+                            lookaheads[target[0]][target[1]].add(symbol)
+
+        changed = True
+        while changed:
+            changed = False
+            for (state, item), (target, target_item) in propagate:
+                source = lookaheads[state][item]
+                destination = lookaheads[target][target_item]
+                if not source <= destination:
+                    destination |= source
+                    changed = True
+        return lookaheads
+
+    def build(self):
+        kernels, transitions = self._lr0_states()
+        lookaheads = self._lookaheads(kernels, transitions)
+        action = []
+        goto = []
+        conflicts = []
+
+        for state, kernel in enumerate(kernels):
+            row = {}
+            for symbol, target in transitions[state].items():
+                if symbol not in self.by_lhs:
+                    row[symbol] = target
+            for (production, dot), symbols in self._closure1(lookaheads[state]).items():
+                if dot < len(self.productions[production][1]):
+                    continue
+                for symbol in symbols:
+                    existing = row.get(symbol)
+                    if existing is not None and existing != -production:
+                        conflicts.append(f'state {state} on {symbol}: {existing} / {-production}')
+                        continue
+                    row[symbol] = -production
+            action.append(row)
+            goto.append({symbol: target for symbol, target in transitions[state].items()
+                         if symbol in self.by_lhs})
+
+        if conflicts:
+            raise GrammarError('Grammar is not LALR(1): ' + '; '.join(conflicts))
+
+        return LALRTables(self.productions, self.terminals, self.nonterminals,
+                          action, goto, grammar_hash(self.productions[1:], self.productions[0][1][0]))
+
+
+def _literal_or_index(argument):
+    return (False, argument) if isinstance(argument, str) else (True, argument)
+
+
+def _semantic_action(action, build):
+    # Convierte la acción de la gramática en una función sobre los valores
+    # del lado derecho; `build` crea los nodos (ver Parser)
+    name = action[0]
+    arguments = [_literal_or_index(argument) for argument in action[1:]]
+
+    def values(children):
+        return [children[value] if is_index else value for is_index, value in arguments]
+
+    if name == 'pass':
+        is_index, value = arguments[0]
+        return (lambda children: children[value]) if is_index else (lambda children: value)
+    if name == 'list':
+        return lambda children: values(children)
+    if name == 'append':
+        def append(children):
+            items, item = values(children)
+            items.append(item)
+            return items
+        return append
+    if name == 'number':
+        return lambda children: build.Number(float(values(children)[0]))
+    if name == 'string':
+        return lambda children: build.String(values(children)[0][1:-1])
+    node_class = getattr(ast_nodes, name, None)
+    if not isinstance(node_class, type) or not issubclass(node_class, ast_nodes.ASTNode):
+        raise GrammarError(f"Unknown semantic action: {name}")
+    constructor = getattr(build, name)
+    return lambda children: constructor(*values(children))
+
+
+_TABLES = None
+
+
+def get_tables():
+    global _TABLES
+    if _TABLES is None:
+        _TABLES = LALRTables.load()
+    return _TABLES
+
+
+class LALRParser:
+    # Analizador ascendente dirigido por las tablas: un bucle de
+    # desplazamiento/reducción sin recursión, así la profundidad de los
+    # bloques y expresiones anidadas no está limitada por la pila de Python.
+    # Misma interfaz que Parser: recibe los tokens y parse() devuelve Program.
+    def __init__(self, tokens, tables=None, build=None):
+        self.tokens = iter(tokens)
+        self.tables = tables or get_tables()
+        self.build = ast_nodes if build is None else build
+        self.reductions = [
+            (lhs, len(rhs), _semantic_action(action, self.build))
+            for lhs, rhs, action in self.tables.productions
+        ]
+
+    def parse(self):
+        action = self.tables.action
+        goto = self.tables.goto
+        reductions = self.reductions
+        tokens = self.tokens
+
+        token = next(tokens, None)
+        if token is None:
+            return self.build.Program([])
+
+        states = [0]
+        values = []
+        while True:
+            kind = token['type'] if token is not None else END
+            code = action[states[-1]].get(kind)
+            if code is None:
+                raise self._error(token, action[states[-1]])
+            if code > 0:
+                states.append(code)
+                values.append(token['value'])
+                token = next(tokens, None)
+                continue
+            if code == 0:
+                return values[-1]
+
+            lhs, length, build = reductions[-code]
+            if length:
+                children = values[-length:]
+                del values[-length:]
+                del states[-length:]
+            else:
+                children = []
+            values.append(build(children))
+            states.append(goto[states[-1]][lhs])
+
+    def _error(self, token, row):
+        expected = sorted(symbol for symbol in row if symbol != END)
+        if END in row:
+            expected.append('end of input')
+        expected = expected[0] if len(expected) == 1 else 'one of ' + ', '.join(expected)
+        if token is None:
+            return SyntaxError(f"Expected {expected}, got end of input")
+        return SyntaxError(
+            f"Expected {expected}, got {token['type']} "
+            f"at line {token['line']}, column {token['column']}"
+        )
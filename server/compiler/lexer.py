@@ -1,30 +1,279 @@
+import os
 import re
-from .tokens import Token, TOKEN_SPEC
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from .tokens import Token, TokenStream, LineIndex, TOKEN_SPEC, TOKEN_KINDS, KIND_CODES, MISMATCH
+from .dfa import TOKEN_DFA
 
-def lex(characters: str):
-    tok_regex = '|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPEC)
+TOKEN_REGEX = re.compile('|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPEC))
+
+# Espacios, saltos de línea y comentarios no producen tokens. En SCAN_REGEX
+# se consumen como prefijo posesivo del siguiente token, así el bucle de
+# Python solo ve tokens reales; ninguna otra regla puede empezar con ' ',
+# '\t', '#' o '\n', por lo que el resultado es el mismo que con TOKEN_REGEX.
+# El grupo del token es opcional: una coincidencia sin grupo (lastindex None)
+# corresponde a espacios finales o a un carácter que ninguna regla acepta.
+SKIPPED_KINDS = ('NEWLINE', 'SKIP', 'COMMENT')
+SCAN_REGEX = re.compile('(?:%s)*+(?:%s)?' % (
+    '|'.join(pattern for name, pattern in TOKEN_SPEC if name in SKIPPED_KINDS),
+    '|'.join('(?P<%s>%s)' % (name, pattern) for name, pattern in TOKEN_SPEC
+             if name not in SKIPPED_KINDS),
+))
+GROUP_CODES = [None] + [KIND_CODES[name] for name in SCAN_REGEX.groupindex]
+MISMATCH_CODE = KIND_CODES[MISMATCH]
+
+# Misma expresión sobre bytes UTF-8: `crêpe` pasa a ser b'cr\xc3\xaape'.
+# En bytes, \w y \d solo aceptan ASCII; las líneas con algún byte no ASCII
+# (NON_ASCII_LINE) se decodifican y se analizan con SCAN_REGEX para que los
+# identificadores y dígitos Unicode den exactamente los mismos tokens.
+BYTES_SCAN_REGEX = re.compile(SCAN_REGEX.pattern.encode('utf-8'))
+NON_ASCII_LINE = re.compile(rb'(?m)^[^\n\x80-\xff]*[\x80-\xff][^\n]*\n?')
+
+CHUNK_SIZE = 64 * 1024
+
+# Por debajo de este tamaño crear el pool de procesos cuesta más que analizar
+PARALLEL_MIN_SIZE = 1024 * 1024
+
+# Modo de recuperación (recover=True): en vez de descartar en silencio los
+# caracteres que ninguna regla acepta, se emite un token MISMATCH por cada uno
+# para que el parser los reporte con su posición. Un carácter así produce
+# siempre una coincidencia vacía de SCAN_REGEX justo en su posición.
+def _mismatch_at(mo, endpos):
+    start = mo.start()
+    if start == mo.end() and start < endpos:
+        return start
+    return None
+
+def lex(characters: str, recover: bool = False):
+    return list(_tokenize(characters, recover=recover))
+
+def lex_iter(source, chunk_size=CHUNK_SIZE, recover: bool = False):
+    if isinstance(source, str):
+        yield from _tokenize(source, recover=recover)
+        return
+
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), '')
+    else:
+        chunks = iter(source)
+
+    # Ningún token cruza un salto de línea (STRING y COMMENT excluyen '\n'),
+    # así que basta con analizar hasta el último '\n' recibido y conservar
+    # el resto para el siguiente fragmento.
     line_num = 1
-    line_start = 0
-    tokens = []
+    pending = []
+    for chunk in chunks:
+        cut = chunk.rfind('\n') + 1
+        if not cut:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:cut])
+        line_num = yield from _tokenize(''.join(pending), line_num, recover)
+        pending = [chunk[cut:]]
+
+    rest = ''.join(pending)
+    if rest:
+        yield from _tokenize(rest, line_num, recover)
+
+def _tokenize(characters, line_num=1, recover=False):
+    lines = LineIndex(characters, line_num)
+    line_col = lines.line_col
+
+    for mo in SCAN_REGEX.finditer(characters):
+        group = mo.lastindex
+        if group is None:
+            if recover:
+                start = _mismatch_at(mo, len(characters))
+                if start is not None:
+                    line, column = line_col(start)
+                    yield Token(MISMATCH, characters[start], line, column).to_dict()
+            continue
+        start, end = mo.span(group)
+        line, column = line_col(start)
+        token = Token(TOKEN_KINDS[GROUP_CODES[group]], characters[start:end], line, column)
+        yield token.to_dict()
+
+    return line_num + len(lines) - 1
+
+def lex_stream(characters: str, recover: bool = False):
+    stream = TokenStream(characters)
+    append_kind = stream.kinds.append
+    append_start = stream.starts.values.append
+    append_end = stream.ends.values.append
+    codes = GROUP_CODES
+
+    for mo in SCAN_REGEX.finditer(characters):
+        group = mo.lastindex
+        if group is None:
+            if recover:
+                start = _mismatch_at(mo, len(characters))
+                if start is not None:
+                    stream.append(MISMATCH_CODE, start, start + 1)
+            continue
+        start, end = mo.span(group)
+        append_kind(codes[group])
+        append_start(start)
+        append_end(end)
 
-    for mo in re.finditer(tok_regex, characters):
-        kind = mo.lastgroup
-        value = mo.group()
-        column = mo.start() - line_start
-        
-        if kind == 'SKIP':
-            if '\n' in value:
-                line_start = mo.end()
-                line_num += value.count('\n')
+    return stream
+
+def lex_bytes(data, recover: bool = False):
+    # Analiza bytes UTF-8 (bytes, memoryview o mmap) sin decodificarlos: los
+    # valores del TokenStream son rebanadas del buffer que se decodifican al
+    # leerlas. Un mmap se envuelve en memoryview para no copiar al rebanar.
+    source = data if isinstance(data, (bytes, memoryview)) else memoryview(data)
+    stream = TokenStream(source)
+    position = 0
+    for mo in NON_ASCII_LINE.finditer(source):
+        _scan_bytes(stream, source, position, mo.start(), recover)
+        _scan_utf8_line(stream, source, mo.start(), mo.end(), recover)
+        position = mo.end()
+    _scan_bytes(stream, source, position, len(source), recover)
+    return stream
+
+def _scan_bytes(stream, source, position, endpos, recover=False):
+    append_kind = stream.kinds.append
+    append_start = stream.starts.values.append
+    append_end = stream.ends.values.append
+    codes = GROUP_CODES
+
+    for mo in BYTES_SCAN_REGEX.finditer(source, position, endpos):
+        group = mo.lastindex
+        if group is None:
+            if recover:
+                start = _mismatch_at(mo, endpos)
+                if start is not None:
+                    stream.append(MISMATCH_CODE, start, start + 1)
             continue
-        elif kind == 'COMMENT':
+        start, end = mo.span(group)
+        append_kind(codes[group])
+        append_start(start)
+        append_end(end)
+
+def _scan_utf8_line(stream, source, line_start, line_end, recover=False):
+    text = str(source[line_start:line_end], 'utf-8')
+    offset = line_start
+    previous = 0
+    for mo in SCAN_REGEX.finditer(text):
+        group = mo.lastindex
+        if group is None:
+            start = _mismatch_at(mo, len(text)) if recover else None
+            if start is None:
+                continue
+            # Un carácter, aunque ocupe varios bytes en UTF-8
+            end = start + 1
+            code = MISMATCH_CODE
+        else:
+            start, end = mo.span(group)
+            code = GROUP_CODES[group]
+        offset += len(text[previous:start].encode('utf-8'))
+        token_start = offset
+        offset += len(text[start:end].encode('utf-8'))
+        previous = end
+        stream.append(code, token_start, offset)
+
+def lex_parallel(characters: str, workers: int = None, chunk_size: int = None):
+    # Divide el código en saltos de línea y analiza los fragmentos en varios
+    # procesos. Todo '\n' es un corte seguro: STRING y COMMENT no pueden
+    # contener saltos de línea y el escáner se reinicia tras cada uno. Las
+    # líneas y columnas salen del índice de líneas del código completo, así
+    # que el resultado es idéntico al de lex_stream().
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(characters) < PARALLEL_MIN_SIZE:
+        return lex_stream(characters)
+    chunk_size = chunk_size or -(-len(characters) // (workers * 4))
+
+    stream = TokenStream(characters)
+    chunks = ((characters[start:end], start) for start, end in _line_chunks(characters, chunk_size))
+    with ProcessPoolExecutor(workers) as pool:
+        for kinds, starts, ends in pool.map(_lex_chunk, chunks):
+            stream.kinds.extend(kinds)
+            stream.starts.values.extend(starts)
+            stream.ends.values.extend(ends)
+    return stream
+
+def _line_chunks(characters, chunk_size):
+    start = 0
+    while start < len(characters):
+        cut = characters.find('\n', start + chunk_size) + 1
+        end = cut if cut else len(characters)
+        yield start, end
+        start = end
+
+def _lex_chunk(chunk):
+    characters, base = chunk
+    stream = lex_stream(characters)
+    starts = array('I', map(base.__add__, stream.starts.values))
+    ends = array('I', map(base.__add__, stream.ends.values))
+    return stream.kinds, starts, ends
+
+def relex(stream: TokenStream, offset: int, deleted: int, inserted: str):
+    # Aplica la edición (offset, longitud borrada, texto insertado) sobre
+    # `stream` y lo devuelve actualizado. Solo se vuelve a escanear desde el
+    # inicio de la línea editada hasta que un token nuevo empieza donde
+    # empezaba uno viejo (ya desplazado); el resto se reutiliza.
+    relex_span(stream, offset, deleted, inserted)
+    return stream
+
+def relex_span(stream: TokenStream, offset: int, deleted: int, inserted: str):
+    # Igual que relex(), pero devuelve qué tokens cambiaron: los tokens
+    # [first, old_end) anteriores fueron reemplazados por [first, new_end).
+    old = stream.source
+    if stream.encoded:
+        raise TypeError("relex() needs a TokenStream over a str source")
+    if offset < 0 or deleted < 0 or offset + deleted > len(old):
+        raise ValueError(f"Edit at {offset} deleting {deleted} is outside the source")
+    source = old[:offset] + inserted + old[offset + deleted:]
+    delta = len(inserted) - deleted
+    edit_end = offset + len(inserted)
+
+    # El escáner se reinicia tras cada '\n', así que el inicio de la línea
+    # editada es un límite seguro (antes de él nada depende de la edición).
+    restart = source.rfind('\n', 0, offset) + 1
+    first = stream.index_at(restart)
+    resync = len(stream)
+    kinds = array('B')
+    starts = []
+    ends = []
+
+    for mo in SCAN_REGEX.finditer(source, restart):
+        group = mo.lastindex
+        if group is None:
             continue
-        elif kind == 'NEWLINE':
-            line_start = mo.end()
-            line_num += 1
+        start, end = mo.span(group)
+        if start >= edit_end:
+            index = stream.index_at(start - delta)
+            if index < len(stream) and stream.start(index) == start - delta:
+                resync = index
+                break
+
+        kinds.append(GROUP_CODES[group])
+        starts.append(start)
+        ends.append(end)
+
+    # Los offsets de los tokens reutilizados se desplazan de forma diferida
+    # (ver OffsetArray); el índice de líneas, si ya existe, también.
+    stream.kinds[first:resync] = kinds
+    stream.starts.splice(first, resync, starts, delta)
+    stream.ends.splice(first, resync, ends, delta)
+    if stream._line_index is not None:
+        stream._line_index.edit(offset, deleted, inserted)
+    stream.source = source
+    return first, resync, first + len(kinds)
+
+def lex_dfa(characters: str):
+    names = TOKEN_DFA.names
+    lines = LineIndex(characters)
+    tokens = []
+
+    for rule, start, end in TOKEN_DFA.scan(characters):
+        kind = names[rule]
+
+        if kind in SKIPPED_KINDS:
             continue
-        
-        token = Token(kind, value, line_num, column)
+
+        line, column = lines.line_col(start)
+        token = Token(kind, characters[start:end], line, column)
         tokens.append(token.to_dict())
 
-    return tokens
\ No newline at end of file
+    return tokens
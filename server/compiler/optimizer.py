@@ -0,0 +1,335 @@
+import json
+import math
+
+from .ast_nodes import (
+    Program, VariableDeclaration, Assignment, BinaryOperation, UnaryOperation,
+    Number, String, Identifier, Print, IfStatement, WhileLoop, Read,
+)
+from .interpreter import OPERATOR_FUNCTIONS
+
+# Optimizaciones sobre el AST de objetos que no cambian la salida ni los
+# errores del programa:
+#
+#   constant_folding          una expresión con solo literales se reemplaza
+#                             por su valor, calculado como al ejecutar. No se
+#                             pliega si el cálculo falla (p. ej. `1 / 0`), si
+#                             da un número no finito o si da un booleano,
+#                             que no tiene literal (salvo como condición)
+#   algebraic_simplification  `x * 1`, `1 * x`, `x / 1` y `x - 0` se vuelven
+#                             `x` cuando x es siempre un float. `x + 0` no es
+#                             una identidad (-0.0 + 0.0 es 0.0), y `x * 0` no
+#                             da 0 si x es infinito o negativo (-0.0)
+#   dead_branch               un macaron con condición constante se reemplaza
+#                             por la rama que se ejecuta
+#   dead_loop                 un tour_eiffel con condición siempre falsa se
+#                             elimina
+#
+# Una rama o un ciclo solo se eliminan si no declaran variables: sin la
+# declaración, aunque no se ejecute, compiler.resolver rechazaría antes de
+# ejecutar un uso del nombre que la ejecución solo reporta al alcanzarlo.
+#
+# El árbol original no se modifica: los nodos que cambian se crean de nuevo y
+# los demás se comparten.
+
+# Operador de cada nombre de token, para describir los cambios
+SYMBOLS = {
+    'PLUS': '+', 'MINUS': '-', 'MULT': '*', 'DIV': '/', 'GT': '>', 'LT': '<',
+    'EQ': '==', 'NE': '!=', 'LE': '<=', 'GE': '>=', 'AND': '&&', 'OR': '||',
+}
+
+COMPARISONS = {'GT', 'LT', 'EQ', 'NE', 'LE', 'GE'}
+NUMERIC_TYPES = {'int', 'float', 'bool'}
+
+
+class NotConstant(Exception):
+    pass
+
+
+def describe(node):
+    # Texto de una expresión como se escribiría en el programa
+    cls = type(node)
+    if cls is Number:
+        value = node.value
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value)) if value or math.copysign(1, value) > 0 else '-0'
+        return str(value)
+    if cls is String:
+        return json.dumps(node.value, ensure_ascii=False)
+    if cls is Identifier:
+        return node.name
+    if cls is UnaryOperation:
+        return f'-{describe_operand(node.operand)}'
+    if cls is BinaryOperation:
+        return f'{describe_operand(node.left)} {SYMBOLS.get(node.operator, node.operator)} {describe_operand(node.right)}'
+    return type(node).__name__
+
+
+def describe_operand(node):
+    return f'({describe(node)})' if type(node) is BinaryOperation else describe(node)
+
+
+def constant_value(node):
+    # Valor de una expresión que no depende de variables, calculado como en
+    # Interpreter; NotConstant si depende de alguna o si el cálculo falla
+    cls = type(node)
+    if cls is Number or cls is String:
+        return node.value
+    if cls is UnaryOperation and node.operator == 'MINUS':
+        try:
+            return -constant_value(node.operand)
+        except TypeError:
+            raise NotConstant from None
+    if cls is BinaryOperation:
+        left = constant_value(node.left)
+        # Como al ejecutar, el lado derecho no se evalúa si no hace falta
+        if node.operator == 'AND':
+            return bool(left) and bool(constant_value(node.right))
+        if node.operator == 'OR':
+            return bool(left) or bool(constant_value(node.right))
+        function = OPERATOR_FUNCTIONS.get(node.operator)
+        if function is None:
+            raise NotConstant
+        try:
+            return function(left, constant_value(node.right))
+        except (TypeError, RuntimeError, OverflowError):
+            raise NotConstant from None
+    raise NotConstant
+
+
+def literal(value):
+    # Nodo literal con `value`, o None si no se puede escribir como literal
+    if isinstance(value, str):
+        return String(value)
+    if type(value) is float and math.isfinite(value) or type(value) is int:
+        return Number(value)
+    return None
+
+
+def binary_types(operator, left, right):
+    # Tipos posibles de `a op b` si a puede ser de los tipos `left` y b de
+    # los de `right` (las combinaciones que fallan no aportan nada)
+    if operator in COMPARISONS or operator in ('AND', 'OR'):
+        return {'bool'}
+    types = set()
+    for a in left:
+        for b in right:
+            if a in NUMERIC_TYPES and b in NUMERIC_TYPES:
+                types.add('float' if operator == 'DIV' or 'float' in (a, b) else 'int')
+            elif operator == 'PLUS' and a == b == 'str':
+                types.add('str')
+            elif operator == 'MULT' and {a, b} in ({'str', 'int'}, {'str', 'bool'}):
+                types.add('str')
+    return types
+
+
+# Método de Optimizer que optimiza cada clase de sentencia; las expresiones
+# pasan todas por optimize_expression
+STATEMENT_OPTIMIZERS = {
+    VariableDeclaration: 'optimize_variable_declaration',
+    Assignment: 'optimize_assignment',
+    Print: 'optimize_print',
+    IfStatement: 'optimize_if_statement',
+    WhileLoop: 'optimize_while_loop',
+    Read: 'optimize_read',
+}
+
+
+class Optimizer:
+    def __init__(self):
+        self.changes = []
+        self.variable_types = {}
+        self.statements = {cls: getattr(self, name) for cls, name in STATEMENT_OPTIMIZERS.items()}
+
+    def optimize(self, program):
+        self.variable_types = self.infer_variable_types(program)
+        return Program(self.optimize_block(program.body))
+
+    def report(self, kind, before, after):
+        self.changes.append({'kind': kind, 'before': before, 'after': after})
+
+    def infer_variable_types(self, program):
+        # Tipos que puede tener cada variable en algún momento, sin importar
+        # el orden: se repite hasta que ninguna asignación agrega un tipo
+        writes = []
+
+        def collect(statements):
+            for statement in statements:
+                cls = type(statement)
+                if cls is VariableDeclaration:
+                    if statement.value is not None:
+                        writes.append((statement.name, statement.value))
+                    else:
+                        writes.append((statement.name, {'int' if statement.var_type == 'INT' else 'float'}))
+                elif cls is Assignment:
+                    writes.append((statement.name, statement.value))
+                elif cls is Read:
+                    writes.append((statement.variable, {'float', 'str'}))
+                elif cls is IfStatement:
+                    collect(statement.consequent)
+                    collect(statement.alternate or ())
+                elif cls is WhileLoop:
+                    collect(statement.body)
+
+        collect(program.body)
+        types = {}
+        changed = True
+        while changed:
+            changed = False
+            for name, value in writes:
+                new = value if isinstance(value, set) else self.expression_types(value, types)
+                current = types.setdefault(name, set())
+                if not new <= current:
+                    current |= new
+                    changed = True
+        return types
+
+    def expression_types(self, node, variable_types=None):
+        variable_types = self.variable_types if variable_types is None else variable_types
+        cls = type(node)
+        if cls is Number:
+            return {type(node.value).__name__}
+        if cls is String:
+            return {'str'}
+        if cls is Identifier:
+            return variable_types.get(node.name, set())
+        if cls is UnaryOperation:
+            operand = self.expression_types(node.operand, variable_types)
+            return {'float' if kind == 'float' else 'int' for kind in operand if kind != 'str'}
+        if cls is BinaryOperation:
+            return binary_types(node.operator, self.expression_types(node.left, variable_types),
+                                self.expression_types(node.right, variable_types))
+        return set()
+
+    def optimize_expression(self, node):
+        cls = type(node)
+        if cls is BinaryOperation:
+            return self.optimize_binary_operation(node)
+        if cls is UnaryOperation:
+            operand = self.optimize_expression(node.operand)
+            if operand is node.operand:
+                return self.fold(node, node)
+            return self.fold(UnaryOperation(node.operator, operand), node)
+        return node
+
+    def optimize_binary_operation(self, node):
+        original = node
+        left = self.optimize_expression(node.left)
+        right = self.optimize_expression(node.right)
+        if left is not node.left or right is not node.right:
+            node = BinaryOperation(node.operator, left, right)
+        folded = self.fold(node, original)
+        if folded is not node:
+            return folded
+        return self.simplify(node)
+
+    def fold(self, node, original):
+        # `original` es la expresión antes de optimizar sus operandos, para
+        # describir el cambio completo
+        try:
+            value = constant_value(node)
+        except NotConstant:
+            return node
+        folded = literal(value)
+        if folded is None:
+            return node
+        # `-2` es solo un literal negativo: se pliega sin reportarlo
+        if type(node) is UnaryOperation and type(node.operand) is Number:
+            return folded
+        # Si los operandos ya se habían plegado, basta reportar este paso
+        operands = {id(operand) for operand in (getattr(node, 'left', None), getattr(node, 'right', None),
+                                                getattr(node, 'operand', None)) if operand is not None}
+        while self.changes and self.changes[-1].get('node') in operands:
+            self.changes.pop()
+        self.changes.append({'kind': 'constant_folding', 'before': describe(original), 'after': describe(folded),
+                             'node': id(folded)})
+        return folded
+
+    def simplify(self, node):
+        left, right, operator = node.left, node.right, node.operator
+        kept = None
+        if operator == 'MULT' and type(right) is Number and right.value == 1:
+            kept = left
+        elif operator == 'MULT' and type(left) is Number and left.value == 1:
+            kept = right
+        elif operator == 'DIV' and type(right) is Number and right.value == 1:
+            kept = left
+        elif operator == 'MINUS' and type(right) is Number and right.value == 0:
+            kept = left
+        if kept is None or self.expression_types(kept) != {'float'}:
+            return node
+        self.report('algebraic_simplification', describe(node), describe(kept))
+        return kept
+
+    def optimize_block(self, statements):
+        optimized = []
+        for statement in statements:
+            result = self.statements[type(statement)](statement)
+            if isinstance(result, list):
+                optimized.extend(result)
+            else:
+                optimized.append(result)
+        return optimized
+
+    def optimize_variable_declaration(self, node):
+        if node.value is None:
+            return node
+        value = self.optimize_expression(node.value)
+        return node if value is node.value else VariableDeclaration(node.var_type, node.name, value)
+
+    def optimize_assignment(self, node):
+        value = self.optimize_expression(node.value)
+        return node if value is node.value else Assignment(node.name, value)
+
+    def optimize_print(self, node):
+        expression = self.optimize_expression(node.expression)
+        return node if expression is node.expression else Print(expression)
+
+    def optimize_read(self, node):
+        return node
+
+    def condition_value(self, condition):
+        # (True, valor de verdad) si la condición es constante
+        try:
+            return True, bool(constant_value(condition))
+        except NotConstant:
+            return False, None
+
+    def optimize_if_statement(self, node):
+        condition = self.optimize_expression(node.condition)
+        constant, truth = self.condition_value(condition)
+        if constant:
+            taken, dropped = (node.consequent, node.alternate) if truth else (node.alternate, node.consequent)
+            if not declares(dropped or ()):
+                self.report('dead_branch', f'macaron ({describe(condition)})',
+                            'consequent' if truth else ('alternate' if node.alternate else 'removed'))
+                return self.optimize_block(taken or ())
+        consequent = self.optimize_block(node.consequent)
+        alternate = self.optimize_block(node.alternate) if node.alternate else node.alternate
+        return IfStatement(condition, consequent, alternate)
+
+    def optimize_while_loop(self, node):
+        condition = self.optimize_expression(node.condition)
+        constant, truth = self.condition_value(condition)
+        if constant and not truth and not declares(node.body):
+            self.report('dead_loop', f'tour_eiffel ({describe(condition)})', 'removed')
+            return []
+        return WhileLoop(condition, self.optimize_block(node.body))
+
+
+def declares(statements):
+    for statement in statements:
+        cls = type(statement)
+        if cls is VariableDeclaration:
+            return True
+        if cls is IfStatement and (declares(statement.consequent) or declares(statement.alternate or ())):
+            return True
+        if cls is WhileLoop and declares(statement.body):
+            return True
+    return False
+
+
+def optimize(program):
+    # (programa optimizado, lista de cambios) para las respuestas de la API
+    optimizer = Optimizer()
+    optimized = optimizer.optimize(program)
+    return optimized, [{key: change[key] for key in ('kind', 'before', 'after')} for change in optimizer.changes]
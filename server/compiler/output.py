@@ -0,0 +1,168 @@
+import queue
+import threading
+
+from .budget import BudgetExceeded
+
+# Destinos de la salida de los programas. `afficher` escribe cada línea con
+# write(texto) directamente en el destino, sin juntar cadenas por bloque; la
+# salida completa es '\n'.join de las líneas, como antes. getvalue() devuelve
+# esa cadena si el destino la guarda, o None si ya la entregó.
+#
+#   OutputBuffer    en memoria, con un límite opcional de caracteres
+#   FileOutput      escribe en un archivo abierto a medida que se imprime
+#   ResumedOutput   envuelve a otro destino al reanudar un programa (ver
+#                   compiler.inputs): descarta las líneas ya entregadas
+#   StreamOutput    entrega la salida en trozos a quien la itera (p. ej. una
+#                   respuesta HTTP) mientras el programa corre en otro hilo,
+#                   también con un límite opcional
+
+
+class OutputLimitExceeded(BudgetExceeded):
+    def __init__(self, limit):
+        super().__init__('output', limit)
+
+
+class OutputClosed(RuntimeError):
+    # Quien leía un StreamOutput dejó de hacerlo (p. ej. el cliente se fue)
+    pass
+
+
+class OutputBuffer:
+    # Cada GROUP_SIZE líneas se juntan en una sola cadena: un str por línea
+    # ocupa varias veces más memoria que el texto de la línea
+    GROUP_SIZE = 1024
+
+    def __init__(self, limit=None):
+        self.groups = []
+        self.lines = []
+        self.limit = limit
+        self.size = 0
+
+    def write(self, text):
+        if self.limit is not None:
+            self.size += len(text) + 1
+            if self.size > self.limit + 1:
+                raise OutputLimitExceeded(self.limit)
+        lines = self.lines
+        lines.append(text)
+        if len(lines) >= self.GROUP_SIZE:
+            self.groups.append('\n'.join(lines))
+            lines.clear()
+
+    def getvalue(self):
+        return '\n'.join(self.groups + self.lines)
+
+
+class FileOutput:
+    def __init__(self, file):
+        self.file = file
+        self.separator = ''
+
+    def write(self, text):
+        self.file.write(self.separator)
+        self.file.write(text)
+        self.separator = '\n'
+
+    def getvalue(self):
+        return None
+
+
+class ResumedOutput:
+    # Un programa reanudado se ejecuta otra vez desde el inicio: las primeras
+    # `skip` líneas ya se entregaron antes y no se repiten. `lines` cuenta
+    # todas las escritas, para saber cuántas saltar en la siguiente reanudación.
+    def __init__(self, sink, skip=0):
+        self.sink = sink
+        self.skip = skip
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += 1
+        if self.lines > self.skip:
+            self.sink.write(text)
+
+    def getvalue(self):
+        return self.sink.getvalue()
+
+
+# Marca de fin en la cola de StreamOutput
+FINISHED = object()
+
+
+class StreamOutput:
+    # Las líneas se agrupan en trozos de al menos `chunk_size` caracteres que
+    # pasan por una cola de `max_chunks`: si quien lee se atrasa, el programa
+    # se detiene al escribir, así que la memoria no crece con la salida. Al
+    # concatenar los trozos se obtiene la misma salida que en OutputBuffer.
+    def __init__(self, limit=None, chunk_size=64 * 1024, max_chunks=16):
+        self.limit = limit
+        self.size = 0
+        self.chunk_size = chunk_size
+        self.chunks = queue.Queue(max_chunks)
+        self.pending = []
+        self.pending_size = 0
+        self.separator = ''
+        self.closed = False
+
+    def write(self, text):
+        if self.limit is not None:
+            self.size += len(text) + 1
+            if self.size > self.limit + 1:
+                raise OutputLimitExceeded(self.limit)
+        self.pending.append(text)
+        self.pending_size += len(text) + 1
+        if self.pending_size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            chunk = self.separator + '\n'.join(self.pending)
+            self.pending = []
+            self.pending_size = 0
+            self.separator = '\n'
+            self.put(chunk)
+
+    def put(self, item):
+        # Se reintenta para notar si quien lee ya cerró el flujo
+        while True:
+            if self.closed:
+                raise OutputClosed("Output stream closed")
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def getvalue(self):
+        return None
+
+    def run(self, function, *args):
+        # Generador de trozos: al pedir el primero ejecuta function(*args) en
+        # otro hilo. Si el programa falla, el último elemento es la excepción
+        # (en lugar de lanzarla, para que quien lee decida cómo reportarla).
+        # Cerrar el generador detiene al programa en su siguiente escritura.
+        def target():
+            try:
+                function(*args)
+                self.flush()
+                self.put(FINISHED)
+            except OutputClosed:
+                pass
+            except Exception as error:
+                try:
+                    self.flush()
+                    self.put(error)
+                except OutputClosed:
+                    pass
+
+        threading.Thread(target=target, daemon=True).start()
+        try:
+            while True:
+                item = self.chunks.get()
+                if item is FINISHED:
+                    return
+                yield item
+                if isinstance(item, Exception):
+                    return
+        finally:
+            self.closed = True
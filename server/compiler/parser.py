@@ -1,46 +1,155 @@
+from . import ast_nodes
 from .ast_nodes import *
 
+# Precedencia de los operadores binarios (mayor = liga más fuerte). Todos son
+# asociativos por la izquierda; agregar un operador es agregar una entrada.
+BINARY_PRECEDENCE = {
+    'OR': 1,
+    'AND': 2,
+    'EQ': 3, 'NE': 3, 'LT': 3, 'GT': 3, 'LE': 3, 'GE': 3,
+    'PLUS': 4, 'MINUS': 4,
+    'MULT': 5, 'DIV': 5,
+}
+
+# El '-' unario liga más fuerte que cualquier operador binario
+UNARY_PRECEDENCE = 6
+
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    # Tokens en los que se retoma el análisis tras un error en modo de
+    # recuperación: el inicio de una sentencia (no se consume) o ';' (sí).
+    SYNC_TOKENS = {'INT', 'FLOAT', 'PRINT', 'IF', 'WHILE', 'READ'}
+
+    def __init__(self, tokens, recover=False, build=None):
+        # Acepta una lista o cualquier iterable (p. ej. lex_iter): el parser
+        # solo necesita un token de anticipación.
+        # Con recover=True los errores no detienen el análisis: se anotan en
+        # `diagnostics` y parse() devuelve el AST de lo que sí se reconoció.
+        # `build` crea los nodos: por omisión las clases de ast_nodes; con un
+        # ASTArena (compiler/arena.py) el AST se construye en forma plana.
+        self.tokens = iter(tokens)
+        self.recover = recover
+        self.build = ast_nodes if build is None else build
+        self.diagnostics = []
+        self.previous = None
+        self.lookahead = next(self.tokens, None)
+        self.skip_mismatches()
         self.current = 0
         self.variables = {}
 
     def peek(self):
-        if self.current < len(self.tokens):
-            return self.tokens[self.current]
-        return None
+        return self.lookahead
+
+    def skip_mismatches(self):
+        # Los tokens de error del lexer (MISMATCH) se reportan y se saltan
+        while self.recover and self.lookahead and self.lookahead['type'] == 'MISMATCH':
+            self.report(f"Unexpected character '{self.lookahead['value']}'", self.lookahead)
+            self.lookahead = next(self.tokens, None)
 
     def consume(self, expected_type=None):
-        if expected_type and self.peek()['type'] != expected_type:
-            raise SyntaxError(f"Expected {expected_type}, got {self.peek()['type']}")
-        token = self.peek()
+        token = self.lookahead
+        if expected_type and (token is None or token['type'] != expected_type):
+            found = token['type'] if token else 'end of input'
+            raise SyntaxError(f"Expected {expected_type}, got {found}")
+        self.previous = token
+        self.lookahead = next(self.tokens, None)
+        if self.recover:
+            self.skip_mismatches()
         self.current += 1
         return token
 
+    def report(self, message, token=None):
+        # Posición del token donde se detectó el error; al final de la
+        # entrada, la del último token leído.
+        token = token or self.lookahead or self.previous
+        self.diagnostics.append({
+            'message': message,
+            'line': token['line'] if token else 1,
+            'column': token['column'] if token else 0
+        })
+
+    def fail(self, message):
+        if not self.recover:
+            raise SyntaxError(message)
+        self.report(message)
+
+    def synchronize(self):
+        # Modo pánico: descarta tokens hasta el siguiente ';' (incluido), hasta
+        # un '}' que cierre el bloque actual (no incluido) o hasta el inicio
+        # de otra sentencia. Los bloques '{ ... }' de la sentencia errónea se
+        # descartan completos, junto con su 'autre { ... }' si lo hay.
+        depth = 0
+        while self.peek():
+            token_type = self.peek()['type']
+            if depth == 0:
+                if token_type == 'PCOMMA':
+                    self.consume()
+                    return
+                if token_type == 'RBRACE' or token_type in self.SYNC_TOKENS:
+                    return
+            if token_type == 'LBRACE':
+                depth += 1
+            elif token_type == 'RBRACE':
+                depth -= 1
+                if depth == 0:
+                    self.consume()
+                    if not self.peek() or self.peek()['type'] != 'ELSE':
+                        return
+                    continue
+            self.consume()
+
     def parse(self):
-        if not self.tokens:
-            return Program([])
+        if self.peek() is None:
+            return self.build.Program([])
 
-        if self.peek()['type'] != 'MAIN':
-            raise SyntaxError("Program must start with 'main'")
+        if self.peek()['type'] == 'MAIN':
+            self.consume('MAIN')
+        else:
+            self.fail("Program must start with 'main'")
 
-        self.consume('MAIN')
-        if not self.peek() or self.peek()['type'] != 'LBRACE':
-            raise SyntaxError("Expected '{' after 'main'")
-        self.consume('LBRACE')
-        
-        body = []
-        while self.peek() and self.peek()['type'] != 'RBRACE':
-            statement = self.parse_statement()
-            if statement:
-                body.append(statement)
+        if self.peek() and self.peek()['type'] == 'LBRACE':
+            self.consume('LBRACE')
+        else:
+            self.fail("Expected '{' after 'main'")
 
-        if not self.peek() or self.peek()['type'] != 'RBRACE':
-            raise SyntaxError("Expected '}' at end of program")
-        self.consume('RBRACE')
+        body = self.parse_block(0)
 
-        return Program(body)
+        if self.peek() and self.peek()['type'] == 'RBRACE':
+            self.consume('RBRACE')
+            if self.recover and self.peek():
+                self.report(f"Unexpected {self.peek()['type']} after end of program")
+        else:
+            self.fail("Expected '}' at end of program")
+
+        return self.build.Program(body)
+
+    def parse_block(self, owner_start):
+        # Sentencias hasta el '}' que cierra el bloque (o el fin de la entrada).
+        # Se llama justo después de consumir la '{'; `owner_start` es el
+        # índice del primer token de la sentencia dueña del bloque.
+        open_index = self.current - 1
+        statements = Block(open=open_index - owner_start)
+        append_start = statements.starts.values.append
+        append_end = statements.ends.values.append
+        while self.peek() and self.peek()['type'] != 'RBRACE':
+            start = self.current
+            if self.recover:
+                statement = self.parse_statement_or_recover()
+            else:
+                statement = self.parse_statement()
+            if statement is not None:
+                statements.append(statement)
+                append_start(start - open_index)
+                append_end(self.current - open_index)
+        statements.close = self.current - open_index
+        return statements
+
+    def parse_statement_or_recover(self):
+        try:
+            return self.parse_statement()
+        except SyntaxError as error:
+            self.report(str(error))
+            self.synchronize()
+            return None
 
     def parse_statement(self):
         if not self.peek():
@@ -81,7 +190,7 @@ class Parser:
             raise SyntaxError("Expected ';' after variable declaration")
         self.consume('PCOMMA')
 
-        return VariableDeclaration(var_type, var_name, value)
+        return self.build.VariableDeclaration(var_type, var_name, value)
 
     def parse_assignment(self):
         var_name = self.consume('ID')['value']
@@ -96,57 +205,55 @@ class Parser:
             raise SyntaxError("Expected ';' after assignment")
         self.consume('PCOMMA')
 
-        return Assignment(var_name, value)
-
-    def parse_expression(self):
-        return self.parse_comparison()
-
-    def parse_comparison(self):
-        left = self.parse_additive()
-
-        while self.peek() and self.peek()['type'] in ['GT', 'LT', 'EQ', 'NE', 'LE', 'GE']:
-            operator = self.consume()['type']
-            right = self.parse_additive()
-            left = BinaryOperation(operator, left, right)
-
-        return left
-
-    def parse_additive(self):
-        left = self.parse_multiplicative()
-
-        while self.peek() and self.peek()['type'] in ['PLUS', 'MINUS']:
-            operator = self.consume()['type']
-            right = self.parse_multiplicative()
-            left = BinaryOperation(operator, left, right)
-
-        return left
+        return self.build.Assignment(var_name, value)
+
+    def parse_expression(self, min_precedence=1, left=None):
+        # Precedencia ascendente (precedence climbing) guiada por la tabla
+        # BINARY_PRECEDENCE. Una cadena de operadores del mismo nivel se
+        # analiza en este mismo bucle; solo se llama recursivamente cuando el
+        # siguiente operador liga más fuerte. Todos asocian por la izquierda.
+        if left is None:
+            left = self.parse_primary()
+        precedence_of = BINARY_PRECEDENCE.get
+
+        token = self.lookahead
+        while token is not None:
+            precedence = precedence_of(token['type'], 0)
+            if precedence < min_precedence:
+                break
+            self.consume()
+            right = self.parse_primary()
 
-    def parse_multiplicative(self):
-        left = self.parse_primary()
+            following = self.lookahead
+            while following is not None and precedence_of(following['type'], 0) > precedence:
+                right = self.parse_expression(precedence + 1, right)
+                following = self.lookahead
 
-        while self.peek() and self.peek()['type'] in ['MULT', 'DIV']:
-            operator = self.consume()['type']
-            right = self.parse_primary()
-            left = BinaryOperation(operator, left, right)
+            left = self.build.BinaryOperation(token['type'], left, right)
+            token = following
 
         return left
 
     def parse_primary(self):
-        if not self.peek():
+        token = self.lookahead
+        if not token:
             raise SyntaxError("Unexpected end of input")
 
-        token = self.peek()
+        kind = token['type']
 
-        if token['type'] in ['INTEGER_CONST', 'FLOAT_CONST']:
+        if kind in ('INTEGER_CONST', 'FLOAT_CONST'):
             self.consume()
-            return Number(float(token['value']))
-        elif token['type'] == 'STRING':
+            return self.build.Number(float(token['value']))
+        elif kind == 'STRING':
             self.consume()
-            return String(token['value'][1:-1])  # Remove quotes
-        elif token['type'] == 'ID':
+            return self.build.String(token['value'][1:-1])  # Remove quotes
+        elif kind == 'ID':
+            self.consume()
+            return self.build.Identifier(token['value'])
+        elif kind == 'MINUS':
             self.consume()
-            return Identifier(token['value'])
-        elif token['type'] == 'LBRACKET':
+            return self.build.UnaryOperation('MINUS', self.parse_expression(UNARY_PRECEDENCE))
+        elif kind == 'LBRACKET':
             self.consume()
             expr = self.parse_expression()
             if not self.peek() or self.peek()['type'] != 'RBRACKET':
@@ -154,7 +261,7 @@ class Parser:
             self.consume()
             return expr
         else:
-            raise SyntaxError(f"Unexpected token: {token['type']}")
+            raise SyntaxError(f"Unexpected token: {kind}")
 
     def parse_print(self):
         self.consume('PRINT')
@@ -173,9 +280,10 @@ class Parser:
             raise SyntaxError("Expected ';' after print statement")
         self.consume('PCOMMA')
 
-        return Print(expression)
+        return self.build.Print(expression)
 
     def parse_if_statement(self):
+        start = self.current
         self.consume('IF')
         
         if not self.peek() or self.peek()['type'] != 'LBRACKET':
@@ -192,11 +300,7 @@ class Parser:
             raise SyntaxError("Expected '{' after condition")
         self.consume('LBRACE')
 
-        consequent = []
-        while self.peek() and self.peek()['type'] != 'RBRACE':
-            statement = self.parse_statement()
-            if statement:
-                consequent.append(statement)
+        consequent = self.parse_block(start)
 
         if not self.peek() or self.peek()['type'] != 'RBRACE':
             raise SyntaxError("Expected '}' after if block")
@@ -209,19 +313,16 @@ class Parser:
                 raise SyntaxError("Expected '{' after 'autre'")
             self.consume('LBRACE')
 
-            alternate = []
-            while self.peek() and self.peek()['type'] != 'RBRACE':
-                statement = self.parse_statement()
-                if statement:
-                    alternate.append(statement)
+            alternate = self.parse_block(start)
 
             if not self.peek() or self.peek()['type'] != 'RBRACE':
                 raise SyntaxError("Expected '}' after else block")
             self.consume('RBRACE')
 
-        return IfStatement(condition, consequent, alternate)
+        return self.build.IfStatement(condition, consequent, alternate)
 
     def parse_while_loop(self):
+        start = self.current
         self.consume('WHILE')
         
         if not self.peek() or self.peek()['type'] != 'LBRACKET':
@@ -238,17 +339,13 @@ class Parser:
             raise SyntaxError("Expected '{' after condition")
         self.consume('LBRACE')
 
-        body = []
-        while self.peek() and self.peek()['type'] != 'RBRACE':
-            statement = self.parse_statement()
-            if statement:
-                body.append(statement)
+        body = self.parse_block(start)
 
         if not self.peek() or self.peek()['type'] != 'RBRACE':
             raise SyntaxError("Expected '}' after while block")
         self.consume('RBRACE')
 
-        return WhileLoop(condition, body)
+        return self.build.WhileLoop(condition, body)
 
     def parse_read(self):
         self.consume('READ')
@@ -269,4 +366,4 @@ class Parser:
             raise SyntaxError("Expected ';' after read statement")
         self.consume('PCOMMA')
 
-        return Read(var_name)
\ No newline at end of file
+        return self.build.Read(var_name)
\ No newline at end of file
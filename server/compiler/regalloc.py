@@ -0,0 +1,205 @@
+import heapq
+
+from .cfg import BRANCH, build_cfg, liveness, operands, rename, written, written_on_entry
+from .ir_executor import TEMP_NAME, is_literal
+from .semantic_translator import temp_name
+
+# Asignación de registros para los temporales de los cuádruplos:
+#
+#   1. Propagación de copias: un temporal que solo recibe una copia de un
+#      literal o de otro temporal (escrito una sola vez) se reemplaza por su
+#      origen en todas sus lecturas, y `op a b t5; ASSIGN t5 x` se vuelve
+#      `op a b x` si t5 no se lee en otro lado.
+#   2. Vida de cada temporal (compiler.cfg.liveness) como un intervalo de
+#      posiciones en el código: desde la primera hasta la última en que está
+#      vivo.
+#   3. Linear scan (Poletto y Sarkar): recorriendo los intervalos por su
+#      inicio, cada temporal toma el registro libre de menor número, y un
+#      registro se libera cuando termina el intervalo que lo ocupa. No hay
+#      derrames: un registro es un nombre, y hay tantos como haga falta.
+#
+# Los registros se llaman $t1, $t2, ... para que compiler.ir_executor los siga
+# tratando como temporales (se copian sin comprobar que estén declarados). Las
+# variables no cambian de nombre.
+#
+# Un temporal que se puede leer sin haberse escrito antes (el IR de
+# SemanticTranslator no tiene ninguno) daría "Undefined variable": conserva su
+# nombre y no entra en la asignación.
+
+
+class RegisterAllocator:
+    def __init__(self, ir_code):
+        self.cfg = build_cfg(ir_code)
+        self.declared = {instruction['result'] for instruction in ir_code if instruction['op'] == 'DECLARE'}
+        self.unsafe = set()
+
+    def is_temp(self, name):
+        return name is not None and TEMP_NAME.match(name) is not None and name not in self.declared
+
+    def allocate(self):
+        # (cuádruplos con registros, número de registros)
+        live_in, _ = liveness(self.cfg)
+        self.unsafe = {name for name in live_in[self.cfg.entry] if self.is_temp(name)}
+        self.propagate_copies()
+        start, end = self.intervals()
+        registers = self.linear_scan(start, end)
+        names = self.register_names(registers)
+        for block in self.cfg.blocks:
+            block.instructions = [rename(instruction, names) for instruction in block.instructions]
+            if block.kind == BRANCH:
+                block.condition = names.get(block.condition, block.condition)
+        code = self.cfg.to_code()
+        # Sin los registros de las comparaciones que to_code() unió con su salto
+        used = {name for instruction in code for name in operands(instruction) + [written(instruction)]}
+        return code, len(set(names.values()) & used)
+
+    def counts(self):
+        # (escrituras, lecturas) de cada nombre
+        writes = {}
+        reads = {}
+        for block in self.cfg.blocks:
+            for instruction in block.instructions:
+                for name in operands(instruction):
+                    reads[name] = reads.get(name, 0) + 1
+                name = written(instruction)
+                if name is not None:
+                    writes[name] = writes.get(name, 0) + 1
+            if block.kind == BRANCH and not is_literal(block.condition):
+                reads[block.condition] = reads.get(block.condition, 0) + 1
+        return writes, reads
+
+    def propagate_copies(self):
+        blocks = self.cfg.blocks
+        writes, _ = self.counts()
+
+        def single(name):
+            return self.is_temp(name) and writes.get(name) == 1 and name not in self.unsafe
+
+        # Copias de un literal o de un temporal que no cambia: las lecturas
+        # del destino pasan a leer el origen (siguiendo las cadenas)
+        copies = {}
+        for block in blocks:
+            for instruction in block.instructions:
+                if (instruction['op'] == 'ASSIGN' and single(instruction['result'])
+                        and (is_literal(instruction['arg1']) or single(instruction['arg1']))):
+                    copies[instruction['result']] = instruction['arg1']
+
+        def source(name):
+            while name in copies:
+                name = copies[name]
+            return name
+
+        sources = {name: source(name) for name in copies}
+        for block in blocks:
+            block.instructions = [rename(instruction, sources) for instruction in block.instructions
+                                  if instruction['op'] != 'ASSIGN' or instruction['result'] not in copies]
+            if block.kind == BRANCH:
+                block.condition = sources.get(block.condition, block.condition)
+
+        # `op a b t5; ASSIGN t5 x` escribe directo en x. Asignar a una
+        # variable comprueba que exista: solo se salta la comprobación si x
+        # ya se escribió en todo camino hasta ahí. Solo se siguen las
+        # variables: los temporales no se comprueban
+        writes, reads = self.counts()
+
+        def variable(name):
+            return name is not None and not self.is_temp(name)
+
+        defined_in = written_on_entry(self.cfg, {
+            block: {name for name in map(written, block.instructions) if variable(name)} for block in blocks
+        })
+        for block in blocks:
+            defined = defined_in[block]
+            instructions = []
+            for instruction in block.instructions:
+                previous = instructions[-1] if instructions else None
+                value = instruction['arg1']
+                target = instruction['result']
+                if (instruction['op'] == 'ASSIGN' and previous is not None
+                        and previous['op'] not in ('DECLARE', 'READ') and written(previous) == value
+                        and single(value) and reads.get(value) == 1
+                        and (self.is_temp(target) or target in defined)):
+                    instructions[-1] = dict(previous, result=target)
+                else:
+                    instructions.append(instruction)
+                name = written(instruction)
+                if variable(name):
+                    defined.add(name)
+            block.instructions = instructions
+
+    def intervals(self):
+        # Inicio y fin de la vida de cada temporal. La instrucción en la
+        # posición i lee en 2i y escribe en 2i + 1, así que un temporal que
+        # muere al leerse puede dejar su registro al que se escribe ahí mismo.
+        # Cada bloque ocupa además una posición para su salto final
+        live_in, live_out = liveness(self.cfg)
+        start = {}
+        end = {}
+
+        def touch(name, point):
+            if self.is_temp(name) and name not in self.unsafe:
+                if name not in start or point < start[name]:
+                    start[name] = point
+                if name not in end or point > end[name]:
+                    end[name] = point
+
+        position = 0
+        for block in self.cfg.blocks:
+            for name in live_in[block]:
+                touch(name, 2 * position)
+            for instruction in block.instructions:
+                for name in operands(instruction):
+                    touch(name, 2 * position)
+                touch(written(instruction), 2 * position + 1)
+                position += 1
+            if block.kind == BRANCH:
+                touch(block.condition, 2 * position)
+            position += 1
+            for name in live_out[block]:
+                touch(name, 2 * position - 1)
+        return start, end
+
+    def linear_scan(self, start, end):
+        # Número de registro de cada temporal
+        registers = {}
+        active = []
+        free = []
+        count = 0
+        for name in sorted(start, key=lambda name: (start[name], end[name])):
+            while active and active[0][0] < start[name]:
+                heapq.heappush(free, heapq.heappop(active)[1])
+            if free:
+                register = heapq.heappop(free)
+            else:
+                register = count
+                count += 1
+            registers[name] = register
+            heapq.heappush(active, (end[name], register))
+        return registers
+
+    def register_names(self, registers):
+        # Nombre de cada temporal: $t1, $t2, ... sin repetir los que se quedan
+        names = []
+        number = 0
+        for _ in range(len(set(registers.values()))):
+            number += 1
+            while temp_name(number) in self.unsafe:
+                number += 1
+            names.append(temp_name(number))
+        return {name: names[register] for name, register in registers.items()}
+
+
+def allocate_registers(ir_code):
+    # (cuádruplos equivalentes a ir_code con los temporales en registros,
+    # número de registros)
+    return RegisterAllocator(ir_code).allocate()
+
+
+def temp_count(ir_code):
+    # Temporales distintos que usa ir_code
+    names = set()
+    for instruction in ir_code:
+        for name in operands(instruction) + [written(instruction)]:
+            if name is not None and TEMP_NAME.match(name):
+                names.add(name)
+    return len(names)
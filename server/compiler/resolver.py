@@ -0,0 +1,181 @@
+from .ast_nodes import (
+    Program, VariableDeclaration, Assignment, BinaryOperation, UnaryOperation,
+    Number, String, Identifier, Print, IfStatement, WhileLoop, Read,
+)
+
+# Resolución de variables antes de ejecutar: cada nombre declarado recibe una
+# ranura (un índice en la lista de valores del programa) y los nodos que lo
+# usan (Identifier, Assignment, VariableDeclaration y Read) la guardan en su
+# campo `slot`. Hay un solo ámbito, como en la ejecución, y redeclarar un
+# nombre reutiliza su ranura.
+#
+# Las ranuras se reparten antes de recorrer el programa, con todas las
+# declaraciones del texto, estén donde estén. Si un nombre está declarado en
+# algún lado, que la declaración se haya ejecutado antes de usarlo depende del
+# camino (un macaron, un ciclo que no da vueltas, una declaración más abajo) y
+# se comprueba al ejecutar: la ranura empieza en UNDEFINED y el error es el
+# mismo y en el mismo orden que sin resolver.
+#
+# Lo único que se reporta aquí es un nombre que no se declara en ningún lado:
+# el error tiene el mensaje de la ejecución, pero sale antes de ejecutar nada,
+# aunque el uso esté en código que nunca se alcanza.
+#
+# De paso se marcan las sumas que pueden unir dos cadenas (`concat` en los
+# BinaryOperation de `+`), las únicas que los motores cargan al presupuesto
+# (compiler.budget). Una cadena sale de un literal, de `lire` o de sumar dos
+# cadenas, así que una variable puede guardar una si alguna declaración o
+# asignación le da un valor así, o si recibe `lire`.
+
+# Valor de las ranuras de variables aún no declaradas
+UNDEFINED = object()
+
+# Método de Resolver que recorre cada clase de nodo
+RESOLVERS = {
+    Program: 'resolve_program',
+    VariableDeclaration: 'resolve_variable_declaration',
+    Assignment: 'resolve_assignment',
+    BinaryOperation: 'resolve_binary_operation',
+    UnaryOperation: 'resolve_unary_operation',
+    Number: 'resolve_literal',
+    String: 'resolve_literal',
+    Identifier: 'resolve_identifier',
+    Print: 'resolve_print',
+    IfStatement: 'resolve_if_statement',
+    WhileLoop: 'resolve_while_loop',
+    Read: 'resolve_read',
+}
+
+
+class Resolver:
+    def __init__(self):
+        self.slots = {}
+        self.names = []
+        # Ranuras que pueden guardar una cadena
+        self.strings = set()
+        # (ranura, valor) de cada declaración con valor y asignación, y los
+        # índices en stores de los valores que leen cada ranura
+        self.stores = []
+        self.readers = {}
+        self.store = None
+        # Nodos de `+` en post-orden
+        self.additions = []
+        self.dispatch = {cls: getattr(self, name) for cls, name in RESOLVERS.items()}
+
+    def resolve(self, node):
+        method = self.dispatch.get(type(node))
+        if method is None:
+            raise RuntimeError(f"Unknown node type: {type(node).__name__}")
+        method(node)
+        return self
+
+    def frame(self):
+        # Valores iniciales para ejecutar el programa resuelto
+        return [UNDEFINED] * len(self.names)
+
+    def lookup(self, name, message):
+        slot = self.slots.get(name)
+        if slot is None:
+            raise RuntimeError(f"{message}: {name}")
+        return slot
+
+    def resolve_block(self, statements):
+        for statement in statements:
+            self.resolve(statement)
+
+    def declare(self, statements):
+        # Ranura para cada nombre declarado en statements, en orden de texto
+        for statement in statements:
+            if isinstance(statement, VariableDeclaration):
+                if statement.name not in self.slots:
+                    self.slots[statement.name] = len(self.names)
+                    self.names.append(statement.name)
+            elif isinstance(statement, IfStatement):
+                self.declare(statement.consequent)
+                self.declare(statement.alternate or [])
+            elif isinstance(statement, WhileLoop):
+                self.declare(statement.body)
+
+    def resolve_program(self, node):
+        self.declare(node.body)
+        self.resolve_block(node.body)
+        self.find_strings()
+
+    def resolve_value(self, slot, value):
+        self.store = len(self.stores)
+        self.stores.append((slot, value))
+        self.resolve(value)
+        self.store = None
+
+    def find_strings(self):
+        strings = self.strings
+        work = list(range(len(self.stores)))
+        while work:
+            slot, value = self.stores[work.pop()]
+            if slot not in strings and self.may_be_string(value):
+                strings.add(slot)
+                work.extend(self.readers.get(slot, ()))
+
+        def operand(node):
+            if type(node) is BinaryOperation and node.operator == 'PLUS':
+                return node.concat
+            return self.may_be_string(node)
+
+        for node in self.additions:
+            node.concat = operand(node.left) and operand(node.right)
+
+    def may_be_string(self, node):
+        cls = type(node)
+        if cls is String:
+            return True
+        if cls is Identifier:
+            return node.slot in self.strings
+        if cls is BinaryOperation and node.operator == 'PLUS':
+            return self.may_be_string(node.left) and self.may_be_string(node.right)
+        return False
+
+    def resolve_variable_declaration(self, node):
+        node.slot = self.slots[node.name]
+        if node.value is not None:
+            self.resolve_value(node.slot, node.value)
+
+    def resolve_assignment(self, node):
+        node.slot = self.lookup(node.name, "Cannot assign to undefined variable")
+        self.resolve_value(node.slot, node.value)
+
+    def resolve_binary_operation(self, node):
+        self.resolve(node.left)
+        self.resolve(node.right)
+        if node.operator == 'PLUS':
+            self.additions.append(node)
+
+    def resolve_unary_operation(self, node):
+        self.resolve(node.operand)
+
+    def resolve_literal(self, node):
+        pass
+
+    def resolve_identifier(self, node):
+        node.slot = self.lookup(node.name, "Undefined variable")
+        if self.store is not None:
+            self.readers.setdefault(node.slot, []).append(self.store)
+
+    def resolve_print(self, node):
+        self.resolve(node.expression)
+
+    def resolve_if_statement(self, node):
+        self.resolve(node.condition)
+        self.resolve_block(node.consequent)
+        if node.alternate:
+            self.resolve_block(node.alternate)
+
+    def resolve_while_loop(self, node):
+        self.resolve(node.condition)
+        self.resolve_block(node.body)
+
+    def resolve_read(self, node):
+        node.slot = self.lookup(node.variable, "Cannot read into undefined variable")
+        self.strings.add(node.slot)
+
+
+def resolve(program):
+    return Resolver().resolve(program)
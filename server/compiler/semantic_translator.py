@@ -1,12 +1,79 @@
+import json
+import math
+import re
+
+from .arena import (
+    OPERATORS, PROGRAM, VARIABLE_DECLARATION, ASSIGNMENT, BINARY_OPERATION,
+    UNARY_OPERATION, NUMBER, STRING, IDENTIFIER, PRINT, IF_STATEMENT, WHILE_LOOP, READ,
+)
+from .ast_nodes import (
+    Program, VariableDeclaration, Assignment, BinaryOperation, UnaryOperation,
+    Number, String, Identifier, Print, IfStatement, WhileLoop, Read,
+)
+from .optimizer import COMPARISONS
+
+# Los operandos de los cuádruplos son nombres (variables y temporales) o
+# literales: números como str(valor) (number_literal) y cadenas entre comillas
+# (JSON). Una declaración sin valor usa el cero de su tipo.
+#
+# Las condiciones de macaron y tour_eiffel se traducen como saltos
+# (translate_condition): una comparación es un solo salto relacional
+# (IF_FALSE_LT a b L salta a L si `a < b` es falso, sin guardar el resultado
+# en un temporal), && salta al lado falso en cuanto un operando es falso y ||
+# salta al verdadero en cuanto uno es verdadero, sin evaluar el lado derecho
+# si no hace falta. Como valor
+# (`x = a && b`), && y || también evalúan el lado derecho solo si hace falta.
+DEFAULT_VALUES = {'INT': '0', 'FLOAT': '0.0'}
+
+# Comparación de cada salto relacional
+RELATIONAL_BRANCHES = {f'IF_FALSE_{op}': op for op in COMPARISONS}
+
+# Los temporales se llaman $t1, $t2, ...: `$` no puede aparecer en un
+# identificador, así que nunca chocan con las variables del programa
+TEMP_NAME = re.compile(r'\$t(\d+)$')
+
+def temp_name(number):
+    return f'$t{number}'
+
+def number_literal(value):
+    # str() de un infinito es `inf`, que se leería como un nombre: se escribe
+    # como un literal que float() lee como infinito. NaN no tiene literal
+    if math.isinf(value):
+        return '1e999' if value > 0 else '-1e999'
+    if math.isnan(value):
+        raise ValueError('NaN has no IR literal')
+    return str(value)
+
+# Método de SemanticTranslator que traduce cada clase de nodo
+EXPRESSION_TRANSLATORS = {
+    BinaryOperation: 'translate_binary_operation',
+    UnaryOperation: 'translate_unary_operation',
+    Number: 'translate_number',
+    String: 'translate_string',
+    Identifier: 'translate_identifier',
+}
+STATEMENT_TRANSLATORS = {
+    VariableDeclaration: 'translate_declaration',
+    Assignment: 'translate_assignment',
+    IfStatement: 'translate_if',
+    WhileLoop: 'translate_while',
+    Print: 'translate_print',
+    Read: 'translate_read',
+}
+
 class SemanticTranslator:
+    # Traduce el AST de objetos (ast_nodes) a cuádruplos, eligiendo el método
+    # de cada nodo por su clase
     def __init__(self):
         self.code = []
         self.temp_counter = 0
         self.label_counter = 0
+        self.expressions = {cls: getattr(self, name) for cls, name in EXPRESSION_TRANSLATORS.items()}
+        self.statements = {cls: getattr(self, name) for cls, name in STATEMENT_TRANSLATORS.items()}
 
     def new_temp(self):
         self.temp_counter += 1
-        return f't{self.temp_counter}'
+        return temp_name(self.temp_counter)
 
     def new_label(self):
         self.label_counter += 1
@@ -23,46 +90,136 @@ class SemanticTranslator:
         return instruction
 
     def translate_expression(self, node):
-        if node['type'] == 'binary_operation':
-            left_temp = self.translate_expression(node['left'])
-            right_temp = self.translate_expression(node['right'])
-            result = self.new_temp()
-            self.emit(node['operator'], left_temp, right_temp, result)
-            return result
-        elif node['type'] == 'number':
-            temp = self.new_temp()
-            self.emit('ASSIGN', str(node['value']), None, temp)
-            return temp
-        elif node['type'] == 'identifier':
-            return node['name']
+        method = self.expressions.get(type(node))
+        if method is None:
+            return None
+        return method(node)
+
+    def translate_binary_operation(self, node):
+        if node.operator == 'AND' or node.operator == 'OR':
+            return self.translate_logical(node.operator, node.left, node.right)
+        left_temp = self.translate_expression(node.left)
+        right_temp = self.translate_expression(node.right)
+        result = self.new_temp()
+        self.emit(node.operator, left_temp, right_temp, result)
+        return result
+
+    def translate_logical(self, operator, left, right):
+        # El resultado es BOOL (bool()) del lado izquierdo si con él basta y
+        # si no el del derecho. Sin phi en el IR, ese temporal se escribe una
+        # vez en cada uno de los dos caminos, como una variable
+        result = self.new_temp()
+        end_label = self.new_label()
+        left_temp = self.translate_expression(left)
+        self.emit('BOOL', left_temp, None, result)
+        if operator == 'AND':
+            self.emit('IF_FALSE', result, None, end_label)
+        else:
+            right_label = self.new_label()
+            self.emit('IF_FALSE', result, None, right_label)
+            self.emit('GOTO', None, None, end_label)
+            self.emit('LABEL', None, None, right_label)
+        right_temp = self.translate_expression(right)
+        self.emit('BOOL', right_temp, None, result)
+        self.emit('LABEL', None, None, end_label)
+        return result
+
+    def logical_operands(self, node):
+        # (operador, izquierdo, derecho) si el nodo es && o ||, si no None
+        if type(node) is BinaryOperation and (node.operator == 'AND' or node.operator == 'OR'):
+            return node.operator, node.left, node.right
+        return None
+
+    def comparison_operands(self, node):
+        # (comparación, izquierdo, derecho) si el nodo es una comparación, si
+        # no None
+        if type(node) is BinaryOperation and node.operator in COMPARISONS:
+            return node.operator, node.left, node.right
+        return None
+
+    def literal(self, node):
+        # Valor del nodo si es un literal, si no None
+        if type(node) is Number or type(node) is String:
+            return node.value
         return None
 
+    def translate_condition(self, node, false_label):
+        # Salta a false_label si la condición es falsa; si es verdadera sigue
+        # con la instrucción siguiente
+        logical = self.logical_operands(node)
+        if logical is not None:
+            operator, left, right = logical
+            if operator == 'AND':
+                self.translate_condition(left, false_label)
+                self.translate_condition(right, false_label)
+            else:
+                # Sin salto por verdadero en el IR: si el lado izquierdo es
+                # verdadero, un GOTO se salta el derecho
+                true_label = self.new_label()
+                right_label = self.new_label()
+                self.translate_condition(left, right_label)
+                self.emit('GOTO', None, None, true_label)
+                self.emit('LABEL', None, None, right_label)
+                self.translate_condition(right, false_label)
+                self.emit('LABEL', None, None, true_label)
+            return
+        comparison = self.comparison_operands(node)
+        if comparison is not None:
+            operator, left, right = comparison
+            left_temp = self.translate_expression(left)
+            right_temp = self.translate_expression(right)
+            self.emit(f'IF_FALSE_{operator}', left_temp, right_temp, false_label)
+            return
+        value = self.literal(node)
+        if value is None:
+            self.emit('IF_FALSE', self.translate_expression(node), None, false_label)
+        elif not value:
+            self.emit('GOTO', None, None, false_label)
+
+    def translate_unary_operation(self, node):
+        operand_temp = self.translate_expression(node.operand)
+        result = self.new_temp()
+        self.emit('NEG', operand_temp, None, result)
+        return result
+
+    def translate_number(self, node):
+        temp = self.new_temp()
+        self.emit('ASSIGN', number_literal(node.value), None, temp)
+        return temp
+
+    def translate_string(self, node):
+        temp = self.new_temp()
+        self.emit('ASSIGN', json.dumps(node.value, ensure_ascii=False), None, temp)
+        return temp
+
+    def translate_identifier(self, node):
+        return node.name
+
     def translate_declaration(self, node):
-        if node.get('value'):
-            value_temp = self.translate_expression(node['value'])
-            self.emit('DECLARE', node['var_type'], value_temp, node['name'])
+        if node.value is not None:
+            value_temp = self.translate_expression(node.value)
+            self.emit('DECLARE', node.var_type, value_temp, node.name)
         else:
-            self.emit('DECLARE', node['var_type'], '0', node['name'])
+            self.emit('DECLARE', node.var_type, DEFAULT_VALUES[node.var_type], node.name)
 
     def translate_assignment(self, node):
-        value_temp = self.translate_expression(node['value'])
-        self.emit('ASSIGN', value_temp, None, node['name'])
+        value_temp = self.translate_expression(node.value)
+        self.emit('ASSIGN', value_temp, None, node.name)
 
     def translate_if(self, node):
-        condition_temp = self.translate_expression(node['condition'])
         else_label = self.new_label()
         end_label = self.new_label()
 
-        self.emit('IF_FALSE', condition_temp, None, else_label)
+        self.translate_condition(node.condition, else_label)
         
-        for stmt in node['consequent']:
+        for stmt in node.consequent:
             self.translate_statement(stmt)
         
         self.emit('GOTO', None, None, end_label)
         self.emit('LABEL', None, None, else_label)
         
-        if node['alternate']:
-            for stmt in node['alternate']:
+        if node.alternate:
+            for stmt in node.alternate:
                 self.translate_statement(stmt)
         
         self.emit('LABEL', None, None, end_label)
@@ -72,33 +229,130 @@ class SemanticTranslator:
         end_label = self.new_label()
         
         self.emit('LABEL', None, None, start_label)
-        condition_temp = self.translate_expression(node['condition'])
-        self.emit('IF_FALSE', condition_temp, None, end_label)
+        self.translate_condition(node.condition, end_label)
         
-        for stmt in node['body']:
+        for stmt in node.body:
             self.translate_statement(stmt)
         
         self.emit('GOTO', None, None, start_label)
         self.emit('LABEL', None, None, end_label)
 
     def translate_print(self, node):
-        value_temp = self.translate_expression(node['expression'])
+        value_temp = self.translate_expression(node.expression)
         self.emit('PRINT', value_temp)
 
+    def translate_read(self, node):
+        self.emit('READ', None, None, node.variable)
+
     def translate_statement(self, node):
-        if node['type'] == 'variable_declaration':
-            self.translate_declaration(node)
-        elif node['type'] == 'assignment':
-            self.translate_assignment(node)
-        elif node['type'] == 'if_statement':
-            self.translate_if(node)
-        elif node['type'] == 'while_loop':
-            self.translate_while(node)
-        elif node['type'] == 'print':
-            self.translate_print(node)
+        method = self.statements.get(type(node))
+        if method is not None:
+            method(node)
 
     def translate(self, ast):
-        if ast['type'] == 'program':
-            for statement in ast['body']:
+        if isinstance(ast, Program):
+            for statement in ast.body:
                 self.translate_statement(statement)
-        return self.code
\ No newline at end of file
+        return self.code
+
+class ArenaTranslator(SemanticTranslator):
+    # Misma traducción que SemanticTranslator, sobre un AST plano (ASTArena)
+    def translate_expression(self, node):
+        arena = self.arena
+        kind = arena.kinds[node]
+        if kind == BINARY_OPERATION:
+            logical = self.logical_operands(node)
+            if logical is not None:
+                return self.translate_logical(*logical)
+            left_temp = self.translate_expression(arena.first[node])
+            right_temp = self.translate_expression(arena.second[node])
+            result = self.new_temp()
+            self.emit(OPERATORS[arena.operators[node]], left_temp, right_temp, result)
+            return result
+        elif kind == UNARY_OPERATION:
+            operand_temp = self.translate_expression(arena.first[node])
+            result = self.new_temp()
+            self.emit('NEG', operand_temp, None, result)
+            return result
+        elif kind == NUMBER:
+            temp = self.new_temp()
+            self.emit('ASSIGN', number_literal(arena.constants[arena.first[node]]), None, temp)
+            return temp
+        elif kind == STRING:
+            temp = self.new_temp()
+            self.emit('ASSIGN', json.dumps(arena.constants[arena.first[node]], ensure_ascii=False), None, temp)
+            return temp
+        elif kind == IDENTIFIER:
+            return arena.constants[arena.first[node]]
+        return None
+
+    def logical_operands(self, node):
+        arena = self.arena
+        if arena.kinds[node] == BINARY_OPERATION:
+            operator = OPERATORS[arena.operators[node]]
+            if operator == 'AND' or operator == 'OR':
+                return operator, arena.first[node], arena.second[node]
+        return None
+
+    def comparison_operands(self, node):
+        arena = self.arena
+        if arena.kinds[node] == BINARY_OPERATION:
+            operator = OPERATORS[arena.operators[node]]
+            if operator in COMPARISONS:
+                return operator, arena.first[node], arena.second[node]
+        return None
+
+    def literal(self, node):
+        arena = self.arena
+        if arena.kinds[node] == NUMBER or arena.kinds[node] == STRING:
+            return arena.constants[arena.first[node]]
+        return None
+
+    def translate_list(self, list_id):
+        for statement in self.arena.statements(list_id):
+            self.translate_statement(statement)
+
+    def translate_statement(self, node):
+        arena = self.arena
+        kind = arena.kinds[node]
+        if kind == VARIABLE_DECLARATION:
+            var_type = OPERATORS[arena.operators[node]]
+            name = arena.constants[arena.first[node]]
+            if arena.second[node] >= 0:
+                value_temp = self.translate_expression(arena.second[node])
+                self.emit('DECLARE', var_type, value_temp, name)
+            else:
+                self.emit('DECLARE', var_type, DEFAULT_VALUES[var_type], name)
+        elif kind == ASSIGNMENT:
+            value_temp = self.translate_expression(arena.second[node])
+            self.emit('ASSIGN', value_temp, None, arena.constants[arena.first[node]])
+        elif kind == IF_STATEMENT:
+            else_label = self.new_label()
+            end_label = self.new_label()
+            self.translate_condition(arena.first[node], else_label)
+            self.translate_list(arena.second[node])
+            self.emit('GOTO', None, None, end_label)
+            self.emit('LABEL', None, None, else_label)
+            if arena.third[node] >= 0:
+                self.translate_list(arena.third[node])
+            self.emit('LABEL', None, None, end_label)
+        elif kind == WHILE_LOOP:
+            start_label = self.new_label()
+            end_label = self.new_label()
+            self.emit('LABEL', None, None, start_label)
+            self.translate_condition(arena.first[node], end_label)
+            self.translate_list(arena.second[node])
+            self.emit('GOTO', None, None, start_label)
+            self.emit('LABEL', None, None, end_label)
+        elif kind == PRINT:
+            value_temp = self.translate_expression(arena.first[node])
+            self.emit('PRINT', value_temp)
+        elif kind == READ:
+            self.emit('READ', None, None, arena.constants[arena.first[node]])
+
+    def translate(self, arena, node=None):
+        self.arena = arena
+        node = arena.root if node is None else node
+        if arena.kinds[node] == PROGRAM:
+            self.translate_list(arena.first[node])
+        return self.code
@@ -0,0 +1,756 @@
+import json
+import math
+
+from .budget import STRING_CHECK
+from .cfg import (
+    BRANCH, FALL, GOTO, build_cfg, dominance_frontiers, dominator_tree, operands, written, written_on_entry,
+)
+from .interpreter import OPERATOR_FUNCTIONS
+from .ir_executor import TEMP_NAME, IRExecutor, is_literal, literal_value, load
+from .resolver import resolve
+from .semantic_translator import SemanticTranslator, number_literal
+
+# Optimización de los cuádruplos de SemanticTranslator en forma SSA:
+#
+#   1. grafo de flujo y dominadores (compiler.cfg)
+#   2. SSA (Cytron et al.): cada escritura de un nombre es un valor nuevo y
+#      donde se juntan caminos con valores distintos hay una phi (frontera de
+#      dominancia iterada). Las copias y los literales se propagan al
+#      renombrar, así que `$t1 = 2.0; x = $t1` no deja instrucciones
+#   3. SCCP (Wegman y Zadeck): propagación de constantes que solo sigue las
+#      ramas que se pueden tomar; las operaciones constantes se pliegan y los
+#      bloques a los que no se llega se eliminan
+#   4. GVN sobre el árbol de dominadores: una operación igual a otra que la
+#      domina usa su resultado, y una phi con un solo valor es ese valor
+#   5. eliminación de código muerto
+#   6. salida de SSA: los valores de una phi que no interfieren (ninguno está
+#      vivo donde se define el otro) comparten nombre, el de la variable si se
+#      puede; los demás se copian al final de cada predecesor (las aristas
+#      críticas se dividen antes)
+#
+# El código resultante da la misma salida y los mismos errores, en el mismo
+# orden, que el original en compiler.ir_executor, y las vueltas de los ciclos
+# siguen siendo saltos hacia atrás:
+#
+#   - una operación que puede fallar (aritmética, comparaciones de orden, NEG)
+#     no se elimina aunque su resultado no se use, y no se pliega si falla
+#   - solo se promueven a SSA los nombres que en todo camino se escriben antes
+#     de leerse. Una variable declarada en una rama o en un ciclo que se lee
+#     donde quizá no existe, o que recibe `lire`, queda como nombre: se lee y
+#     se escribe en su lugar, con las comprobaciones de siempre
+#   - un booleano o NaN no tienen literal en el IR: la operación que los
+#     produce se conserva
+#   - una cadena de más de STRING_CHECK caracteres no se pliega: se construye
+#     al ejecutar, donde el presupuesto la carga (compiler.budget)
+
+# Operaciones que producen un valor a partir de sus operandos
+VALUE_OPS = set(OPERATOR_FUNCTIONS) | {'AND', 'OR', 'NEG', 'BOOL'}
+# Las que tienen un solo operando
+UNARY_OPS = {'NEG', 'BOOL'}
+# Las que nunca fallan y se pueden eliminar si su resultado no se usa
+SAFE_OPS = {'EQ', 'NE', 'AND', 'OR', 'BOOL'}
+# Las que dan lo mismo con los operandos en otro orden (para GVN)
+COMMUTATIVE_OPS = {'EQ', 'NE', 'MULT', 'AND', 'OR'}
+
+# Valores del retículo de SCCP además de las constantes: todavía sin valor
+# conocido (TOP) y con más de un valor posible (BOTTOM)
+TOP = object()
+BOTTOM = object()
+
+# Argumento de una phi por un camino en el que el nombre no se ha escrito
+UNDEFINED = object()
+
+
+class Constant:
+    __slots__ = ('value', 'key')
+
+    def __init__(self, value):
+        self.value = value
+        # 0, 0.0, -0.0 y False son iguales en Python pero no aquí
+        self.key = (type(value), repr(value))
+
+
+class Instruction:
+    # Operación en SSA. El valor que produce es la instrucción misma; los
+    # argumentos son Constant, Instruction, UNDEFINED (solo en phi) o el
+    # nombre (str) de una variable que no se promovió. `target` es el nombre
+    # que escribe una instrucción sobre una de esas variables, y `name` el
+    # nombre original del resultado (para elegir nombres al salir de SSA)
+    __slots__ = ('op', 'args', 'name', 'target', 'type', 'block')
+
+    def __init__(self, op, args, name, block):
+        self.op = op
+        self.args = args
+        self.name = name
+        self.target = None
+        self.type = None
+        self.block = block
+
+    def has_value(self):
+        return self.target is None and self.op != 'PRINT'
+
+
+def literal_operand(value):
+    # Operando del IR para un valor constante, o None si no tiene literal
+    if type(value) is str:
+        return json.dumps(value, ensure_ascii=False)
+    if type(value) is int or type(value) is float and not math.isnan(value):
+        return number_literal(value)
+    return None
+
+
+def operand_key(arg):
+    return arg.key if type(arg) is Constant else arg
+
+
+def edge_arguments(block, successor):
+    # (phi, argumento) de las phi de `successor` por la arista desde `block`
+    for index, predecessor in enumerate(successor.predecessors):
+        if predecessor is block:
+            return [(phi, phi.args[index]) for phi in successor.phis]
+    return []
+
+
+def sequence_copies(copies, new_temp):
+    # Copias en paralelo (destino, origen) en un orden en el que ninguna pisa
+    # un origen antes de que se lea; un ciclo (un intercambio) pasa por un
+    # temporal
+    pending = [(target, source) for target, source in copies if target != source]
+    code = []
+    while pending:
+        sources = {source for _, source in pending}
+        ready = [copy for copy in pending if copy[0] not in sources]
+        if not ready:
+            target = pending[0][0]
+            temp = new_temp()
+            code.append({'op': 'ASSIGN', 'arg1': target, 'arg2': None, 'result': temp})
+            pending = [(copy_target, temp if source == target else source) for copy_target, source in pending]
+            continue
+        for target, source in ready:
+            code.append({'op': 'ASSIGN', 'arg1': source, 'arg2': None, 'result': target})
+        pending = [copy for copy in pending if copy not in ready]
+    return code
+
+
+class SSAOptimizer:
+    def __init__(self, ir_code):
+        self.cfg = build_cfg(ir_code)
+        self.cfg.remove_blocks(set(self.cfg.reverse_postorder()))
+        # Tipo declarado de cada variable (para volver a escribir DECLARE)
+        self.types = {}
+        for instruction in ir_code:
+            if instruction['op'] == 'DECLARE':
+                self.types.setdefault(instruction['result'], instruction['arg1'])
+        self.promoted = set()
+        # Instrucciones que SCCP calculó: no fallan al ejecutarse
+        self.folded = set()
+
+    def new_temp(self):
+        # Sin chocar con los temporales del código ni con los de los saltos
+        # relacionales (compiler.cfg)
+        return self.cfg.new_temp()
+
+    def optimize(self):
+        self.promoted = self.promoted_names()
+        self.build()
+        self.propagate_constants()
+        self.number_values()
+        self.remove_dead_code()
+        return self.leave_ssa()
+
+    def checked(self, name):
+        # La ejecución comprueba que exista un nombre antes de asignarle
+        # (compiler.ir_executor, STORE) si es una variable declarada
+        return name in self.types or not TEMP_NAME.match(name)
+
+    def promoted_names(self):
+        # Nombres que en todo camino se escriben antes de leerse
+        blocks = self.cfg.blocks
+        names = set()
+        unsafe = set()
+
+        # Lo que cada bloque lee (o comprueba al asignar) antes de escribirlo
+        # es lo único que depende de los demás bloques
+        exposed = {}
+        for block in blocks:
+            local = set()
+            reads = exposed[block] = set()
+            for instruction in block.instructions:
+                for name in operands(instruction):
+                    names.add(name)
+                    if name not in local:
+                        reads.add(name)
+                name = written(instruction)
+                if name is None:
+                    continue
+                names.add(name)
+                if instruction['op'] == 'READ' or not TEMP_NAME.match(name) and name not in self.types:
+                    unsafe.add(name)
+                elif instruction['op'] == 'ASSIGN' and self.checked(name) and name not in local:
+                    reads.add(name)
+                local.add(name)
+            if block.kind == BRANCH and not is_literal(block.condition):
+                names.add(block.condition)
+                if block.condition not in local:
+                    reads.add(block.condition)
+
+        # No se promueve un nombre que se pueda leer sin haberse escrito en
+        # todo camino hasta ahí
+        tracked = set().union(*exposed.values())
+        writes = {block: {written(instruction) for instruction in block.instructions} & tracked
+                  for block in blocks}
+        defined = written_on_entry(self.cfg, writes)
+        for block in blocks:
+            unsafe |= exposed[block] - defined[block]
+        return names - unsafe
+
+    def build(self):
+        cfg = self.cfg
+        promoted = self.promoted
+        idom = cfg.dominators()
+        frontiers = dominance_frontiers(idom)
+
+        # Phi en la frontera de dominancia iterada de los bloques que
+        # escriben cada nombre. Solo las necesitan los nombres que algún
+        # bloque lee antes de escribirlos (SSA semipodada): un temporal que se
+        # usa en su mismo bloque no tiene phi
+        crossing = set()
+        sites = {}
+        for block in cfg.blocks:
+            local = set()
+            for instruction in block.instructions:
+                crossing.update(name for name in operands(instruction) if name not in local)
+                name = written(instruction)
+                if name in promoted:
+                    local.add(name)
+                    if block not in sites.setdefault(name, []):
+                        sites[name].append(block)
+            if block.kind == BRANCH and block.condition not in local:
+                crossing.add(block.condition)
+        sites = {name: blocks for name, blocks in sites.items() if name in crossing}
+        for name, blocks in sites.items():
+            work = list(blocks)
+            placed = set()
+            while work:
+                for frontier in sorted(frontiers[work.pop()], key=lambda block: block.index):
+                    if frontier in placed:
+                        continue
+                    placed.add(frontier)
+                    frontier.phis.append(Instruction('PHI', [UNDEFINED] * len(frontier.predecessors), name, frontier))
+                    if frontier not in blocks:
+                        work.append(frontier)
+
+        # Renombrado: recorrido del árbol de dominadores con el valor actual
+        # de cada nombre en una pila
+        stacks = {name: [] for name in promoted}
+        children = dominator_tree(idom)
+        pushed = {}
+
+        def value(arg):
+            if is_literal(arg):
+                return Constant(literal_value(arg))
+            if arg in promoted:
+                return stacks[arg][-1] if stacks[arg] else UNDEFINED
+            return arg
+
+        def define(block, name, value):
+            stacks[name].append(value)
+            pushed[block].append(name)
+
+        work = [(cfg.entry, False)]
+        while work:
+            block, leaving = work.pop()
+            if leaving:
+                for name in pushed.pop(block):
+                    stacks[name].pop()
+                continue
+            pushed[block] = []
+            for phi in block.phis:
+                define(block, phi.name, phi)
+            code = []
+            for quadruple in block.instructions:
+                op, result = quadruple['op'], quadruple['result']
+                if op in VALUE_OPS:
+                    args = [value(quadruple['arg1'])]
+                    if op not in UNARY_OPS:
+                        args.append(value(quadruple['arg2']))
+                    instruction = Instruction(op, args, result, block)
+                elif op == 'ASSIGN' or op == 'DECLARE':
+                    source = value(quadruple['arg2'] if op == 'DECLARE' else quadruple['arg1'])
+                    if result in promoted and type(source) is not str:
+                        # Una copia no genera instrucción: el nombre pasa a
+                        # ser el valor copiado
+                        define(block, result, source)
+                        continue
+                    instruction = Instruction('ASSIGN' if result in promoted else op, [source], result, block)
+                    if op == 'DECLARE':
+                        instruction.type = quadruple['arg1']
+                elif op == 'PRINT':
+                    instruction = Instruction(op, [value(quadruple['arg1'])], None, block)
+                elif op == 'READ':
+                    instruction = Instruction(op, [], result, block)
+                else:
+                    raise RuntimeError(f"Unknown IR operation: {op}")
+                if result in promoted:
+                    define(block, result, instruction)
+                elif op != 'PRINT':
+                    instruction.target = result
+                code.append(instruction)
+            block.instructions = code
+            if block.kind == BRANCH:
+                block.condition = value(block.condition)
+            for successor in block.successors:
+                for index, predecessor in enumerate(successor.predecessors):
+                    if predecessor is block:
+                        for phi in successor.phis:
+                            stack = stacks[phi.name]
+                            phi.args[index] = stack[-1] if stack else UNDEFINED
+            work.append((block, True))
+            for child in reversed(children[block]):
+                work.append((child, False))
+
+    def substitute(self, replacements):
+        # Cambia cada uso de un valor de `replacements` por su reemplazo
+        def find(arg):
+            while arg in replacements:
+                arg = replacements[arg]
+            return arg
+
+        for block in self.cfg.blocks:
+            for instruction in block.phis + block.instructions:
+                instruction.args = [find(arg) for arg in instruction.args]
+            if block.condition is not None:
+                block.condition = find(block.condition)
+
+    def propagate_constants(self):
+        cfg = self.cfg
+        users = {}
+        for block in cfg.blocks:
+            for instruction in block.phis + block.instructions:
+                for arg in instruction.args:
+                    if type(arg) is Instruction:
+                        users.setdefault(arg, []).append(instruction)
+            if type(block.condition) is Instruction:
+                users.setdefault(block.condition, []).append(block)
+
+        values = {}
+        edges = set()
+        executable = set()
+        flow = [(None, cfg.entry)]
+        work = []
+
+        def lattice(arg):
+            cls = type(arg)
+            if cls is Constant:
+                return arg
+            if cls is Instruction:
+                return values.get(arg, TOP)
+            # Un nombre sin promover puede tener cualquier valor
+            return TOP if arg is UNDEFINED else BOTTOM
+
+        def update(instruction, value):
+            old = values.get(instruction, TOP)
+            if value is TOP or old is BOTTOM:
+                return
+            if old is not TOP:
+                if value is not BOTTOM and value.key == old.key:
+                    return
+                value = BOTTOM
+            values[instruction] = value
+            work.extend(users.get(instruction, ()))
+
+        def evaluate(instruction):
+            op = instruction.op
+            if op == 'PHI':
+                result = TOP
+                block = instruction.block
+                for predecessor, arg in zip(block.predecessors, instruction.args):
+                    if (predecessor, block) not in edges:
+                        continue
+                    value = lattice(arg)
+                    if value is TOP:
+                        continue
+                    if result is TOP:
+                        result = value
+                    elif result is BOTTOM or value is BOTTOM or value.key != result.key:
+                        return BOTTOM
+                return result
+            if op not in VALUE_OPS:
+                return BOTTOM
+            args = [lattice(arg) for arg in instruction.args]
+            if op == 'AND' or op == 'OR':
+                # Un lado falso decide &&, y uno verdadero decide ||
+                decisive = op == 'OR'
+                if any(type(arg) is Constant and bool(arg.value) is decisive for arg in args):
+                    return Constant(decisive)
+            if any(arg is BOTTOM for arg in args):
+                return BOTTOM
+            if any(arg is TOP for arg in args):
+                return TOP
+            if (op == 'PLUS' and all(type(arg.value) is str for arg in args)
+                    and len(args[0].value) + len(args[1].value) > STRING_CHECK):
+                return BOTTOM
+            try:
+                if op == 'NEG':
+                    value = -args[0].value
+                elif op == 'BOOL':
+                    value = bool(args[0].value)
+                elif op == 'AND':
+                    value = bool(args[0].value) and bool(args[1].value)
+                elif op == 'OR':
+                    value = bool(args[0].value) or bool(args[1].value)
+                else:
+                    value = OPERATOR_FUNCTIONS[op](args[0].value, args[1].value)
+            except Exception:
+                # Falla igual al ejecutar: la operación se conserva
+                return BOTTOM
+            return Constant(value)
+
+        def visit_branch(block):
+            successors = block.successors
+            if block.kind == BRANCH:
+                condition = lattice(block.condition)
+                if condition is TOP:
+                    return
+                if condition is not BOTTOM:
+                    successors = [successors[0 if condition.value else 1]]
+            for successor in successors:
+                flow.append((block, successor))
+
+        while flow or work:
+            if flow:
+                predecessor, block = flow.pop()
+                if (predecessor, block) in edges:
+                    continue
+                edges.add((predecessor, block))
+                for phi in block.phis:
+                    update(phi, evaluate(phi))
+                if block in executable:
+                    continue
+                executable.add(block)
+                for instruction in block.instructions:
+                    if instruction.has_value():
+                        update(instruction, evaluate(instruction))
+                visit_branch(block)
+            else:
+                user = work.pop()
+                if type(user) is not Instruction:
+                    if user in executable:
+                        visit_branch(user)
+                elif user.block in executable and user.has_value():
+                    update(user, evaluate(user))
+
+        self.folded = {instruction for instruction, value in values.items() if type(value) is Constant}
+        # Un IF_FALSE con condición constante queda como un solo camino
+        for block in cfg.blocks:
+            if block in executable and block.kind == BRANCH:
+                condition = lattice(block.condition)
+                if type(condition) is Constant:
+                    taken = 0 if condition.value else 1
+                    cfg.remove_edge(block, block.successors[1 - taken])
+                    block.kind = FALL if taken == 0 else GOTO
+                    block.condition = None
+        cfg.remove_blocks(executable)
+
+        replacements = {}
+        for block in cfg.blocks:
+            for instruction in block.phis + block.instructions:
+                value = values.get(instruction)
+                if type(value) is Constant and literal_operand(value.value) is not None:
+                    replacements[instruction] = value
+            block.phis = [phi for phi in block.phis if phi not in replacements]
+            block.instructions = [instruction for instruction in block.instructions
+                                  if instruction not in replacements]
+        self.substitute(replacements)
+
+    def number_values(self):
+        cfg = self.cfg
+        children = dominator_tree(cfg.dominators())
+        replacements = {}
+
+        def find(arg):
+            while arg in replacements:
+                arg = replacements[arg]
+            return arg
+
+        # Tabla de las operaciones de los bloques que dominan al actual; al
+        # salir de un bloque se quita lo que agregó
+        table = {}
+        work = [(cfg.entry, None)]
+        while work:
+            block, added = work.pop()
+            if added is not None:
+                for key in added:
+                    del table[key]
+                continue
+            added = []
+            phis = []
+            for phi in block.phis:
+                keys = tuple(operand_key(find(arg)) for arg in phi.args)
+                key = ('PHI', block) + keys
+                if key in table:
+                    replacements[phi] = table[key]
+                    continue
+                table[key] = phi
+                added.append(key)
+                phis.append(phi)
+            block.phis = phis
+            code = []
+            for instruction in block.instructions:
+                args = [find(arg) for arg in instruction.args]
+                if (instruction.op in VALUE_OPS and instruction.target is None
+                        and all(type(arg) is Constant or type(arg) is Instruction for arg in args)):
+                    keys = [operand_key(arg) for arg in args]
+                    key = (instruction.op, frozenset(keys)) if instruction.op in COMMUTATIVE_OPS else (instruction.op, *keys)
+                    if key in table:
+                        replacements[instruction] = table[key]
+                        continue
+                    table[key] = instruction
+                    added.append(key)
+                code.append(instruction)
+            block.instructions = code
+            work.append((block, added))
+            for child in reversed(children[block]):
+                work.append((child, None))
+        self.substitute(replacements)
+
+        # Una phi cuyos argumentos son todos el mismo valor (o ella misma) es
+        # ese valor; quitar una puede dejar otra así
+        while True:
+            replacements = {}
+            for block in cfg.blocks:
+                phis = []
+                for phi in block.phis:
+                    args = {operand_key(arg): arg for arg in phi.args if arg is not phi}
+                    if len(args) == 1:
+                        replacements[phi] = next(iter(args.values()))
+                    else:
+                        phis.append(phi)
+                block.phis = phis
+            if not replacements:
+                break
+            self.substitute(replacements)
+
+    def remove_dead_code(self):
+        # Se conservan las instrucciones que escriben salida o variables sin
+        # promover, las que leen estas variables (pueden no existir) y las que
+        # pueden fallar (salvo si SCCP las calculó), y todo lo que usan
+        live = set()
+        work = []
+
+        def mark(arg):
+            if type(arg) is Instruction and arg not in live:
+                live.add(arg)
+                work.append(arg)
+
+        for block in self.cfg.blocks:
+            for instruction in block.instructions:
+                if (not instruction.has_value() or instruction.op not in SAFE_OPS and instruction not in self.folded
+                        or any(type(arg) is str for arg in instruction.args)):
+                    mark(instruction)
+            mark(block.condition)
+        while work:
+            for arg in work.pop().args:
+                mark(arg)
+        for block in self.cfg.blocks:
+            block.phis = [phi for phi in block.phis if phi in live]
+            block.instructions = [instruction for instruction in block.instructions if instruction in live]
+
+    def leave_ssa(self):
+        cfg = self.cfg
+        # Las copias de las phi van al final de cada predecesor: uno con dos
+        # sucesores necesita un bloque en medio
+        for block in list(cfg.blocks):
+            if block.phis:
+                for predecessor in list(block.predecessors):
+                    if len(predecessor.successors) > 1:
+                        cfg.split_edge(predecessor, predecessor.successors.index(block))
+
+        interference = self.interference()
+        parent = {}
+        members = {}
+        neighbors = {}
+
+        def find(value):
+            while value in parent:
+                value = parent[value]
+            return value
+
+        def coalesce(a, b):
+            a, b = find(a), find(b)
+            if a is b:
+                return
+            a_neighbors = neighbors.get(a) or interference.get(a, set())
+            b_members = members.get(b) or [b]
+            if any(member in a_neighbors for member in b_members):
+                return
+            parent[b] = a
+            members[a] = (members.get(a) or [a]) + b_members
+            neighbors[a] = a_neighbors | (neighbors.pop(b, None) or interference.get(b, set()))
+            members.pop(b, None)
+
+        # Una phi y sus argumentos que no interfieren son un solo nombre, sin
+        # copias
+        for block in cfg.blocks:
+            for phi in block.phis:
+                for arg in phi.args:
+                    if type(arg) is Instruction:
+                        coalesce(phi, arg)
+
+        # Nombre de cada grupo: el de una de sus variables si ningún otro
+        # grupo lo tiene, si no el menor de sus temporales libres, si no uno
+        # nuevo
+        taken = set()
+        for block in cfg.blocks:
+            for instruction in block.instructions:
+                taken.update(arg for arg in instruction.args if type(arg) is str)
+                if instruction.target is not None:
+                    taken.add(instruction.target)
+            if type(block.condition) is str:
+                taken.add(block.condition)
+        names = {}
+        for block in cfg.blocks:
+            for value in block.phis + [instruction for instruction in block.instructions if instruction.has_value()]:
+                group = find(value)
+                if group in names:
+                    continue
+                originals = [member.name for member in members.get(group) or [group]]
+                variables = [name for name in originals if name in self.types and name not in taken]
+                temps = sorted((int(TEMP_NAME.match(name).group(1)), name) for name in originals
+                               if name not in self.types and TEMP_NAME.match(name) and name not in taken)
+                name = variables[0] if variables else temps[0][1] if temps else self.new_temp()
+                names[group] = name
+                taken.add(name)
+
+        def operand(arg):
+            cls = type(arg)
+            if cls is Constant:
+                return literal_operand(arg.value)
+            if cls is Instruction:
+                return names[find(arg)]
+            if arg is UNDEFINED:
+                raise RuntimeError("Undefined value left in SSA")
+            return arg
+
+        for block in cfg.blocks:
+            code = []
+            for instruction in block.instructions:
+                op, args = instruction.op, instruction.args
+                result = instruction.target if instruction.target is not None else names.get(find(instruction))
+                if op == 'PRINT':
+                    code.append({'op': op, 'arg1': operand(args[0]), 'arg2': None, 'result': None})
+                elif op == 'READ':
+                    code.append({'op': op, 'arg1': None, 'arg2': None, 'result': result})
+                elif op == 'DECLARE':
+                    code.append({'op': op, 'arg1': instruction.type, 'arg2': operand(args[0]), 'result': result})
+                else:
+                    code.append({'op': op, 'arg1': operand(args[0]),
+                                 'arg2': operand(args[1]) if len(args) > 1 else None, 'result': result})
+            copies = []
+            for successor in block.successors:
+                for phi, arg in edge_arguments(block, successor):
+                    if arg is not UNDEFINED:
+                        copies.append((names[find(phi)], operand(arg)))
+            code.extend(sequence_copies(copies, self.new_temp))
+            block.instructions = code
+            if block.condition is not None:
+                block.condition = operand(block.condition)
+        for block in cfg.blocks:
+            block.phis = []
+        self.declare_variables(set(names.values()) & set(self.types))
+        return cfg.to_code()
+
+    def interference(self):
+        # Pares de valores que no pueden compartir nombre: uno está vivo donde
+        # se define el otro. Una phi se define al inicio de su bloque y, por
+        # sus copias, también al final de cada predecesor
+        cfg = self.cfg
+
+        def live_across(block):
+            # Valores vivos al pasar de `block` a sus sucesores, sin contar
+            # los argumentos de las phi
+            live = set()
+            for successor in block.successors:
+                live |= live_in[successor] - set(successor.phis)
+            return live
+
+        def scan(block, live, define):
+            for successor in block.successors:
+                for phi, arg in edge_arguments(block, successor):
+                    define(phi, live)
+            for successor in block.successors:
+                for phi, arg in edge_arguments(block, successor):
+                    if type(arg) is Instruction:
+                        live.add(arg)
+            if type(block.condition) is Instruction:
+                live.add(block.condition)
+            for instruction in reversed(block.instructions):
+                if instruction.has_value():
+                    define(instruction, live)
+                    live.discard(instruction)
+                live.update(arg for arg in instruction.args if type(arg) is Instruction)
+            for phi in block.phis:
+                define(phi, live)
+            return live
+
+        live_in = {block: set() for block in cfg.blocks}
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(cfg.blocks):
+                live = scan(block, live_across(block), lambda value, live: None)
+                if live != live_in[block]:
+                    live_in[block] = live
+                    changed = True
+
+        interference = {}
+
+        def define(value, live):
+            for other in live:
+                if other is not value:
+                    interference.setdefault(value, set()).add(other)
+                    interference.setdefault(other, set()).add(value)
+
+        for block in cfg.blocks:
+            scan(block, live_across(block), define)
+        return interference
+
+    def declare_variables(self, variables):
+        # La ejecución comprueba que una variable exista antes de asignarle:
+        # la primera escritura con copia (ASSIGN) en cada camino pasa a ser un
+        # DECLARE con el tipo de la variable
+        blocks = self.cfg.blocks
+        writes = {block: {instruction['result'] for instruction in block.instructions} & variables
+                  for block in blocks}
+        defined_in = written_on_entry(self.cfg, writes)
+        for block in blocks:
+            defined = defined_in[block]
+            for index, instruction in enumerate(block.instructions):
+                name = instruction['result']
+                if name not in variables:
+                    continue
+                if instruction['op'] == 'ASSIGN' and name not in defined:
+                    block.instructions[index] = {'op': 'DECLARE', 'arg1': self.types[name],
+                                                 'arg2': instruction['arg1'], 'result': name}
+                defined.add(name)
+
+
+def optimize_ir(ir_code):
+    # Cuádruplos equivalentes a ir_code, optimizados en SSA
+    return SSAOptimizer(ir_code).optimize()
+
+
+def instruction_count(ir_code):
+    # Cuádruplos que se ejecutan (las etiquetas no cuentan)
+    return sum(instruction['op'] != 'LABEL' for instruction in ir_code)
+
+
+class SSAExecutor(IRExecutor):
+    # Motor 'ssa' de /api/run: ejecuta los cuádruplos después de optimize_ir
+    def evaluate(self, node):
+        variables = len(resolve(node).names)
+        loaded = load(optimize_ir(SemanticTranslator().translate(node)))
+        # El límite de variables cuenta las del programa, aunque la
+        # optimización haya quitado algunas
+        loaded.variables = variables
+        return self.run(loaded)
@@ -1,3 +1,9 @@
+import json
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, count, islice
+from operator import add
 from typing import List, Dict
 
 # Definición de tokens del lenguaje
@@ -54,4 +60,215 @@ class Token:
             'value': self.value,
             'line': self.line,
             'column': self.column
-        }
\ No newline at end of file
+        }
+
+# Tipo de los tokens de error que emite el lexer en modo de recuperación:
+# un carácter que ninguna regla de TOKEN_SPEC acepta.
+MISMATCH = 'MISMATCH'
+
+# Códigos numéricos de cada tipo de token (índice en TOKEN_SPEC; MISMATCH
+# va al final y no tiene regla propia)
+TOKEN_KINDS = [name for name, _ in TOKEN_SPEC] + [MISMATCH]
+KIND_CODES = {name: code for code, name in enumerate(TOKEN_KINDS)}
+
+_NEWLINE_BYTES = re.compile(rb'\n')
+
+class OffsetArray:
+    # Posiciones crecientes en un array('I'). Tras una edición, los elementos
+    # a partir de `shift[0]` llevan un desplazamiento pendiente `shift[1]` que
+    # se suma al leerlos; así una edición solo reescribe los elementos entre
+    # ella y la edición anterior, no todo el final del arreglo.
+    def __init__(self, values=()):
+        self.values = array('I', values)
+        self.shift = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> int:
+        shift = self.shift
+        if shift is not None and (index if index >= 0 else index + len(self.values)) >= shift[0]:
+            return self.values[index] + shift[1]
+        return self.values[index]
+
+    def __iter__(self):
+        if self.shift is None:
+            return iter(self.values)
+        first, delta = self.shift
+        return chain(islice(self.values, first), map(delta.__add__, islice(self.values, first, None)))
+
+    def bisect_left(self, value: int) -> int:
+        return self._bisect(bisect_left, value)
+
+    def bisect_right(self, value: int) -> int:
+        return self._bisect(bisect_right, value)
+
+    def _bisect(self, search, value):
+        if self.shift is None:
+            return search(self.values, value)
+        first, delta = self.shift
+        if search(self.values, value - delta, first, first + 1) == first:
+            return search(self.values, value, 0, first)
+        return search(self.values, value - delta, first)
+
+    def splice(self, first: int, last: int, values, delta: int):
+        # Reemplaza [first, last) por `values` (ya en coordenadas nuevas) y
+        # desplaza `delta` todos los elementos posteriores.
+        pending_from, pending = self.shift or (first, 0)
+        if pending_from < first:
+            self._add(pending_from, first, pending)
+            pending_from = first
+        pending_from = max(pending_from, last)
+        self._add(last, pending_from, delta)
+        self.values[first:last] = array('I', values)
+        pending_from += len(values) - (last - first)
+        pending += delta
+        self.shift = (pending_from, pending) if pending and pending_from < len(self.values) else None
+
+    def _add(self, first, last, delta):
+        if delta and first < last:
+            self.values[first:last] = array('I', map(delta.__add__, self.values[first:last]))
+
+class LineIndex:
+    # Offsets de inicio de cada línea; línea y columna se resuelven con una
+    # búsqueda binaria solo cuando alguien las pide. Sobre bytes (UTF-8) los
+    # offsets son de bytes y la columna se cuenta en caracteres decodificando
+    # el inicio de la línea, igual que al analizar el texto como str.
+    def __init__(self, source, first_line: int = 1):
+        self.starts = OffsetArray([0])
+        if isinstance(source, (str, bytes)):
+            lines = source.split('\n' if isinstance(source, str) else b'\n')
+            lengths = accumulate(map(len, islice(lines, len(lines) - 1)))
+            self.starts.values.extend(map(add, lengths, count(1)))
+        else:
+            self.starts.values.extend(mo.end() for mo in _NEWLINE_BYTES.finditer(source))
+        self.encoded = None if isinstance(source, str) else source
+        self.first_line = first_line
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line_col(self, offset: int):
+        index = self.starts.bisect_right(offset) - 1
+        line_start = self.starts[index]
+        if self.encoded is not None and offset > line_start:
+            return self.first_line + index, len(str(self.encoded[line_start:offset], 'utf-8'))
+        return self.first_line + index, offset - line_start
+
+    def edit(self, offset: int, deleted: int, inserted: str):
+        first = self.starts.bisect_right(offset)
+        last = self.starts.bisect_right(offset + deleted)
+        new_starts = []
+        position = inserted.find('\n')
+        while position >= 0:
+            new_starts.append(offset + position + 1)
+            position = inserted.find('\n', position + 1)
+        self.starts.splice(first, last, new_starts, len(inserted) - deleted)
+
+class TokenStream:
+    # Tokens en columnas paralelas (struct-of-arrays) en lugar de un dict por
+    # token: tipo como código en array('B') y offsets de inicio y fin. El
+    # valor es una rebanada del código fuente y la línea/columna se calculan
+    # con el índice de líneas, ambos solo al leerlos. El código fuente puede
+    # ser str o bytes UTF-8 (bytes, memoryview); en ese caso los offsets son
+    # de bytes y cada valor se decodifica solo cuando se lee.
+    def __init__(self, source):
+        self.source = source
+        self.encoded = not isinstance(source, str)
+        self.kinds = array('B')
+        self.starts = OffsetArray()
+        self.ends = OffsetArray()
+        self._line_index = None
+
+    def append(self, kind: int, start: int, end: int):
+        self.kinds.append(kind)
+        self.starts.values.append(start)
+        self.ends.values.append(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def line_index(self) -> LineIndex:
+        if self._line_index is None:
+            self._line_index = LineIndex(self.source)
+        return self._line_index
+
+    def kind(self, index: int) -> str:
+        return TOKEN_KINDS[self.kinds[index]]
+
+    def start(self, index: int) -> int:
+        return self.starts[index]
+
+    def end(self, index: int) -> int:
+        return self.ends[index]
+
+    def text(self, start: int, end: int) -> str:
+        if self.encoded:
+            return str(self.source[start:end], 'utf-8')
+        return self.source[start:end]
+
+    def value(self, index: int) -> str:
+        return self.text(self.starts[index], self.ends[index])
+
+    def line_col(self, index: int):
+        return self.line_index.line_col(self.starts[index])
+
+    def line(self, index: int) -> int:
+        return self.line_col(index)[0]
+
+    def column(self, index: int) -> int:
+        return self.line_col(index)[1]
+
+    def index_at(self, offset: int) -> int:
+        # Primer token que empieza en `offset` o después
+        return self.starts.bisect_left(offset)
+
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += len(self.kinds)
+        start = self.starts[index]
+        line, column = self.line_index.line_col(start)
+        return {
+            'type': TOKEN_KINDS[self.kinds[index]],
+            'value': self.text(start, self.ends[index]),
+            'line': line,
+            'column': column
+        }
+
+    def rows(self):
+        # (tipo, valor, línea, columna) de cada token, en orden
+        source = self.source
+        line_col = self.line_index.line_col
+        tokens = zip(self.kinds, self.starts, self.ends)
+        if self.encoded:
+            for kind, start, end in tokens:
+                line, column = line_col(start)
+                yield kind, str(source[start:end], 'utf-8'), line, column
+        else:
+            for kind, start, end in tokens:
+                line, column = line_col(start)
+                yield kind, source[start:end], line, column
+
+    def __iter__(self):
+        for kind, value, line, column in self.rows():
+            yield {
+                'type': TOKEN_KINDS[kind],
+                'value': value,
+                'line': line,
+                'column': column
+            }
+
+    def to_list(self) -> List[Dict]:
+        return list(self)
+
+    def to_json(self) -> str:
+        # Serializa directamente sin construir los dicts intermedios; mismo
+        # orden de claves que jsonify (ordenadas alfabéticamente)
+        kinds = [json.dumps(name) for name in TOKEN_KINDS]
+        parts = [
+            '{"column":%d,"line":%d,"type":%s,"value":%s}'
+            % (column, line, kinds[kind], json.dumps(value))
+            for kind, value, line, column in self.rows()
+        ]
+        return '[' + ','.join(parts) + ']'
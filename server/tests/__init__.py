@@ -0,0 +1,4 @@
+import os
+
+# Las pruebas importan app.py en un solo proceso: cualquier clave sirve
+os.environ.setdefault('SECRET_KEY', 'tests')
@@ -0,0 +1,74 @@
+import unittest
+
+from app import ENGINES
+from compiler.budget import Budget, BudgetExceeded
+from compiler.lexer import lex_iter
+from compiler.parser import Parser
+
+# Cada vuelta duplica la cadena: 8 * 2 ** 24 caracteres al final
+STRINGS = '''main {
+    crêpe s = "xxxxxxxx";
+    nombre i = 0;
+    tour_eiffel (i < 24) {
+        s = s + s;
+        i = i + 1;
+    }
+    afficher(i);
+}'''
+
+LOOP = '''main {
+    nombre i = 0;
+    tour_eiffel (i < 1000) {
+        nombre j = 0;
+        tour_eiffel (j < 1) {
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    afficher(i);
+}'''
+
+
+def run(code, engine, budget):
+    return ENGINES[engine](None, budget).evaluate(Parser(lex_iter(code)).parse())
+
+
+class BudgetTest(unittest.TestCase):
+    def test_strings_limit(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                with self.assertRaises(BudgetExceeded) as raised:
+                    run(STRINGS, engine, Budget(max_strings=1_000_000))
+                self.assertEqual(raised.exception.budget, 'strings')
+
+    def test_time_limit_inside_an_iteration(self):
+        # El reloj se mira al crear cada cadena larga, no solo entre tandas
+        # de vueltas
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                budget = Budget(max_seconds=0)
+                with self.assertRaises(BudgetExceeded) as raised:
+                    run(STRINGS, engine, budget)
+                self.assertEqual(raised.exception.budget, 'time')
+                self.assertLess(budget.characters, 8 * 2 ** 16)
+
+    def test_numbers_are_not_charged(self):
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                budget = Budget(max_strings=0)
+                self.assertEqual(run(LOOP, engine, budget), '1000.0')
+                self.assertEqual(budget.characters, 0)
+
+    def test_iterations_are_exact(self):
+        # 1000 vueltas del ciclo de afuera y una del de adentro en cada una
+        for engine in ENGINES:
+            with self.subTest(engine=engine):
+                budget = Budget(max_iterations=2000)
+                run(LOOP, engine, budget)
+                self.assertEqual(budget.iterations, 2000)
+                with self.assertRaises(BudgetExceeded):
+                    run(LOOP, engine, Budget(max_iterations=1999))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+
+from app import ENGINES
+from compiler.budget import Budget, BudgetExceeded
+from compiler.inputs import InputQueue, InputRequired
+from compiler.lexer import lex_iter
+from compiler.optimizer import optimize
+from compiler.output import OutputBuffer
+from compiler.parser import Parser
+from compiler.resolver import resolve
+
+# Programas con lo que compiler.optimizer cambia (o no debe cambiar): cada uno
+# es (código, valores de `lire`). La salida y el error tienen que ser los
+# mismos con y sin optimizar, en todos los motores de app.ENGINES
+CORPUS = {
+    'folding': ('''main {
+    nombre x = 2 * 3 + 4;
+    crêpe y = 1.5 * 2;
+    afficher(x - 10 / 4);
+    afficher(y * 1 + (7 - 7));
+    afficher(2 > 1);
+    afficher("a" + "b");
+}''', []),
+    'division_by_zero': ('''main {
+    afficher(1);
+    afficher(1 / 0);
+    afficher(2);
+}''', []),
+    'non_finite': ('''main {
+    crêpe big = HUGE * 10;
+    afficher(big);
+    afficher(big - HUGE);
+    afficher(0 - HUGE * 2);
+}'''.replace('HUGE', '9' * 400), []),
+    'signed_zero': ('''main {
+    crêpe z = -1.5 * 0;
+    afficher(z);
+    afficher(z + 0);
+    afficher(z - 0);
+    afficher(-1.5 * 0);
+    afficher(z * 1);
+}''', []),
+    'identities_on_strings': ('''main {
+    nombre s = "abc";
+    afficher(s * 1);
+    afficher(s - 0);
+}''', []),
+    'identities_on_input': ('''main {
+    nombre x = 0;
+    lire(x);
+    afficher(x * 1);
+    afficher(x / 1);
+    afficher(x - 0);
+}''', ['abc']),
+    'numeric_input': ('''main {
+    nombre x = 0;
+    lire(x);
+    macaron (1 < 2) {
+        afficher(x * 1 + 0);
+    }
+}''', ['7']),
+    'missing_input': ('''main {
+    nombre x = 0;
+    afficher(1 + 1);
+    lire(x);
+    afficher(x);
+}''', []),
+    'dead_branch': ('''main {
+    nombre x = 1;
+    macaron (0) {
+        afficher("no");
+    } autre {
+        afficher("yes");
+    }
+    macaron (2 > 1 && 1) {
+        x = x + 1;
+    }
+    afficher(x);
+}''', []),
+    'dead_branch_declaration': ('''main {
+    macaron (1 > 2) {
+        nombre c = 1;
+    }
+    afficher("before");
+    afficher(c);
+}''', []),
+    'live_branch_declaration': ('''main {
+    macaron (2 > 1) {
+        nombre c = 1;
+    } autre {
+        nombre d = 2;
+    }
+    afficher(c);
+    afficher(d);
+}''', []),
+    'dead_branch_undeclared': ('''main {
+    afficher(1);
+    macaron (0) {
+        afficher(y);
+    }
+}''', []),
+    'dead_loop': ('''main {
+    nombre i = 0;
+    tour_eiffel (1 > 2) {
+        i = i + 1;
+    }
+    afficher(i);
+}''', []),
+    'dead_loop_declaration': ('''main {
+    nombre i = 0;
+    tour_eiffel (0) {
+        nombre c = 1;
+    }
+    afficher(i);
+    c = 3;
+}''', []),
+    'dead_loop_assignment': ('''main {
+    nombre i = 0;
+    tour_eiffel (i > 0 || 0) {
+        c = 2;
+        nombre c = 1;
+    }
+    afficher(i);
+}''', []),
+    'loop': ('''main {
+    nombre i = 0;
+    crêpe total = 0;
+    tour_eiffel (i < 5) {
+        total = total + i * 1 * (2 + 3);
+        i = i + 1;
+    }
+    afficher(total);
+}''', []),
+    'infinite_loop': ('''main {
+    nombre i = 0;
+    tour_eiffel (1 == 1) {
+        i = i + 1;
+    }
+}''', []),
+}
+
+
+def run(code, engine, inputs, optimized):
+    # (salida, error) de ejecutar code como lo hace /api/run
+    ast = Parser(lex_iter(code)).parse()
+    output = OutputBuffer()
+    interpreter = ENGINES[engine](output, Budget(max_iterations=1000), InputQueue(inputs))
+    try:
+        if optimized:
+            # Como en /api/run: los nombres se comprueban antes de optimizar
+            resolve(ast)
+            ast, _ = optimize(ast)
+        interpreter.evaluate(ast)
+        error = None
+    except InputRequired as pause:
+        error = ('InputRequired', pause.name)
+    except (RuntimeError, TypeError, BudgetExceeded) as e:
+        error = (type(e).__name__, str(e))
+    return output.getvalue(), error
+
+
+class OptimizerTest(unittest.TestCase):
+    def test_same_output_and_errors(self):
+        for name, (code, inputs) in CORPUS.items():
+            for engine in ENGINES:
+                with self.subTest(program=name, engine=engine):
+                    self.assertEqual(run(code, engine, inputs, True), run(code, engine, inputs, False))
+
+    def test_same_output_as_tree(self):
+        # Optimizado, cada motor da lo mismo que el intérprete de árbol sin
+        # optimizar, salvo 'ir' y 'ssa' (ver compiler.ir_executor)
+        for name, (code, inputs) in CORPUS.items():
+            expected = run(code, 'tree', inputs, False)
+            for engine in ('tree', 'closures', 'bytecode'):
+                with self.subTest(program=name, engine=engine):
+                    self.assertEqual(run(code, engine, inputs, True), expected)
+
+    def test_corpus_is_optimized(self):
+        # Cada clase de cambio aparece en el corpus
+        kinds = set()
+        for code, _ in CORPUS.values():
+            _, changes = optimize(Parser(lex_iter(code)).parse())
+            kinds.update(change['kind'] for change in changes)
+        self.assertEqual(kinds, {'constant_folding', 'algebraic_simplification', 'dead_branch', 'dead_loop'})
+
+
+if __name__ == '__main__':
+    unittest.main()